@@ -0,0 +1,19 @@
+from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import FileResponse
+from api.dependencies import require_admin
+from services.request_profiler import profile_store
+
+router = APIRouter(prefix="/api/admin", tags=["管理"], dependencies=[Depends(require_admin)])
+
+@router.get("/profiles")
+async def list_profiles():
+    """性能分析结果列表（最新的在前）"""
+    return {"profiles": profile_store.list()}
+
+@router.get("/profiles/{name}")
+async def download_profile(name: str):
+    """下载性能分析结果（HTML）"""
+    path = profile_store.path(name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="分析结果不存在")
+    return FileResponse(path, media_type="text/html", filename=name)
@@ -1,12 +1,25 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends
 from models.user import UserCreate, UserLogin, UserResetPassword, UserService
+from api.dependencies import get_current_user
+from services.auth_tokens import auth_token_service
+from config.auth import PASSWORD_HASH_CONFIG
 
 router = APIRouter(prefix="/api/auth", tags=["认证"])
 
+def raise_if_busy(result: dict):
+    """哈希线程池排队已满时快速返回503"""
+    if result.get("error_type") == "busy":
+        raise HTTPException(
+            status_code=503,
+            detail=result["message"],
+            headers={"Retry-After": str(PASSWORD_HASH_CONFIG['retry_after'])}
+        )
+
 @router.post("/register")
 async def register(user_data: UserCreate):
     """用户注册"""
-    result = UserService.create_user(user_data)
+    result = await UserService.create_user(user_data)
+    raise_if_busy(result)
     
     if not result["success"]:
         raise HTTPException(status_code=400, detail=result["message"])
@@ -16,20 +29,29 @@ async def register(user_data: UserCreate):
 @router.post("/login")
 async def login(login_data: UserLogin):
     """用户登录"""
-    result = UserService.login_user(login_data)
+    result = await UserService.login_user(login_data)
+    raise_if_busy(result)
     
     if not result["success"]:
         raise HTTPException(status_code=401, detail=result["message"])
     
     return {
         "message": result["message"],
-        "user": result["user"]
+        "user": result["user"],
+        **result["token"]
     }
 
+@router.post("/logout")
+async def logout(current_user: dict = Depends(get_current_user)):
+    """退出登录，注销当前令牌"""
+    await auth_token_service.revoke(current_user["claims"])
+    return {"message": "已退出登录"}
+
 @router.post("/reset-password")
 async def reset_password(reset_data: UserResetPassword):
     """重置密码"""
-    result = UserService.reset_password(reset_data)
+    result = await UserService.reset_password(reset_data)
+    raise_if_busy(result)
     
     if not result["success"]:
         raise HTTPException(status_code=400, detail=result["message"])
@@ -0,0 +1,41 @@
+from fastapi import Depends, HTTPException, Query, Request
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from models.user import UserService
+from services.auth_tokens import auth_token_service, TokenError, is_admin_key
+from config.auth import ADMIN_CONFIG
+from config.cluster import CLUSTER_CONFIG
+import hmac
+
+security = HTTPBearer()
+
+async def resolve_user(token: str) -> dict:
+    """校验令牌并返回用户信息，令牌校验在内存中完成，用户状态走缓存"""
+    try:
+        claims = auth_token_service.decode(token)
+    except TokenError as e:
+        raise HTTPException(status_code=401, detail=str(e), headers={"WWW-Authenticate": "Bearer"})
+    
+    user_id = int(claims["sub"])
+    if not await auth_token_service.is_user_active(user_id, UserService.get_user_active):
+        raise HTTPException(status_code=401, detail="账号不存在或已被禁用")
+    
+    return {"user_id": user_id, "username": claims.get("username"), "claims": claims}
+
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
+    """获取当前用户信息"""
+    return await resolve_user(credentials.credentials)
+
+async def get_stream_user(token: str = Query(...)) -> dict:
+    """获取事件流的当前用户（EventSource无法设置请求头，token通过查询参数传递）"""
+    return await resolve_user(token)
+
+async def require_admin(request: Request):
+    """管理员接口校验"""
+    if not is_admin_key(request.headers.get(ADMIN_CONFIG['header'])):
+        raise HTTPException(status_code=403, detail="需要管理员权限")
+
+async def require_cluster(request: Request):
+    """节点间内部接口校验"""
+    key, secret = request.headers.get("X-Cluster-Key"), CLUSTER_CONFIG['secret']
+    if not key or not secret or not hmac.compare_digest(key.encode(), secret.encode()):
+        raise HTTPException(status_code=403, detail="仅限集群内部调用")
@@ -0,0 +1,36 @@
+from fastapi import APIRouter, HTTPException, Depends
+from pydantic import BaseModel
+from typing import List, Optional, Tuple
+from api.dependencies import require_cluster
+from services.ipc import IPCError
+from services.telegram_gateway import telegram_gateway
+
+router = APIRouter(prefix="/api/internal", tags=["集群内部"], dependencies=[Depends(require_cluster)])
+
+class CheckAccountsRequest(BaseModel):
+    accounts: List[Tuple[int, Optional[str]]]   # (账号ID, session标识)
+
+class SendMessageRequest(BaseModel):
+    session_file: str
+    target: str
+    html: str
+
+@router.post("/check_accounts")
+async def check_accounts(data: CheckAccountsRequest):
+    """检查本节点持有的账号状态"""
+    return {"statuses": await telegram_gateway.call("check_accounts", accounts=data.accounts)}
+
+@router.post("/send_message")
+async def send_message(data: SendMessageRequest):
+    """用本节点持有的账号发送消息（跟投信号的跟随账号在其他节点时使用）"""
+    try:
+        message_id = await telegram_gateway.call(
+            "send_message", session_file=data.session_file, target=data.target, html=data.html
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except IPCError:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"发送失败: {str(e)}")
+    return {"message_id": message_id}
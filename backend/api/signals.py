@@ -0,0 +1,60 @@
+from fastapi import APIRouter, HTTPException, Depends
+from models.signal import SignalSourceCreate, SignalFollowerCreate, SignalService
+from api.dependencies import get_current_user
+from services.telegram_gateway import telegram_gateway
+
+router = APIRouter(prefix="/api/signals", tags=["跟投信号"])
+
+@router.get("/sources")
+async def list_signal_sources(current_user: dict = Depends(get_current_user)):
+    """信号源及跟随账号列表"""
+    try:
+        return {"sources": await SignalService.list_sources(current_user["user_id"])}
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"获取信号源失败: {str(e)}")
+
+@router.post("/sources")
+async def create_signal_source(data: SignalSourceCreate, current_user: dict = Depends(get_current_user)):
+    """添加信号源"""
+    result = await SignalService.create_source(current_user["user_id"], data)
+    if not result["success"]:
+        raise HTTPException(status_code=400, detail=result["message"])
+    
+    await telegram_gateway.notify("signal_reload")
+    return {"message": result["message"], "id": result["id"]}
+
+@router.delete("/sources/{source_id}")
+async def delete_signal_source(source_id: int, current_user: dict = Depends(get_current_user)):
+    """删除信号源"""
+    result = await SignalService.delete_source(current_user["user_id"], source_id)
+    if not result["success"]:
+        raise HTTPException(status_code=400, detail=result["message"])
+    
+    await telegram_gateway.notify("signal_reload")
+    return {"message": result["message"]}
+
+@router.post("/sources/{source_id}/followers")
+async def add_signal_follower(source_id: int, data: SignalFollowerCreate, current_user: dict = Depends(get_current_user)):
+    """添加跟随账号"""
+    result = await SignalService.add_follower(current_user["user_id"], source_id, data)
+    if not result["success"]:
+        raise HTTPException(status_code=400, detail=result["message"])
+    
+    await telegram_gateway.notify("signal_reload")
+    return {"message": result["message"], "id": result["id"]}
+
+@router.delete("/followers/{follower_id}")
+async def delete_signal_follower(follower_id: int, current_user: dict = Depends(get_current_user)):
+    """删除跟随账号"""
+    result = await SignalService.delete_follower(current_user["user_id"], follower_id)
+    if not result["success"]:
+        raise HTTPException(status_code=400, detail=result["message"])
+    
+    await telegram_gateway.notify("signal_reload")
+    return {"message": result["message"]}
+
+@router.get("/stats")
+async def signal_stats(current_user: dict = Depends(get_current_user)):
+    """信号复制统计（目标数、排队数、收到到发送完成的延迟分位数）"""
+    return await telegram_gateway.call("signal_stats")
@@ -1,23 +1,24 @@
-from fastapi import APIRouter, HTTPException, Depends
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from models.telegram import TelegramLogin, TelegramVerify, TelegramService
-from models.user import UserService
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, File, Form, UploadFile
+from fastapi.responses import Response, StreamingResponse
+from models.telegram import TelegramLogin, TelegramVerify, TelegramImport, TelegramService
+from services.account_importer import account_importer
+from api.dependencies import get_current_user, get_stream_user
+from services.account_event_bus import account_event_bus
+from services.account_router import account_router
+from services.ipc import IPCError
+from services.telegram_gateway import telegram_gateway
+from config.telegram import EVENT_STREAM_CONFIG
+from typing import List, Optional
 import asyncio
+import json
 
 router = APIRouter(prefix="/api/telegram", tags=["Telegram"])
-security = HTTPBearer()
-
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    """获取当前用户信息（简化版本，实际应该验证JWT token）"""
-    # 这里简化处理，实际应该验证JWT token
-    # 暂时返回固定用户ID，后续需要完善JWT验证
-    return {"user_id": 1, "username": "test_user"}
 
 @router.post("/send_code")
-async def send_verification_code(login_data: TelegramLogin):
+async def send_verification_code(login_data: TelegramLogin, current_user: dict = Depends(get_current_user)):
     """发送Telegram验证码"""
     try:
-        result = await TelegramService.send_verification_code(login_data)
+        result = await telegram_gateway.call("send_code", data=login_data.model_dump())
         
         if not result["success"]:
             raise HTTPException(status_code=400, detail=result["message"])
@@ -27,14 +28,19 @@ async def send_verification_code(login_data: TelegramLogin):
             "phone_code_hash": result.get("phone_code_hash")
         }
         
+    except (HTTPException, IPCError):
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"发送验证码失败: {str(e)}")
 
 @router.post("/verify_login")
-async def verify_and_login(verify_data: TelegramVerify, current_user: dict = Depends(get_current_user)):
+async def verify_and_login(verify_data: TelegramVerify, request: Request, current_user: dict = Depends(get_current_user)):
     """验证码登录"""
+    node_url = await telegram_gateway.call("login_node", phone=verify_data.phone)
+    if account_router.should_forward(request, node_url):
+        return await account_router.forward(request, node_url, verify_data.model_dump())
     try:
-        result = await TelegramService.verify_and_login(verify_data, current_user["user_id"])
+        result = await telegram_gateway.call("verify_login", data=verify_data.model_dump(), user_id=current_user["user_id"])
         
         if not result["success"]:
             raise HTTPException(status_code=400, detail=result["message"])
@@ -44,74 +50,156 @@ async def verify_and_login(verify_data: TelegramVerify, current_user: dict = Dep
             "account": result["account"]
         }
         
+    except (HTTPException, IPCError):
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"登录失败: {str(e)}")
 
 @router.get("/accounts")
-async def get_telegram_accounts(current_user: dict = Depends(get_current_user)):
-    """获取用户的Telegram账号列表"""
+async def get_telegram_accounts(
+    limit: Optional[int] = Query(None, ge=1),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    status: Optional[str] = None,
+    phone: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """获取用户的Telegram账号列表（游标分页，可选字段投影和状态/手机号过滤）"""
     try:
-        accounts = TelegramService.get_user_telegram_accounts(current_user["user_id"])
-        
-        return {
-            "accounts": accounts,
-            "total": len(accounts)
+        # 结果已序列化（并按序列化后的字节缓存），跳过FastAPI的编码
+        content = await TelegramService.get_user_telegram_accounts(
+            current_user["user_id"], limit=limit, cursor=cursor,
+            fields=fields, status=status, phone=phone
+        )
+        return Response(content=content, media_type="application/json")
+        
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"获取账号列表失败: {str(e)}")
+
+@router.post("/accounts/import")
+async def import_telegram_accounts(import_data: TelegramImport, current_user: dict = Depends(get_current_user)):
+    """批量导入StringSession账号"""
+    items = [
+        {
+            "session_string": item.session_string,
+            "api_id": item.api_id or import_data.api_id,
+            "api_hash": item.api_hash or import_data.api_hash
         }
+        for item in import_data.accounts
+    ]
+    try:
+        return await telegram_gateway.call("import_sessions", user_id=current_user["user_id"], items=items)
         
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except (HTTPException, IPCError):
+        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"获取账号列表失败: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"导入账号失败: {str(e)}")
+
+@router.post("/accounts/import_files")
+async def import_telegram_session_files(
+    files: List[UploadFile] = File(...),
+    api_id: Optional[int] = Form(None),
+    api_hash: Optional[str] = Form(None),
+    current_user: dict = Depends(get_current_user)
+):
+    """批量导入.session文件账号"""
+    if len(files) > account_importer.max_items:
+        raise HTTPException(status_code=400, detail=f"单次最多导入{account_importer.max_items}个账号")
+    
+    items = []
+    for upload in files:
+        content = await upload.read()
+        session_string = await asyncio.to_thread(account_importer.session_file_to_string, content)
+        items.append({"session_string": session_string, "api_id": api_id, "api_hash": api_hash})
+    try:
+        result = await telegram_gateway.call("import_sessions", user_id=current_user["user_id"], items=items)
+        for item in result["results"]:
+            item["filename"] = files[item["index"]].filename
+        return result
+        
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except (HTTPException, IPCError):
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"导入账号失败: {str(e)}")
 
 @router.delete("/accounts/{account_id}")
 async def delete_telegram_account(account_id: int, current_user: dict = Depends(get_current_user)):
     """删除Telegram账号"""
     try:
-        result = TelegramService.delete_telegram_account(account_id, current_user["user_id"])
+        result = await telegram_gateway.call("delete_account", account_id=account_id, user_id=current_user["user_id"])
         
         if not result["success"]:
             raise HTTPException(status_code=400, detail=result["message"])
         
         return {"message": result["message"]}
         
+    except (HTTPException, IPCError):
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"删除账号失败: {str(e)}")
 
 @router.post("/accounts/{account_id}/check_status")
-async def check_account_status(account_id: int, current_user: dict = Depends(get_current_user)):
-    """检查账号状态"""
+async def check_account_status(account_id: int, request: Request, current_user: dict = Depends(get_current_user)):
+    """检查账号状态（账号由其他节点持有时转发到该节点）"""
+    node_url = await telegram_gateway.call("account_node", account_id=account_id)
+    if account_router.should_forward(request, node_url):
+        return await account_router.forward(request, node_url)
     try:
-        result = await TelegramService.check_account_status(account_id, current_user["user_id"])
+        result = await telegram_gateway.call("check_status", account_id=account_id, user_id=current_user["user_id"])
         
         if not result["success"]:
             raise HTTPException(status_code=400, detail=result["message"])
         
         return {"status": result["status"]}
         
+    except (HTTPException, IPCError):
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"检查状态失败: {str(e)}")
 
 @router.post("/refresh_accounts")
-async def refresh_all_accounts(current_user: dict = Depends(get_current_user)):
+async def refresh_all_accounts(limit: Optional[int] = Query(None, ge=1), current_user: dict = Depends(get_current_user)):
     """刷新所有账号状态"""
     try:
-        accounts = TelegramService.get_user_telegram_accounts(current_user["user_id"])
-        
-        # 异步检查所有账号状态
-        tasks = []
-        for account in accounts:
-            task = TelegramService.check_account_status(account["id"], current_user["user_id"])
-            tasks.append(task)
-        
-        if tasks:
-            await asyncio.gather(*tasks)
-        
-        # 重新获取更新后的账号列表
-        updated_accounts = TelegramService.get_user_telegram_accounts(current_user["user_id"])
+        # 并发检查所有账号状态，结果批量写回，第一页直接由内存中的结果生成
+        result = await telegram_gateway.call("refresh_accounts", user_id=current_user["user_id"], limit=limit)
         
         return {
             "message": "账号状态刷新完成",
-            "accounts": updated_accounts,
-            "total": len(updated_accounts)
+            **result
         }
         
+    except (HTTPException, IPCError):
+        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"刷新账号状态失败: {str(e)}") 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"刷新账号状态失败: {str(e)}") 
+
+@router.get("/events")
+async def account_events(request: Request, current_user: dict = Depends(get_stream_user)):
+    """账号状态变化推送（Server-Sent Events）"""
+    user_id = current_user["user_id"]
+    queue = account_event_bus.subscribe(user_id)
+    
+    async def event_stream():
+        try:
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), EVENT_STREAM_CONFIG['heartbeat_interval'])
+                except asyncio.TimeoutError:
+                    yield ": heartbeat\n\n"
+                    continue
+                yield f"event: {event['type']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+        finally:
+            account_event_bus.unsubscribe(user_id, queue)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
\ No newline at end of file
@@ -0,0 +1,107 @@
+import asyncio
+import hashlib
+import json
+import os
+import random
+from types import SimpleNamespace
+from services.startup_report import lazy_import
+from services.telegram_client_manager import telegram_client_manager
+
+# 假客户端配置：每个方法的延迟（秒，均值和抖动）与失败率
+# 可通过环境变量 FAKE_TELEGRAM_CONFIG（JSON）覆盖部分字段，例如
+# FAKE_TELEGRAM_CONFIG='{"connect": {"latency": 0.2, "failure_rate": 0.05}}'
+FAKE_TELEGRAM_CONFIG = {
+    'connect':            {'latency': 0.05, 'jitter': 0.02, 'failure_rate': 0.0},
+    'send_code_request':  {'latency': 0.15, 'jitter': 0.05, 'failure_rate': 0.0},
+    'sign_in':            {'latency': 0.20, 'jitter': 0.05, 'failure_rate': 0.0},
+    'get_me':             {'latency': 0.05, 'jitter': 0.02, 'failure_rate': 0.0},
+    'is_user_authorized': {'latency': 0.03, 'jitter': 0.01, 'failure_rate': 0.0},
+}
+
+def load_config() -> dict:
+    config = {name: dict(values) for name, values in FAKE_TELEGRAM_CONFIG.items()}
+    overrides = json.loads(os.environ.get('FAKE_TELEGRAM_CONFIG', '{}'))
+    for name, values in overrides.items():
+        config.setdefault(name, {}).update(values)
+    return config
+
+class FakeTelegramClient:
+    """模拟TelegramClient的接口，不访问网络
+
+    按配置注入延迟和失败；登录成功后生成带随机auth_key的session，
+    保存出的StringSession与真实客户端格式一致，导入和状态检查流程可以照常运行。
+    """
+
+    config = load_config()
+
+    def __init__(self, session, api_id: int, api_hash: str, key: str = None):
+        self.session = session if session is not None else lazy_import("telethon.sessions").StringSession()
+        self.api_id = api_id
+        self.api_hash = api_hash
+        self.rate_key = key
+        self.phone = None
+        self._connected = False
+
+    async def _call(self, method: str):
+        """按配置模拟延迟，按失败率抛出异常"""
+        settings = self.config.get(method, {})
+        delay = settings.get('latency', 0) + random.uniform(-1, 1) * settings.get('jitter', 0)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if random.random() < settings.get('failure_rate', 0):
+            if method == 'connect':
+                raise ConnectionError("fake connect failure")
+            raise lazy_import("telethon.errors").ServerError(None, "FAKE_FAILURE")
+
+    def _authorize(self):
+        if self.session.auth_key is None:
+            self.session.set_dc(2, '149.154.167.51', 443)
+            self.session.auth_key = lazy_import("telethon.crypto").AuthKey(os.urandom(256))
+
+    async def connect(self):
+        await self._call('connect')
+        self._connected = True
+
+    def is_connected(self) -> bool:
+        return self._connected
+
+    async def disconnect(self):
+        self._connected = False
+
+    async def is_user_authorized(self) -> bool:
+        await self._call('is_user_authorized')
+        return self.session.auth_key is not None
+
+    async def send_code_request(self, phone: str):
+        await self._call('send_code_request')
+        self.phone = phone
+        return SimpleNamespace(phone_code_hash=hashlib.md5(phone.encode()).hexdigest())
+
+    async def sign_in(self, phone: str = None, code: str = None, phone_code_hash: str = None, password: str = None):
+        await self._call('sign_in')
+        if code is not None and code != '12345':
+            raise lazy_import("telethon.errors").PhoneCodeInvalidError(request=None)
+        self.phone = phone or self.phone
+        self._authorize()
+        return await self.get_me()
+
+    async def get_me(self):
+        await self._call('get_me')
+        if self.session.auth_key is None:
+            return None
+        # 身份由手机号（登录流程）或auth_key（导入的session）确定
+        seed = self.phone or self.session.auth_key.key.hex()
+        user_id = int(hashlib.md5(seed.encode()).hexdigest()[:8], 16)
+        phone = (self.phone or f"+999{user_id % 10 ** 8:08d}").lstrip('+')
+        return SimpleNamespace(
+            id=user_id,
+            phone=phone,
+            username=f"bench_{user_id}",
+            first_name="Bench",
+            last_name=str(user_id % 1000)
+        )
+
+def install():
+    """用假客户端替换Telegram客户端的创建入口"""
+    telegram_client_manager.create_client = FakeTelegramClient
+    print(f"已启用假Telegram客户端: {json.dumps(FakeTelegramClient.config)}")
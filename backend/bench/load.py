@@ -0,0 +1,196 @@
+"""压测驱动：按目标并发调用 /api/auth/* 和 /api/telegram/*，统计每个接口的吞吐和延迟分位数
+
+在backend目录下运行（先启动 bench/docker-compose.yml 和 python -m bench.server）：
+    python -m bench.load --concurrency 50 --duration 60
+    python -m bench.load --compare bench/results/a.json bench/results/b.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime
+import httpx
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+API_ID = 12345
+API_HASH = 'bench'
+
+class Recorder:
+    """按接口记录延迟和错误数"""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    async def request(self, client: httpx.AsyncClient, name: str, method: str, url: str, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.latencies[name].append(time.perf_counter() - started)
+            self.errors[name] += 1
+            return None
+        self.latencies[name].append(time.perf_counter() - started)
+        if response.status_code >= 400:
+            self.errors[name] += 1
+            return None
+        return response.json()
+
+    def report(self, elapsed: float) -> dict:
+        endpoints = {}
+        for name, values in sorted(self.latencies.items()):
+            values = sorted(values)
+            endpoints[name] = {
+                "count": len(values),
+                "errors": self.errors[name],
+                "throughput": round(len(values) / elapsed, 2),
+                "mean_ms": round(sum(values) / len(values) * 1000, 2),
+                "p50_ms": percentile(values, 50),
+                "p95_ms": percentile(values, 95),
+                "p99_ms": percentile(values, 99)
+            }
+        return endpoints
+
+def percentile(sorted_values: list, p: float) -> float:
+    index = min(len(sorted_values) - 1, max(0, round(p / 100 * len(sorted_values)) - 1))
+    return round(sorted_values[index] * 1000, 2)
+
+def fake_session_string() -> str:
+    """生成可被假客户端导入的StringSession"""
+    from telethon.sessions import StringSession
+    from telethon.crypto import AuthKey
+    session = StringSession()
+    session.set_dc(2, '149.154.167.51', 443)
+    session.auth_key = AuthKey(os.urandom(256))
+    return session.save()
+
+async def create_user(client: httpx.AsyncClient, recorder: Recorder) -> dict:
+    """注册并登录一个压测用户，返回认证头"""
+    username = f"bench_{uuid.uuid4().hex[:12]}"
+    password = "bench123456"
+    await recorder.request(client, "POST /api/auth/register", "POST", "/api/auth/register", json={
+        "username": username, "password": password,
+        "confirm_password": password, "secret_phrase": "bench"
+    })
+    result = await recorder.request(client, "POST /api/auth/login", "POST", "/api/auth/login", json={
+        "username": username, "password": password
+    })
+    if result is None:
+        raise RuntimeError(f"压测用户登录失败: {username}")
+    return {"Authorization": f"Bearer {result['access_token']}"}
+
+async def run_iteration(client: httpx.AsyncClient, recorder: Recorder, headers: dict, import_size: int):
+    """一轮业务流程：验证码登录、列表、导入、单个检查、刷新"""
+    phone = f"+1{random.randint(10 ** 9, 10 ** 10 - 1)}"
+    login = {"phone": phone, "api_id": API_ID, "api_hash": API_HASH}
+    sent = await recorder.request(client, "POST /api/telegram/send_code", "POST",
+                                  "/api/telegram/send_code", json=login, headers=headers)
+    if sent is not None:
+        await recorder.request(client, "POST /api/telegram/verify_login", "POST", "/api/telegram/verify_login", json={
+            **login, "verification_code": "12345", "phone_code_hash": sent.get("phone_code_hash")
+        }, headers=headers)
+
+    page = await recorder.request(client, "GET /api/telegram/accounts", "GET",
+                                  "/api/telegram/accounts", params={"limit": 20}, headers=headers)
+    if import_size:
+        await recorder.request(client, "POST /api/telegram/accounts/import", "POST", "/api/telegram/accounts/import", json={
+            "accounts": [{"session_string": fake_session_string()} for _ in range(import_size)],
+            "api_id": API_ID, "api_hash": API_HASH
+        }, headers=headers)
+    if page and page.get("accounts"):
+        account_id = random.choice(page["accounts"])["id"]
+        await recorder.request(client, "POST /api/telegram/accounts/{id}/check_status", "POST",
+                               f"/api/telegram/accounts/{account_id}/check_status", headers=headers)
+    if random.random() < 0.1:
+        await recorder.request(client, "POST /api/telegram/refresh_accounts", "POST",
+                               "/api/telegram/refresh_accounts", params={"limit": 20}, headers=headers)
+
+async def worker(client: httpx.AsyncClient, recorder: Recorder, deadline: float, import_size: int):
+    headers = await create_user(client, recorder)
+    while time.perf_counter() < deadline:
+        await run_iteration(client, recorder, headers, import_size)
+
+def current_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+async def run(args) -> dict:
+    recorder = Recorder()
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limits) as client:
+        started = time.perf_counter()
+        deadline = started + args.duration
+        await asyncio.gather(*(worker(client, recorder, deadline, args.import_size) for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+    return {
+        "commit": current_commit(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "config": {
+            "url": args.url,
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "import_size": args.import_size,
+            "fake_telegram": os.environ.get("FAKE_TELEGRAM_CONFIG")
+        },
+        "elapsed": round(elapsed, 2),
+        "endpoints": recorder.report(elapsed)
+    }
+
+def print_report(result: dict):
+    print(f"提交 {result['commit']}  并发 {result['config']['concurrency']}  耗时 {result['elapsed']}s")
+    print(f"{'接口':<52}{'请求数':>8}{'错误':>6}{'req/s':>9}{'p50':>9}{'p95':>9}{'p99':>9}")
+    for name, stats in result["endpoints"].items():
+        print(f"{name:<52}{stats['count']:>8}{stats['errors']:>6}{stats['throughput']:>9}"
+              f"{stats['p50_ms']:>9}{stats['p95_ms']:>9}{stats['p99_ms']:>9}")
+
+def save_result(result: dict) -> str:
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, f"{result['commit']}-{datetime.now():%Y%m%d%H%M%S}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    return path
+
+def compare(old_path: str, new_path: str):
+    """对比两次压测结果的吞吐和p95/p99"""
+    with open(old_path, encoding="utf-8") as f:
+        old = json.load(f)
+    with open(new_path, encoding="utf-8") as f:
+        new = json.load(f)
+    print(f"{old['commit']} -> {new['commit']}")
+    for name, stats in new["endpoints"].items():
+        base = old["endpoints"].get(name)
+        if base is None:
+            print(f"{name}: 新增接口")
+            continue
+        deltas = []
+        for key in ("throughput", "p95_ms", "p99_ms"):
+            change = (stats[key] - base[key]) / base[key] * 100 if base[key] else 0.0
+            deltas.append(f"{key} {base[key]} -> {stats[key]} ({change:+.1f}%)")
+        print(f"{name}: " + ", ".join(deltas))
+
+def main():
+    parser = argparse.ArgumentParser(description="后端压测")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--import-size", type=int, default=5, help="每轮导入的session数，0表示不测导入")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="对比两个结果文件")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+    result = asyncio.run(run(args))
+    print_report(result)
+    print(f"结果已保存: {save_result(result)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,16 @@
+import os
+
+# bench/docker-compose.yml中的本地MySQL
+BENCH_DATABASE = {
+    'DB_HOST': '127.0.0.1',
+    'DB_PORT': '3307',
+    'DB_USER': 'bench',
+    'DB_PASSWORD': 'bench',
+    'DB_NAME': 'bench'
+}
+
+def use_bench_database():
+    """未显式设置DB_HOST时连接本地压测库（须在导入config.database之前调用），避免压测或审计误连其他数据库"""
+    if not os.environ.get('DB_HOST'):
+        os.environ.update(BENCH_DATABASE)
+    print(f"使用数据库 {os.environ['DB_HOST']}:{os.environ.get('DB_PORT', 3306)}/{os.environ.get('DB_NAME')}")
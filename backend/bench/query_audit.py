@@ -0,0 +1,176 @@
+"""SQL执行计划审计：对运行时收集到的语句执行EXPLAIN，标出全表扫描、文件排序，并给出建议索引
+
+1. 设置QUERY_AUDIT_LOG启动服务并执行业务操作（如压测），收集语句：
+    QUERY_AUDIT_LOG=bench/results/queries.jsonl python -m bench.server
+    python -m bench.load --concurrency 20 --duration 30
+2. 对本地MySQL（与收集时相同的库结构）执行审计：
+    python -m bench.query_audit bench/results/queries.jsonl
+    （两者默认连接 bench/docker-compose.yml 中的本地MySQL，设置DB_*环境变量可指向其他库）
+    加 --strict 时存在问题即以非0退出（可用于CI）
+"""
+import argparse
+import json
+import re
+import sys
+from collections import OrderedDict
+from typing import Dict, List, Optional
+from bench.local_db import use_bench_database
+use_bench_database()
+from config.database import get_db_connection
+
+CLAUSE_END = r"(?=\bORDER\s+BY\b|\bGROUP\s+BY\b|\bLIMIT\b|\bFOR\s+UPDATE\b|$)"
+KEYWORDS = {"WHERE", "JOIN", "LEFT", "RIGHT", "INNER", "ON", "SET", "ORDER", "GROUP", "LIMIT", "USING", "SELECT", "VALUES"}
+
+def parse_tables(query: str) -> Dict[str, str]:
+    """别名 -> 表名（表名自身也作为别名）"""
+    tables = {}
+    for table, alias in re.findall(r"\b(?:FROM|JOIN|UPDATE|INTO)\s+`?(\w+)`?(?:\s+(?:AS\s+)?(\w+))?", query, re.I):
+        tables[table] = table
+        if alias and alias.upper() not in KEYWORDS:
+            tables[alias] = table
+    return tables
+
+def _columns(expression: str, pattern: str, tables: Dict[str, str], table: str, single: bool) -> List[str]:
+    columns = []
+    for alias, column in re.findall(pattern, expression, re.I):
+        if (tables.get(alias) == table if alias else single) and column not in columns:
+            columns.append(column)
+    return columns
+
+def suggest_columns(query: str, table: str) -> List[str]:
+    """按"等值条件 -> 排序列（或一个范围条件）"的顺序给出表的索引列"""
+    tables = parse_tables(query)
+    single = len(set(tables.values())) == 1
+    where = re.search(r"\bWHERE\b(.*?)" + CLAUSE_END, query, re.I | re.S)
+    where = where.group(1) if where else ""
+    # JOIN条件中被驱动表的列也按等值条件处理
+    joins = " ".join(re.findall(r"\bON\b(.*?)(?=\bJOIN\b|\bLEFT\b|\bWHERE\b|$)", query, re.I | re.S))
+    equality = _columns(where + " " + joins, r"(?:(\w+)\.)?`?(\w+)`?\s*(?:=\s*(?:%s|'[^']*'|\d+|TRUE|FALSE|\w+\.\w+)|IN\s*\()",
+                        tables, table, single)
+    ranged = [column for column in _columns(where, r"(?:(\w+)\.)?`?(\w+)`?\s*(?:[<>]=?\s*(?:%s|NOW\(\))|LIKE\s)", tables, table, single)
+              if column not in equality]
+    order = re.search(r"\bORDER\s+BY\b(.*?)(?=\bLIMIT\b|$)", query, re.I | re.S)
+    order_columns = []
+    if order:
+        for item in order.group(1).split(","):
+            match = re.match(r"\s*(?:(\w+)\.)?`?(\w+)`?", item)
+            if match is None or (tables.get(match.group(1)) != table if match.group(1) else not single):
+                order_columns = []
+                break
+            order_columns.append(match.group(2))
+    columns = list(equality)
+    if order_columns:
+        columns += [column for column in order_columns if column not in columns]
+    elif ranged:
+        columns.append(ranged[0])
+    return columns
+
+def table_indexes(cursor, table: str) -> Dict[str, List[str]]:
+    cursor.execute(f"SHOW INDEX FROM `{table}`")
+    names = [column[0] for column in cursor.description]
+    indexes = OrderedDict()
+    for row in cursor.fetchall():
+        row = dict(zip(names, row))
+        indexes.setdefault(row["Key_name"], []).append(row["Column_name"])
+    return indexes
+
+def covering_index(indexes: Dict[str, List[str]], columns: List[str]) -> Optional[str]:
+    """已有索引的前len(columns)列恰为建议列时返回该索引名（不区分顺序，近似判断）"""
+    for name, index_columns in indexes.items():
+        if set(index_columns[:len(columns)]) == set(columns):
+            return name
+    return None
+
+def audit_query(cursor, query: str, args) -> dict:
+    sql = cursor.mogrify(query, args) if args is not None else query
+    cursor.execute("EXPLAIN " + sql)
+    names = [column[0] for column in cursor.description]
+    plan = [dict(zip(names, row)) for row in cursor.fetchall()]
+
+    findings, suggestions = [], []
+    for row in plan:
+        table, access, extra = row.get("table"), row.get("type"), row.get("Extra") or ""
+        problems = []
+        if access == "ALL":
+            problems.append("全表扫描")
+        elif access == "index":
+            problems.append("全索引扫描")
+        if "Using filesort" in extra:
+            problems.append("文件排序")
+        if "Using temporary" in extra:
+            problems.append("临时表")
+        if not problems or not table or table.startswith("<"):
+            continue
+        finding = {"table": table, "problems": problems, "type": access, "key": row.get("key"),
+                   "possible_keys": row.get("possible_keys"), "rows": row.get("rows"), "extra": extra}
+        findings.append(finding)
+
+        real_table = parse_tables(query).get(table, table)
+        columns = suggest_columns(query, real_table)
+        if not columns:
+            continue
+        existing = covering_index(table_indexes(cursor, real_table), columns)
+        if existing is not None:
+            # 已有合适索引，多为表数据太少时优化器选择扫描，数据增长后会使用索引
+            finding["note"] = f"已有索引 {existing} 覆盖 ({', '.join(columns)})，表数据少时优化器可能仍选择扫描"
+            continue
+        name = f"idx_{'_'.join(columns)}"[:64]
+        suggestions.append(f"ALTER TABLE {real_table} ADD INDEX {name} ({', '.join(columns)});")
+    return {"query": query, "plan": plan, "findings": findings, "suggestions": suggestions}
+
+def load_queries(path: str) -> List[dict]:
+    queries = OrderedDict()
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                queries.setdefault(entry["query"], entry)
+    return list(queries.values())
+
+def main():
+    parser = argparse.ArgumentParser(description="SQL执行计划审计和索引建议")
+    parser.add_argument("log", help="QUERY_AUDIT_LOG收集的语句文件")
+    parser.add_argument("--output", help="审计结果写入JSON文件")
+    parser.add_argument("--strict", action="store_true", help="存在未被已有索引覆盖的问题时以非0退出")
+    args = parser.parse_args()
+
+    results = []
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        for entry in load_queries(args.log):
+            try:
+                results.append(audit_query(cursor, entry["query"], entry.get("args")))
+            except Exception as e:
+                results.append({"query": entry["query"], "error": str(e), "findings": [], "suggestions": []})
+
+    suggestions = []
+    for result in results:
+        if result.get("error"):
+            print(f"[错误] {result['query'][:160]}\n    {result['error']}")
+            continue
+        if not result["findings"]:
+            continue
+        print(f"[问题] {result['query'][:160]}")
+        for finding in result["findings"]:
+            print(f"    {finding['table']}: {'、'.join(finding['problems'])} "
+                  f"(type={finding['type']}, key={finding['key']}, rows={finding['rows']})")
+            if finding.get("note"):
+                print(f"    {finding['note']}")
+        for suggestion in result["suggestions"]:
+            print(f"    建议: {suggestion}")
+            if suggestion not in suggestions:
+                suggestions.append(suggestion)
+
+    flagged = sum(1 for result in results if result["findings"])
+    print(f"\n共审计 {len(results)} 条语句，{flagged} 条存在全表扫描或文件排序，建议索引 {len(suggestions)} 个")
+    for suggestion in suggestions:
+        print(suggestion)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2, default=str)
+    if args.strict and (suggestions or any(result.get("error") for result in results)):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""账号列表响应序列化耗时对比（不需要数据库）
+
+before：逐行构造dict、strftime格式化时间，再经FastAPI默认的jsonable_encoder + json编码；
+after：时间字段由SQL格式化，查询行直接由orjson序列化为字节。
+
+在backend目录下运行：
+    python -m bench.serialization --accounts 1000 --repeat 50
+"""
+import argparse
+import json
+import statistics
+import time
+from datetime import datetime, timedelta
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from models.telegram import TelegramService, ACCOUNT_FIELDS, ACCOUNT_DATETIME_FIELDS
+
+def make_rows(count: int) -> list:
+    """模拟查询结果：ACCOUNT_FIELDS各列加末尾的created_at"""
+    now = datetime(2024, 1, 1, 12, 0, 0)
+    rows = []
+    for index in range(count):
+        created_at = now - timedelta(minutes=index)
+        rows.append((
+            count - index, f"+1555{index:07d}", f"user{index}", "名字", "Last", 100000 + index,
+            "online" if index % 3 else "offline", created_at + timedelta(seconds=30), created_at, created_at
+        ))
+    return rows
+
+def preformat(rows: list) -> list:
+    """模拟SQL中DATE_FORMAT后的查询行（末尾created_at保持原始值）"""
+    positions = [ACCOUNT_FIELDS.index(field) for field in ACCOUNT_DATETIME_FIELDS]
+    formatted = []
+    for row in rows:
+        row = list(row)
+        for position in positions:
+            row[position] = row[position].strftime("%Y-%m-%d %H:%M:%S")
+        formatted.append(tuple(row))
+    return formatted
+
+def before(rows: list, limit: int) -> bytes:
+    result = TelegramService._page_result(rows, ACCOUNT_FIELDS, limit, len(rows))
+    return JSONResponse(jsonable_encoder(result)).body
+
+def after(rows: list, limit: int) -> bytes:
+    return TelegramService._page_json(rows, ACCOUNT_FIELDS, limit, len(rows))
+
+def measure(func, rows: list, limit: int, repeat: int) -> float:
+    """返回中位数耗时（毫秒）"""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(rows, limit)
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+def main():
+    parser = argparse.ArgumentParser(description="账号列表序列化耗时对比")
+    parser.add_argument("--accounts", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    rows = make_rows(args.accounts)
+    formatted = preformat(rows)
+    limit = args.accounts
+    # 两种路径输出的内容一致
+    assert json.loads(before(rows, limit)) == json.loads(after(formatted, limit))
+
+    before_ms = measure(before, rows, limit, args.repeat)
+    after_ms = measure(after, formatted, limit, args.repeat)
+    scale = 1000 / args.accounts
+    print(f"账号数: {args.accounts}，重复: {args.repeat}")
+    print(f"before: {before_ms * scale:.2f} ms / 1k账号")
+    print(f"after:  {after_ms * scale:.2f} ms / 1k账号")
+    print(f"加速:   {before_ms / after_ms:.1f}x")
+
+if __name__ == "__main__":
+    main()
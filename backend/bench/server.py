@@ -0,0 +1,24 @@
+"""以假Telegram客户端启动后端，供压测使用
+
+在backend目录下运行：
+    python -m bench.server
+默认连接 bench/docker-compose.yml 中的本地MySQL，设置DB_*环境变量可指向其他库。
+"""
+import argparse
+from bench.local_db import use_bench_database
+use_bench_database()
+import uvicorn
+from bench.fake_telegram import install
+
+def main():
+    parser = argparse.ArgumentParser(description="压测用后端服务")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+
+    install()
+    from main import app
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Telegram客户端进程
+
+持有所有Telegram客户端（登录、导入、状态检查、信号复制、消息入库），API进程经Unix socket调用。
+与API进程使用相同的环境变量启动，并设置 CLIENT_HOST_MODE=remote：
+
+    CLIENT_HOST_MODE=remote python client_host.py
+    CLIENT_HOST_MODE=remote python main.py
+"""
+import asyncio
+import signal
+from prometheus_client import start_http_server
+from config.cluster import CLIENT_HOST_CONFIG
+from config.database import get_pool, close_pool, close_async_pool
+from migrations.runner import run_migrations
+from services.cluster_events import cluster_events
+from services.ipc import IPCServer
+from services.telegram_gateway import HANDLERS, TelegramGateway, start_clients, start_background, stop_all
+
+def init_database_sync():
+    version = run_migrations()
+    get_pool().warm_up()
+    return version
+
+async def main():
+    server = IPCServer(CLIENT_HOST_CONFIG['socket_path'], HANDLERS, CLIENT_HOST_CONFIG['max_message_size'],
+                       CLIENT_HOST_CONFIG['max_event_buffer'])
+    TelegramGateway.serve_events(server.broadcast)
+
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stopping.set)
+
+    start_clients()
+    version = await asyncio.to_thread(init_database_sync)
+    print(f"数据库初始化完成，当前版本 {version}")
+    # 其他节点的事件由API进程读取，客户端进程只写入
+    cluster_events.start(poll=False)
+    await start_background()
+    await server.start()
+    if CLIENT_HOST_CONFIG['metrics_port']:
+        start_http_server(CLIENT_HOST_CONFIG['metrics_port'])
+    print(f"Telegram客户端进程已启动: {CLIENT_HOST_CONFIG['socket_path']}")
+
+    await stopping.wait()
+    await server.stop()
+    await stop_all()
+    await cluster_events.stop()
+    await close_async_pool()
+    close_pool()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,49 @@
+import os
+import secrets
+
+def _auth_secret_key() -> str:
+    """令牌签名密钥：必须由环境变量提供；单进程未设置时使用随机密钥（重启后令牌全部失效，而不是可被伪造）"""
+    key = os.environ.get('AUTH_SECRET_KEY')
+    if key:
+        return key
+    if int(os.environ.get('WORKERS', 1)) > 1 or os.environ.get('NODE_URL'):
+        raise RuntimeError("多进程/多节点部署必须设置环境变量 AUTH_SECRET_KEY（各节点相同）")
+    print("警告: 未设置环境变量 AUTH_SECRET_KEY，使用本进程随机生成的密钥签发令牌，服务重启后所有令牌失效")
+    return secrets.token_urlsafe(32)
+
+# 密码哈希配置
+PASSWORD_HASH_CONFIG = {
+    'max_workers': 4,     # 同时进行bcrypt计算的线程数，一般设为CPU核数
+    'max_queue': 32,      # 允许排队等待的哈希任务数，超过后直接返回繁忙
+    'rounds': 12,         # bcrypt成本因子
+    'retry_after': 1      # 繁忙时建议客户端重试的秒数
+}
+
+# 访问令牌配置
+TOKEN_CONFIG = {
+    'secret_key': _auth_secret_key(),
+    'algorithm': 'HS256',
+    'expire_minutes': 1440,    # 令牌有效期（分钟）
+    'user_cache_ttl': 60,      # 用户状态（is_active）缓存秒数，禁用账号最迟在该时间后生效
+    'user_cache_size': 10000   # 用户状态缓存数量上限
+}
+
+# 管理员接口配置（未设置密钥时管理员接口和按请求头触发的性能分析均不可用）
+ADMIN_CONFIG = {
+    'api_key': os.environ.get('ADMIN_API_KEY'),
+    'header': 'X-Admin-Key'
+}
+
+# 用户名存在性过滤（Bloom过滤器），不存在的用户名登录/重置密码时不查询数据库
+USERNAME_INDEX_CONFIG = {
+    'enabled': True,
+    'capacity': 1000000,       # 预计用户数，超出后误判率上升（仍不会漏判）
+    'error_rate': 0.01,        # 误判率：不存在的用户名被判为可能存在、需查询数据库的比例
+    # 未命中时增量加载新用户的最小间隔（秒），间隔内的未命中直接由过滤器回答；
+    # 其他节点注册的用户经集群事件即时加入，增量加载用于兜底
+    'refresh_interval': 1,
+    # 增量加载时ID序列中的空缺可能是尚未提交的注册，记录最近gap_window个ID内的空缺，
+    # 在pending_timeout秒内每次加载都重新查询，晚提交的用户不会被跳过
+    'gap_window': 1000,
+    'pending_timeout': 60
+}
@@ -0,0 +1,43 @@
+import os
+import socket
+
+# WORKERS>1或设置了NODE_URL时为多节点部署，节点间内部接口（/api/internal）和集群事件才启用
+_CLUSTER_ENABLED = int(os.environ.get('WORKERS', 1)) > 1 or bool(os.environ.get('NODE_URL'))
+
+def _cluster_secret():
+    secret = os.environ.get('CLUSTER_SECRET')
+    if _CLUSTER_ENABLED and not secret:
+        raise RuntimeError("多进程/多节点部署必须设置环境变量 CLUSTER_SECRET（各节点相同）")
+    return secret
+
+# 多进程/多节点配置
+CLUSTER_CONFIG = {
+    'enabled': _CLUSTER_ENABLED,
+    # 节点标识，默认为主机名-进程号，每个进程独立
+    'node_id': os.environ.get('NODE_ID') or f"{socket.gethostname()}-{os.getpid()}",
+    # 其他节点转发请求到本节点使用的地址
+    'node_url': os.environ.get('NODE_URL', f"http://127.0.0.1:{os.environ.get('PORT', 8000)}"),
+    # 节点间内部接口的共享密钥（单节点部署时可不设置）
+    'secret': _cluster_secret(),
+    'lease_ttl': 30,           # 账号租约有效期（秒），节点失联超过该时间后账号由其他节点接管
+    'renew_interval': 10,      # 续约和认领账号的间隔（秒）
+    'forward_timeout': 30,     # 转发请求到其他节点的超时秒数
+    'event_poll_interval': 1,  # 读取其他节点事件（缓存失效、账号事件、令牌注销）的间隔（秒）
+    'event_grace': 5,          # 读取事件时按写入时间回看的秒数，提交稍晚的事件不会被跳过
+    'event_retention': 600,    # 事件保留秒数，超过后清理
+    'workers': int(os.environ.get('WORKERS', 1)),   # python main.py 启动的进程数
+    'port': int(os.environ.get('PORT', 8000))       # 第一个进程的端口，其余进程依次加1
+}
+
+# Telegram客户端进程配置
+CLIENT_HOST_CONFIG = {
+    # embedded：客户端在API进程内运行；remote：客户端由独立进程（python client_host.py）持有，API经Unix socket调用
+    'mode': os.environ.get('CLIENT_HOST_MODE', 'embedded'),
+    'socket_path': os.environ.get('CLIENT_HOST_SOCKET', f"/tmp/gb-client-host-{os.environ.get('PORT', 8000)}.sock"),
+    'timeout': 60,              # 单次调用超时秒数（登录、导入等包含多次Telegram请求）
+    'connect_timeout': 5,       # 连接客户端进程的超时秒数
+    'max_message_size': 16 * 1024 * 1024,   # 单条消息上限（批量导入的session较大）
+    'max_event_buffer': 4 * 1024 * 1024,    # 推送事件时连接的写缓冲上限，超过时断开该连接（API进程重连）
+    # 客户端进程的Prometheus指标端口，不设置时不暴露
+    'metrics_port': int(os.environ['CLIENT_HOST_METRICS_PORT']) if os.environ.get('CLIENT_HOST_METRICS_PORT') else None
+}
@@ -1,52 +1,351 @@
+import os
 import pymysql
-from contextlib import contextmanager
+import aiomysql
+import asyncio
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, asynccontextmanager
+from services.metrics import DB_ACQUIRE_LATENCY, DB_HOLD_LATENCY, TimedCursor, TimedAsyncCursor
 
-# 数据库配置
+# 数据库配置（连接信息只从环境变量读取，不写在代码中）
 DATABASE_CONFIG = {
-    'host': 'gz-cynosdbmysql-grp-jj6na063.sql.tencentcdb.com',
-    'port': 21151,
-    'user': 'zhibo',
-    'password': '04By0302',
-    'database': 'zhibo',
+    'host': os.environ.get('DB_HOST'),
+    'port': int(os.environ.get('DB_PORT', 3306)),
+    'user': os.environ.get('DB_USER'),
+    'password': os.environ.get('DB_PASSWORD', ''),
+    'database': os.environ.get('DB_NAME'),
     'charset': 'utf8mb4'
 }
 
+def check_database_config():
+    """创建连接池前检查必需的连接配置"""
+    missing = [name for name, key in (('DB_HOST', 'host'), ('DB_USER', 'user'), ('DB_NAME', 'database'))
+               if not DATABASE_CONFIG[key]]
+    if missing:
+        raise RuntimeError(f"未设置数据库环境变量: {', '.join(missing)}")
+
+# 连接池配置
+POOL_CONFIG = {
+    'min_size': 2,            # 池中保持的最少空闲连接数
+    'max_size': 20,           # 最大连接数（空闲 + 使用中）
+    'idle_timeout': 300,      # 空闲超过该秒数的连接会被回收（保留min_size个）
+    'max_lifetime': 3600,     # 连接最长存活秒数，超过后归还时直接关闭
+    'ping_interval': 30,      # 空闲超过该秒数的连接在取出时先ping检测存活
+    'wait_timeout': 10        # 连接池耗尽时等待可用连接的最长秒数
+}
+
+class PoolTimeoutError(Exception):
+    """等待连接池可用连接超时"""
+    pass
+
+class _PooledConnection:
+    """连接池中的连接及其时间信息"""
+    __slots__ = ('connection', 'created_at', 'last_used')
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+
+class ConnectionPool:
+    """线程安全的MySQL连接池"""
+
+    def __init__(self, db_config: dict, min_size: int = 2, max_size: int = 20,
+                 idle_timeout: float = 300, max_lifetime: float = 3600,
+                 ping_interval: float = 30, wait_timeout: float = 10):
+        if min_size > max_size:
+            raise ValueError("min_size不能大于max_size")
+        self.db_config = db_config
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.max_lifetime = max_lifetime
+        self.ping_interval = ping_interval
+        self.wait_timeout = wait_timeout
+        self._idle = deque()
+        self._in_use = set()
+        self._size = 0  # 已创建（含正在创建）的连接总数
+        self._closed = False
+        self._cond = threading.Condition()
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @property
+    def idle_count(self) -> int:
+        return len(self._idle)
+
+    def _connect(self) -> _PooledConnection:
+        return _PooledConnection(pymysql.connect(**self.db_config))
+
+    def _discard(self, pooled: _PooledConnection):
+        """关闭连接（在锁外调用，size由调用方维护）"""
+        try:
+            pooled.connection.close()
+        except Exception:
+            pass
+
+    def _is_expired(self, pooled: _PooledConnection, now: float) -> bool:
+        return self.max_lifetime and now - pooled.created_at >= self.max_lifetime
+
+    def _collect_stale(self, now: float) -> list:
+        """在锁内取出过期/长时间空闲的连接，返回待关闭列表"""
+        stale = []
+        keep = deque()
+        while self._idle:
+            pooled = self._idle.popleft()
+            idle_for = now - pooled.last_used
+            too_idle = (self.idle_timeout and idle_for >= self.idle_timeout
+                        and len(keep) + len(self._idle) >= self.min_size)
+            if self._is_expired(pooled, now) or too_idle:
+                stale.append(pooled)
+                self._size -= 1
+            else:
+                keep.append(pooled)
+        self._idle = keep
+        return stale
+
+    def warm_up(self):
+        """预先建立min_size个连接"""
+        while True:
+            with self._cond:
+                if self._closed or self._size >= self.min_size:
+                    return
+                self._size += 1
+            try:
+                pooled = self._connect()
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                    self._cond.notify()
+                raise
+            with self._cond:
+                self._idle.append(pooled)
+                self._cond.notify()
+
+    def acquire(self):
+        """从连接池取出一个可用连接"""
+        deadline = time.monotonic() + self.wait_timeout
+        while True:
+            pooled = None
+            create = False
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise RuntimeError("连接池已关闭")
+                    stale = self._collect_stale(time.monotonic())
+                    if self._idle:
+                        # 后进先出，优先复用最近用过的热连接，让冷连接自然空闲回收
+                        pooled = self._idle.pop()
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1
+                        create = True
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PoolTimeoutError(
+                            f"获取数据库连接超时（{self.wait_timeout}秒内无可用连接，最大连接数{self.max_size}）"
+                        )
+                    if stale:
+                        break
+                    self._cond.wait(remaining)
+            for item in stale:
+                self._discard(item)
+            if create:
+                try:
+                    pooled = self._connect()
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+            elif pooled is None:
+                continue
+            elif not self._check_alive(pooled):
+                with self._cond:
+                    self._size -= 1
+                    self._cond.notify()
+                continue
+            with self._cond:
+                self._in_use.add(pooled)
+            return pooled
+
+    def _check_alive(self, pooled: _PooledConnection) -> bool:
+        """取出时对空闲较久的连接做存活检测"""
+        if time.monotonic() - pooled.last_used < self.ping_interval:
+            return True
+        try:
+            pooled.connection.ping(reconnect=False)
+            return True
+        except Exception:
+            self._discard(pooled)
+            return False
+
+    def release(self, pooled: _PooledConnection, broken: bool = False):
+        """归还连接，未提交的事务会被回滚"""
+        if not broken:
+            try:
+                # 结束事务，避免复用连接时读到旧快照或残留锁
+                pooled.connection.rollback()
+            except Exception:
+                broken = True
+        now = time.monotonic()
+        with self._cond:
+            self._in_use.discard(pooled)
+            if broken or self._closed or self._is_expired(pooled, now):
+                self._size -= 1
+                discard = True
+            else:
+                pooled.last_used = now
+                self._idle.append(pooled)
+                discard = False
+            self._cond.notify()
+        if discard:
+            self._discard(pooled)
+
+    def close(self):
+        """关闭连接池及所有空闲连接，使用中的连接在归还时关闭"""
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for pooled in idle:
+            self._discard(pooled)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": len(self._in_use),
+                "max_size": self.max_size
+            }
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool() -> ConnectionPool:
+    """获取全局连接池（首次使用时创建）"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                check_database_config()
+                _pool = ConnectionPool({**DATABASE_CONFIG, 'cursorclass': TimedCursor}, **POOL_CONFIG)
+    return _pool
+
+def close_pool():
+    """关闭全局连接池"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
 @contextmanager
 def get_db_connection():
-    """获取数据库连接的上下文管理器"""
-    connection = None
+    """获取数据库连接的上下文管理器（从连接池借出，退出时归还）"""
+    pool = get_pool()
+    started = time.perf_counter()
+    pooled = pool.acquire()
+    acquired = time.perf_counter()
+    DB_ACQUIRE_LATENCY.labels("sync").observe(acquired - started)
+    broken = False
     try:
-        connection = pymysql.connect(**DATABASE_CONFIG)
-        yield connection
+        yield pooled.connection
     except Exception as e:
-        if connection:
-            connection.rollback()
+        # 连接层错误的连接不再放回池中；其余异常由release回滚事务
+        if isinstance(e, (pymysql.err.OperationalError, pymysql.err.InterfaceError)):
+            broken = True
         raise e
     finally:
-        if connection:
-            connection.close()
+        pool.release(pooled, broken=broken)
+        DB_HOLD_LATENCY.labels("sync").observe(time.perf_counter() - acquired)
+
+_async_pool = None
+_async_pool_lock = None
+
+async def get_async_pool() -> aiomysql.Pool:
+    """获取全局异步连接池（首次使用时在当前事件循环中创建）"""
+    global _async_pool, _async_pool_lock
+    if _async_pool is None:
+        if _async_pool_lock is None:
+            _async_pool_lock = asyncio.Lock()
+        async with _async_pool_lock:
+            if _async_pool is None:
+                check_database_config()
+                _async_pool = await aiomysql.create_pool(
+                    host=DATABASE_CONFIG['host'],
+                    port=DATABASE_CONFIG['port'],
+                    user=DATABASE_CONFIG['user'],
+                    password=DATABASE_CONFIG['password'],
+                    db=DATABASE_CONFIG['database'],
+                    charset=DATABASE_CONFIG['charset'],
+                    minsize=POOL_CONFIG['min_size'],
+                    maxsize=POOL_CONFIG['max_size'],
+                    # aiomysql按最后使用时间回收空闲连接
+                    pool_recycle=POOL_CONFIG['idle_timeout'],
+                    autocommit=False,
+                    cursorclass=TimedAsyncCursor
+                )
+    return _async_pool
+
+async def close_async_pool():
+    """关闭全局异步连接池"""
+    global _async_pool
+    if _async_pool is not None:
+        pool = _async_pool
+        _async_pool = None
+        pool.close()
+        await pool.wait_closed()
+
+def pool_stats() -> dict:
+    """两个连接池的连接数（用于指标抓取，不会创建连接池，未创建时为0）"""
+    stats = {}
+    sync_stats = _pool.stats() if _pool is not None else {}
+    stats["sync"] = {state: sync_stats.get(state, 0) for state in ("size", "idle", "in_use")}
+    pool = _async_pool
+    size, idle = (pool.size, pool.freesize) if pool is not None else (0, 0)
+    stats["async"] = {"size": size, "idle": idle, "in_use": size - idle}
+    return stats
+
+@asynccontextmanager
+async def get_async_db_connection():
+    """获取异步数据库连接的上下文管理器，用法与get_db_connection一致，但不阻塞事件循环"""
+    pool = await get_async_pool()
+    started = time.perf_counter()
+    try:
+        connection = await asyncio.wait_for(pool.acquire(), POOL_CONFIG['wait_timeout'])
+    except asyncio.TimeoutError:
+        raise PoolTimeoutError(
+            f"获取数据库连接超时（{POOL_CONFIG['wait_timeout']}秒内无可用连接，最大连接数{POOL_CONFIG['max_size']}）"
+        )
+    acquired = time.perf_counter()
+    DB_ACQUIRE_LATENCY.labels("async").observe(acquired - started)
+    try:
+        if asyncio.get_running_loop().time() - connection.last_usage >= POOL_CONFIG['ping_interval']:
+            await connection.ping(reconnect=True)
+        yield connection
+    finally:
+        if not connection.closed and connection.get_transaction_status():
+            # 未提交的事务需回滚，否则aiomysql会直接关闭该连接
+            try:
+                await connection.rollback()
+            except Exception:
+                connection.close()
+        pool.release(connection)
+        DB_HOLD_LATENCY.labels("async").observe(time.perf_counter() - acquired)
 
 def init_database():
-    """初始化数据库表结构"""
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
-        
-        # 创建用户表
-        create_users_table = """
-        CREATE TABLE IF NOT EXISTS users (
-            id INT AUTO_INCREMENT PRIMARY KEY,
-            username VARCHAR(50) UNIQUE NOT NULL,
-            password_hash VARCHAR(255) NOT NULL,
-            secret_phrase VARCHAR(255) NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-            is_active BOOLEAN DEFAULT TRUE
-        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
-        """
-        
-        cursor.execute(create_users_table)
-        conn.commit()
-        print("数据库表初始化完成")
+    """初始化数据库表结构（执行数据库迁移）"""
+    from migrations.runner import run_migrations
+    version = run_migrations()
+    print(f"数据库表初始化完成，当前版本 {version}")
 
 if __name__ == "__main__":
     init_database() 
\ No newline at end of file
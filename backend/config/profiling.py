@@ -0,0 +1,11 @@
+import os
+
+# 请求性能分析配置
+PROFILING_CONFIG = {
+    'trigger_header': 'X-Profile',   # 请求头值等于管理员密钥时分析该请求
+    'sample_rate': float(os.environ.get('PROFILE_SAMPLE_RATE', 0)),  # 随机抽样比例，0表示只按请求头触发
+    'interval': 0.001,               # 采样间隔（秒）
+    'max_concurrent': 2,             # 同时进行分析的请求数上限，超过时不分析
+    'output_dir': 'profiles',        # 分析结果保存目录
+    'max_captures': 50               # 最多保留的分析结果数，超过后删除最旧的
+}
@@ -0,0 +1,101 @@
+import json
+import os
+
+# Telegram客户端管理配置
+TELEGRAM_CLIENT_CONFIG = {
+    'max_clients': 500,        # 常驻连接的客户端上限，超出后按LRU淘汰
+    'idle_timeout': 1800,      # 客户端空闲超过该秒数后断开并移出
+    'cleanup_interval': 60,    # 空闲清理任务的执行间隔（秒）
+    'connect_retries': 4,      # 连接失败时的重试次数
+    'backoff_base': 1,         # 重连退避的初始秒数，每次翻倍
+    'backoff_max': 30          # 重连退避的最大秒数
+}
+
+# 待验证登录配置（send_code到verify_login之间保持客户端连接）
+PENDING_LOGIN_CONFIG = {
+    'ttl': 600,                # 验证码会话有效期（秒），与Telegram验证码有效期相当
+    'max_entries': 1000,       # 同时等待验证的登录数上限，超出时淘汰最早的
+    'cleanup_interval': 30     # 过期清理任务的执行间隔（秒）
+}
+
+# 账号状态检查配置
+STATUS_CHECK_CONFIG = {
+    'concurrency': 20,         # 同时检查的账号数上限
+    'timeout': 10              # 单个账号检查的超时秒数，超时的账号保持原状态
+}
+
+# 后台账号健康检查配置
+HEALTH_SCHEDULER_CONFIG = {
+    'enabled': True,
+    'interval': 300,           # 每轮检查完所有账号的目标时长（秒），检查均匀分散在该时间内
+    'jitter': 0.2,             # 相邻两次检查间隔的随机抖动比例
+    'flush_interval': 5        # 检查结果批量写回数据库的间隔（秒）
+}
+
+# 状态推送配置
+EVENT_STREAM_CONFIG = {
+    'queue_size': 100,         # 每个订阅连接的事件缓冲数，满时丢弃最旧的事件
+    'heartbeat_interval': 15   # 无事件时发送心跳的间隔（秒），防止代理断开连接
+}
+
+# Session存储配置
+SESSION_STORE_CONFIG = {
+    'backend': 'database',     # database: 以StringSession存入MySQL，任意节点可用；file: 每个手机号一个本地SQLite文件
+    'session_dir': 'sessions', # file后端的session目录，也用于迁移旧的session文件
+    'cache_size': 5000         # database后端在内存中缓存的session数量
+}
+
+# 账号列表缓存配置
+ACCOUNT_CACHE_CONFIG = {
+    'ttl': 30,                 # 缓存有效期（秒），写操作会主动失效
+    'max_size': 10000          # 最多缓存的用户数
+}
+
+# 账号列表分页配置
+ACCOUNT_LIST_CONFIG = {
+    'default_limit': 50,       # 未指定limit时每页返回的账号数
+    'max_limit': 500           # 每页账号数上限
+}
+
+# 批量导入账号配置
+IMPORT_CONFIG = {
+    'concurrency': 10,         # 同时校验的session数
+    'timeout': 20,             # 单个session校验（连接 + get_me）的超时秒数
+    'max_items': 1000          # 单次导入的session数上限
+}
+
+# Telegram API凭据池（JSON数组，如 [{"api_id": 123, "api_hash": "..."}]）
+# 配置后账号按手机号/session稳定地分配到其中一组，未配置时使用请求中提供的凭据
+TELEGRAM_API_CREDENTIALS = json.loads(os.environ.get('TELEGRAM_API_CREDENTIALS', '[]'))
+
+# Telegram请求限流配置
+RATE_LIMIT_CONFIG = {
+    'account_rate': 1,         # 单个账号每秒请求数
+    'account_burst': 5,        # 单个账号可突发的请求数
+    'api_rate': 30,            # 同一api_id下所有账号每秒请求数
+    'api_burst': 50,           # 同一api_id可突发的请求数
+    'max_auto_wait': 60,       # FloodWait不超过该秒数时等待后自动重试，超过则直接返回错误
+    'max_buckets': 10000       # 令牌桶数量达到该值时清理空闲的桶
+}
+
+# 跟投信号复制配置
+SIGNAL_COPY_CONFIG = {
+    'enabled': True,
+    'concurrency': 200,        # 同时发送的消息数上限（所有跟随目标合计）
+    'queue_size': 100,         # 每个跟随目标的待发送队列长度，满时丢弃并记为失败
+    'worker_idle_timeout': 300,# 目标队列空闲超过该秒数后结束其发送任务
+    'reload_interval': 60,     # 重新加载信号源配置的间隔（秒），配置修改时也会立即重新加载
+    'flush_interval': 1,       # 投递记录批量写入的间隔（秒）
+    'flush_size': 200,         # 投递记录达到该数量时立即写入
+    'stats_window': 2000       # 延迟统计保留的最近投递数
+}
+
+# 消息入库配置
+MESSAGE_WRITER_CONFIG = {
+    'enabled': True,
+    'queue_size': 10000,       # 内存中待写入的消息数上限，满时写入方等待（背压）
+    'put_timeout': 1,          # 队列满时等待的最长秒数，超时的消息丢弃并计数
+    'batch_size': 500,         # 单次写入的最大消息数
+    'flush_interval': 0.5,     # 未攒满一批时最长等待秒数
+    'retry_max': 30            # 写入失败时重试的最大间隔（秒），期间队列积压形成背压
+}
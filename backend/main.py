@@ -1,16 +1,51 @@
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
-from api.auth import router as auth_router
-from api.telegram import router as telegram_router
-from config.database import init_database
-from models.telegram import TelegramService
+from services.startup_report import startup_report
+
+with startup_report.timer("imports", "fastapi"):
+    import asyncio
+    from fastapi import FastAPI
+    from fastapi.middleware.cors import CORSMiddleware
+    from fastapi.responses import JSONResponse, ORJSONResponse, Response
+    from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
+with startup_report.timer("imports", "api.auth"):
+    from api.auth import router as auth_router
+with startup_report.timer("imports", "api.telegram"):
+    from api.telegram import router as telegram_router
+with startup_report.timer("imports", "api.signals"):
+    from api.signals import router as signals_router
+with startup_report.timer("imports", "api.admin"):
+    from api.admin import router as admin_router
+with startup_report.timer("imports", "api.internal"):
+    from api.internal import router as internal_router
+with startup_report.timer("imports", "config.database"):
+    from config.database import get_pool, close_pool, close_async_pool, pool_stats
+with startup_report.timer("imports", "migrations.runner"):
+    from migrations.runner import run_migrations
+with startup_report.timer("imports", "services"):
+    from models.telegram import account_cache
+    from services.password_hasher import password_hasher
+    from services.username_index import username_index
+    from services.auth_tokens import auth_token_service
+    from services.cluster_events import cluster_events
+    from services.telegram_client_manager import telegram_client_manager
+    from services.metrics import MetricsMiddleware, TELEGRAM_CONNECTED_CLIENTS, DB_POOL_CONNECTIONS
+    from services.request_profiler import ProfilingMiddleware
+    from services.telegram_gateway import telegram_gateway, start_clients, start_background, stop_all
+    from services.ipc import IPCError
+    from config.profiling import PROFILING_CONFIG
+    from config.cluster import CLUSTER_CONFIG, CLIENT_HOST_CONFIG
+import os
+import socket
+import subprocess
+import sys
 import uvicorn
 
 # 创建FastAPI应用
 app = FastAPI(
     title="跟投系统后端API",
     description="跟投系统的后端API服务",
-    version="1.0.0"
+    version="1.0.0",
+    # 使用orjson序列化响应
+    default_response_class=ORJSONResponse
 )
 
 # 配置CORS
@@ -22,34 +57,168 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 按请求头或抽样触发的请求性能分析
+app.add_middleware(
+    ProfilingMiddleware,
+    trigger_header=PROFILING_CONFIG['trigger_header'],
+    sample_rate=PROFILING_CONFIG['sample_rate'],
+    interval=PROFILING_CONFIG['interval'],
+    max_concurrent=PROFILING_CONFIG['max_concurrent']
+)
+
+# 请求耗时统计
+app.add_middleware(MetricsMiddleware)
+
 # 注册路由
 app.include_router(auth_router)
 app.include_router(telegram_router)
+app.include_router(signals_router)
+app.include_router(admin_router)
+# 节点间内部接口只在多节点部署时挂载
+if CLUSTER_CONFIG['enabled']:
+    app.include_router(internal_router)
+
+# 连接数指标在抓取时读取
+TELEGRAM_CONNECTED_CLIENTS.set_function(lambda: len(telegram_client_manager))
+for pool in ("sync", "async"):
+    for state in ("size", "idle", "in_use"):
+        DB_POOL_CONNECTIONS.labels(pool, state).set_function(lambda pool=pool, state=state: pool_stats()[pool][state])
+
+# 后台初始化任务；完成前 /ready 返回503，/health 立即可用
+init_state = {"ready": False, "error": None, "task": None}
+
+def init_database_sync():
+    """检查并升级数据库结构，预热连接池（阻塞操作，在线程中执行）"""
+    with startup_report.timer("init", "run_migrations"):
+        version = run_migrations()
+    with startup_report.timer("init", "pool_warm_up"):
+        get_pool().warm_up()
+    return version
+
+async def background_init():
+    """数据库初始化完成后再启动依赖数据库的后台任务"""
+    try:
+        version = await asyncio.to_thread(init_database_sync)
+        print(f"数据库初始化完成，当前版本 {version}")
+        with startup_report.timer("init", "username_index"):
+            await username_index.load()
+        with startup_report.timer("init", "cluster_state"):
+            await auth_token_service.load()
+            cluster_events.start()
+        if telegram_gateway.embedded:
+            await start_background()
+        init_state["ready"] = True
+        startup_report.mark_ready()
+        startup_report.print_summary()
+    except Exception as e:
+        init_state["error"] = str(e)
+        print(f"后台初始化失败: {e}")
 
 @app.on_event("startup")
 async def startup_event():
-    """应用启动时初始化数据库"""
-    print("正在初始化数据库...")
-    init_database()
-    print("正在初始化Telegram账号表...")
-    TelegramService.init_telegram_table()
-    print("数据库初始化完成")
+    """应用启动时只启动轻量任务，数据库检查在后台进行"""
+    print("正在检查数据库版本...")
+    if telegram_gateway.embedded:
+        start_clients()
+    else:
+        await telegram_gateway.connect()
+    init_state["task"] = asyncio.create_task(background_init())
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """应用关闭时断开Telegram客户端，释放数据库连接池和哈希线程池"""
+    task = init_state["task"]
+    if task is not None and not task.done():
+        task.cancel()
+    if telegram_gateway.embedded:
+        await stop_all()
+    await cluster_events.stop()
+    await telegram_gateway.close()
+    await close_async_pool()
+    close_pool()
+    password_hasher.shutdown()
 
 @app.get("/")
 async def root():
     """根路径"""
     return {"message": "跟投系统后端API服务正在运行", "status": "success"}
 
+@app.exception_handler(IPCError)
+async def client_host_unavailable(request, exc: IPCError):
+    """客户端进程不可用或超时"""
+    return JSONResponse(status_code=503, content={"detail": f"Telegram客户端服务不可用: {exc}"})
+
 @app.get("/health")
 async def health_check():
-    """健康检查"""
-    return {"status": "healthy", "message": "服务运行正常"}
+    """健康检查（只读取本进程状态，立即返回）"""
+    return {
+        "status": "healthy",
+        "message": "服务运行正常",
+        "account_cache": account_cache.stats()
+    }
+
+@app.get("/health/telegram")
+async def telegram_stats():
+    """Telegram客户端统计（remote模式下查询客户端进程，超时很短）"""
+    try:
+        return await telegram_gateway.call("stats")
+    except IPCError as e:
+        return JSONResponse(status_code=503, content={"error": str(e)})
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus指标"""
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+@app.get("/ready")
+async def readiness_check():
+    """就绪检查：数据库初始化完成后才返回200"""
+    if init_state["ready"]:
+        return {"status": "ready"}
+    return JSONResponse(
+        status_code=503,
+        content={"status": "failed" if init_state["error"] else "starting", "error": init_state["error"]}
+    )
+
+@app.get("/health/startup")
+async def startup_stats():
+    """启动耗时统计（导入、初始化以及重依赖的按需导入）"""
+    return startup_report.as_dict()
+
+def run_workers(workers: int, port: int):
+    """启动多个进程，每个进程监听 port+i 并作为独立节点认领一部分账号（前面需要负载均衡）"""
+    processes = []
+    for index in range(workers):
+        worker_port = port + index
+        env = dict(
+            os.environ, WORKERS="1", RELOAD="0", PORT=str(worker_port),
+            NODE_ID=f"{socket.gethostname()}-{worker_port}",
+            NODE_URL=f"http://127.0.0.1:{worker_port}"
+        )
+        # 每个节点有自己的客户端进程，socket路径按端口区分
+        env.pop("CLIENT_HOST_SOCKET", None)
+        processes.append(subprocess.Popen([sys.executable, os.path.abspath(__file__)], env=env))
+        if CLIENT_HOST_CONFIG['mode'] == "remote":
+            host = os.path.join(os.path.dirname(os.path.abspath(__file__)), "client_host.py")
+            processes.append(subprocess.Popen([sys.executable, host], env=env))
+    try:
+        for process in processes:
+            process.wait()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait()
 
 if __name__ == "__main__":
-    uvicorn.run(
-        "main:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True,
-        log_level="info"
-    ) 
\ No newline at end of file
+    if CLUSTER_CONFIG['workers'] > 1:
+        run_workers(CLUSTER_CONFIG['workers'], CLUSTER_CONFIG['port'])
+    else:
+        uvicorn.run(
+            "main:app",
+            host="0.0.0.0",
+            port=CLUSTER_CONFIG['port'],
+            # 自动重载只用于单进程开发环境
+            reload=os.environ.get("RELOAD", "1") == "1",
+            log_level="info"
+        )
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import importlib.util
+import os
+import re
+import sys
+import pymysql
+
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.database import get_db_connection
+
+# 迁移文件目录，文件名格式：四位版本号_说明.py，文件中定义upgrade(cursor)
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "versions")
+MIGRATION_FILE_PATTERN = re.compile(r"^(\d{4})_(\w+)\.py$")
+MIGRATION_LOCK_NAME = "schema_migration"
+MIGRATION_LOCK_TIMEOUT = 60
+
+def list_migrations() -> list:
+    """按版本号返回[(版本号, 名称, 文件路径)]，不导入迁移文件"""
+    migrations = []
+    for filename in os.listdir(MIGRATIONS_DIR):
+        match = MIGRATION_FILE_PATTERN.match(filename)
+        if match:
+            migrations.append((int(match.group(1)), match.group(2), os.path.join(MIGRATIONS_DIR, filename)))
+    migrations.sort()
+    return migrations
+
+def load_migration(path: str):
+    spec = importlib.util.spec_from_file_location(f"migration_{os.path.basename(path)[:-3]}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def get_schema_version(cursor):
+    """当前数据库版本，schema_version表不存在时返回None"""
+    try:
+        cursor.execute("SELECT MAX(version) FROM schema_version")
+    except pymysql.err.ProgrammingError:
+        return None
+    return cursor.fetchone()[0] or 0
+
+def table_columns(cursor, table: str) -> set:
+    cursor.execute("""
+        SELECT column_name FROM information_schema.columns
+        WHERE table_schema = DATABASE() AND table_name = %s
+    """, (table,))
+    return {row[0] for row in cursor.fetchall()}
+
+def table_indexes(cursor, table: str) -> set:
+    cursor.execute("""
+        SELECT DISTINCT index_name FROM information_schema.statistics
+        WHERE table_schema = DATABASE() AND table_name = %s
+    """, (table,))
+    return {row[0] for row in cursor.fetchall()}
+
+def alter_table(cursor, table: str, clauses: list):
+    """把多项结构修改合并为一条ALTER TABLE执行"""
+    if clauses:
+        cursor.execute(f"ALTER TABLE {table} {', '.join(clauses)}")
+
+def run_migrations() -> int:
+    """把数据库升级到最新版本，返回当前版本
+
+    已是最新版本时只执行一次版本查询；需要升级时通过GET_LOCK保证多个进程不会同时迁移。
+    """
+    migrations = list_migrations()
+    latest = migrations[-1][0] if migrations else 0
+    
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        
+        current = get_schema_version(cursor)
+        if current is not None and current >= latest:
+            return current
+        
+        cursor.execute("SELECT GET_LOCK(%s, %s)", (MIGRATION_LOCK_NAME, MIGRATION_LOCK_TIMEOUT))
+        if not cursor.fetchone()[0]:
+            raise RuntimeError("获取数据库迁移锁超时")
+        try:
+            cursor.execute("""
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INT PRIMARY KEY,
+                name VARCHAR(100) NOT NULL,
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+            """)
+            # 等锁期间其他进程可能已完成迁移
+            current = get_schema_version(cursor) or 0
+            for version, name, path in migrations:
+                if version <= current:
+                    continue
+                print(f"应用数据库迁移: {version:04d}_{name}")
+                load_migration(path).upgrade(cursor)
+                cursor.execute(
+                    "INSERT INTO schema_version (version, name) VALUES (%s, %s)",
+                    (version, name)
+                )
+                conn.commit()
+                current = version
+        finally:
+            cursor.execute("SELECT RELEASE_LOCK(%s)", (MIGRATION_LOCK_NAME,))
+            cursor.fetchone()
+    
+    return current
+
+if __name__ == "__main__":
+    print("开始执行数据库迁移...")
+    print(f"数据库已是版本 {run_migrations()}")
@@ -0,0 +1,40 @@
+"""修复早期手工建表留下的结构差异（原fix_database.py、fix_telegram_username.py）
+
+每张表的缺失字段、字段修改和索引合并为一条ALTER TABLE执行。
+"""
+from migrations.runner import table_columns, table_indexes, alter_table
+
+# users表必需的字段（id为主键，缺失时无法自动补建）
+USERS_REQUIRED_COLUMNS = {
+    'username': 'VARCHAR(50) UNIQUE NOT NULL',
+    'password_hash': 'VARCHAR(255) NOT NULL',
+    'secret_phrase': 'VARCHAR(255) NOT NULL',
+    'created_at': 'TIMESTAMP DEFAULT CURRENT_TIMESTAMP',
+    'updated_at': 'TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP',
+    'is_active': 'BOOLEAN DEFAULT TRUE'
+}
+
+# telegram_accounts账号列表分页所需的索引
+TELEGRAM_ACCOUNTS_INDEXES = {
+    'idx_user_created': 'user_id, created_at, id',
+    'idx_user_status_created': 'user_id, status, created_at, id'
+}
+
+def upgrade(cursor):
+    columns = table_columns(cursor, 'users')
+    clauses = [
+        f"ADD COLUMN {name} {definition}"
+        for name, definition in USERS_REQUIRED_COLUMNS.items()
+        if name not in columns
+    ]
+    # 旧版本遗留的telegram_username字段为NOT NULL，注册时会失败，改为允许NULL
+    if 'telegram_username' in columns:
+        clauses.append("MODIFY COLUMN telegram_username VARCHAR(50) NULL DEFAULT NULL")
+    alter_table(cursor, 'users', clauses)
+    
+    indexes = table_indexes(cursor, 'telegram_accounts')
+    alter_table(cursor, 'telegram_accounts', [
+        f"ADD INDEX {name} ({columns})"
+        for name, columns in TELEGRAM_ACCOUNTS_INDEXES.items()
+        if name not in indexes
+    ])
@@ -0,0 +1,61 @@
+"""跟投信号表：信号源、跟随账号、信号消息（去重）、投递记录"""
+
+def upgrade(cursor):
+    # 信号源：由哪个账号监听哪个频道/群组
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS signal_sources (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        user_id INT NOT NULL,
+        account_id INT NOT NULL,
+        chat VARCHAR(255) NOT NULL,
+        enabled BOOLEAN DEFAULT TRUE,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+        FOREIGN KEY (account_id) REFERENCES telegram_accounts(id) ON DELETE CASCADE,
+        UNIQUE KEY unique_account_chat (account_id, chat),
+        INDEX idx_user (user_id)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+    """)
+    
+    # 跟随：信号复制到哪个账号的哪个目标会话
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS signal_followers (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        source_id INT NOT NULL,
+        account_id INT NOT NULL,
+        target VARCHAR(255) NOT NULL,
+        enabled BOOLEAN DEFAULT TRUE,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (source_id) REFERENCES signal_sources(id) ON DELETE CASCADE,
+        FOREIGN KEY (account_id) REFERENCES telegram_accounts(id) ON DELETE CASCADE,
+        UNIQUE KEY unique_source_account_target (source_id, account_id, target)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+    """)
+    
+    # 已接收的信号消息，唯一键保证同一条消息只被分发一次（重复事件、多个节点）
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS signal_messages (
+        id BIGINT AUTO_INCREMENT PRIMARY KEY,
+        source_id INT NOT NULL,
+        message_id BIGINT NOT NULL,
+        received_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (source_id) REFERENCES signal_sources(id) ON DELETE CASCADE,
+        UNIQUE KEY unique_source_message (source_id, message_id)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+    """)
+    
+    # 投递记录，每个跟随者每条消息一行
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS signal_deliveries (
+        id BIGINT AUTO_INCREMENT PRIMARY KEY,
+        follower_id INT NOT NULL,
+        source_message_id BIGINT NOT NULL,
+        status ENUM('sent', 'failed', 'skipped') NOT NULL,
+        sent_message_id BIGINT NULL,
+        latency_ms INT NULL,
+        error VARCHAR(255) NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (follower_id) REFERENCES signal_followers(id) ON DELETE CASCADE,
+        UNIQUE KEY unique_follower_message (follower_id, source_message_id)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+    """)
@@ -0,0 +1,16 @@
+"""账号收到的消息（批量写入）"""
+
+def upgrade(cursor):
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS telegram_messages (
+        id BIGINT AUTO_INCREMENT PRIMARY KEY,
+        chat_id BIGINT NOT NULL,
+        message_id BIGINT NOT NULL,
+        sender_id BIGINT NULL,
+        text TEXT NULL,
+        sent_at DATETIME NULL,
+        received_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE KEY unique_chat_message (chat_id, message_id),
+        INDEX idx_chat_sent (chat_id, sent_at)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+    """)
@@ -0,0 +1,19 @@
+"""账号租约：每个账号由一个节点持有并处理，节点失联后租约过期由其他节点接管
+
+lease_key为 account:<账号ID> 或 login:<手机号>（发送验证码的节点，验证登录需转发到该节点）。
+"""
+
+def upgrade(cursor):
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS account_leases (
+        lease_key VARCHAR(64) PRIMARY KEY,
+        account_id INT NULL,
+        owner VARCHAR(64) NOT NULL,
+        node_url VARCHAR(255) NOT NULL,
+        expires_at DATETIME NOT NULL,
+        FOREIGN KEY (account_id) REFERENCES telegram_accounts(id) ON DELETE CASCADE,
+        UNIQUE KEY unique_account (account_id),
+        INDEX idx_owner (owner),
+        INDEX idx_expires (expires_at)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+    """)
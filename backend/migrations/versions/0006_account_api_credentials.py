@@ -0,0 +1,14 @@
+"""账号登录/导入时使用的api_id、api_hash，之后创建该账号的客户端沿用同一组凭据"""
+from migrations.runner import table_columns, table_indexes, alter_table
+
+def upgrade(cursor):
+    columns = table_columns(cursor, 'telegram_accounts')
+    clauses = [
+        f"ADD COLUMN {name} {definition}"
+        for name, definition in (('api_id', 'INT NULL'), ('api_hash', 'VARCHAR(64) NULL'))
+        if name not in columns
+    ]
+    # 按session标识查询账号凭据
+    if 'idx_session_file' not in table_indexes(cursor, 'telegram_accounts'):
+        clauses.append("ADD INDEX idx_session_file (session_file)")
+    alter_table(cursor, 'telegram_accounts', clauses)
@@ -0,0 +1,17 @@
+"""telegram_messages记录收到消息的账号
+
+同一私聊/普通群的message_id只在各自账号内唯一，多个账号收到的消息按(账号, 会话, 消息ID)去重。
+迁移前写入的消息账号ID记为0。
+"""
+from migrations.runner import table_columns, table_indexes, alter_table
+
+def upgrade(cursor):
+    clauses = []
+    if 'account_id' not in table_columns(cursor, 'telegram_messages'):
+        clauses.append("ADD COLUMN account_id INT NOT NULL DEFAULT 0 AFTER id")
+    indexes = table_indexes(cursor, 'telegram_messages')
+    if 'unique_chat_message' in indexes:
+        clauses.append("DROP INDEX unique_chat_message")
+    if 'unique_account_chat_message' not in indexes:
+        clauses.append("ADD UNIQUE KEY unique_account_chat_message (account_id, chat_id, message_id)")
+    alter_table(cursor, 'telegram_messages', clauses)
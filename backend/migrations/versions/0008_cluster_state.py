@@ -0,0 +1,28 @@
+"""多节点共享状态
+
+auth_revocations：已注销的令牌（revocation_key为jti）和用户级失效记录（revocation_key为 user:<用户ID>，
+not_before之前签发的令牌失效），expires_at（Unix时间）之后记录不再有意义，可清理。
+cluster_events：节点间事件通道，各节点轮询读取其他节点写入的事件（缓存失效、账号事件、令牌注销）。
+"""
+
+def upgrade(cursor):
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS auth_revocations (
+        revocation_key VARCHAR(64) PRIMARY KEY,
+        user_id INT NULL,
+        not_before INT NULL,
+        expires_at INT NOT NULL,
+        INDEX idx_expires (expires_at)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+    """)
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS cluster_events (
+        id BIGINT AUTO_INCREMENT PRIMARY KEY,
+        origin VARCHAR(255) NOT NULL,
+        kind VARCHAR(32) NOT NULL,
+        user_id INT NULL,
+        payload TEXT NULL,
+        created_at DATETIME(3) NOT NULL DEFAULT CURRENT_TIMESTAMP(3),
+        INDEX idx_created (created_at)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+    """)
@@ -0,0 +1,183 @@
+from pydantic import BaseModel
+from typing import Iterable, List
+import pymysql
+from config.database import get_async_db_connection
+
+class SignalSourceCreate(BaseModel):
+    account_id: int      # 监听信号的Telegram账号
+    chat: str            # 频道/群组的用户名、链接或ID
+
+class SignalFollowerCreate(BaseModel):
+    account_id: int      # 发送信号的Telegram账号
+    target: str          # 目标会话的用户名、链接或ID
+
+class SignalService:
+    """跟投信号配置的读写"""
+
+    @staticmethod
+    async def _owned_account(cursor, account_id: int, user_id: int) -> bool:
+        await cursor.execute(
+            "SELECT 1 FROM telegram_accounts WHERE id = %s AND user_id = %s",
+            (account_id, user_id)
+        )
+        return await cursor.fetchone() is not None
+
+    @staticmethod
+    async def list_sources(user_id: int) -> List[dict]:
+        """用户的信号源及其跟随账号"""
+        async with get_async_db_connection() as conn:
+            cursor = await conn.cursor()
+            await cursor.execute("""
+                SELECT s.id, s.account_id, s.chat, s.enabled, s.created_at,
+                       f.id, f.account_id, f.target, f.enabled
+                FROM signal_sources s
+                LEFT JOIN signal_followers f ON f.source_id = s.id
+                WHERE s.user_id = %s
+                ORDER BY s.id, f.id
+            """, (user_id,))
+            rows = await cursor.fetchall()
+
+        sources = {}
+        for source_id, account_id, chat, enabled, created_at, follower_id, follower_account_id, target, follower_enabled in rows:
+            source = sources.get(source_id)
+            if source is None:
+                source = sources[source_id] = {
+                    "id": source_id,
+                    "account_id": account_id,
+                    "chat": chat,
+                    "enabled": bool(enabled),
+                    "created_at": created_at.strftime("%Y-%m-%d %H:%M:%S") if created_at else None,
+                    "followers": []
+                }
+            if follower_id is not None:
+                source["followers"].append({
+                    "id": follower_id,
+                    "account_id": follower_account_id,
+                    "target": target,
+                    "enabled": bool(follower_enabled)
+                })
+        return list(sources.values())
+
+    @staticmethod
+    async def create_source(user_id: int, data: SignalSourceCreate) -> dict:
+        """添加信号源"""
+        try:
+            async with get_async_db_connection() as conn:
+                cursor = await conn.cursor()
+                if not await SignalService._owned_account(cursor, data.account_id, user_id):
+                    return {"success": False, "message": "账号不存在"}
+
+                await cursor.execute(
+                    "INSERT INTO signal_sources (user_id, account_id, chat) VALUES (%s, %s, %s)",
+                    (user_id, data.account_id, data.chat.strip())
+                )
+                await conn.commit()
+                return {"success": True, "message": "信号源已添加", "id": cursor.lastrowid}
+
+        except pymysql.err.IntegrityError:
+            return {"success": False, "message": "该账号已监听此会话"}
+        except Exception as e:
+            return {"success": False, "message": f"添加信号源失败: {str(e)}"}
+
+    @staticmethod
+    async def delete_source(user_id: int, source_id: int) -> dict:
+        """删除信号源（跟随配置一并删除）"""
+        async with get_async_db_connection() as conn:
+            cursor = await conn.cursor()
+            await cursor.execute(
+                "DELETE FROM signal_sources WHERE id = %s AND user_id = %s",
+                (source_id, user_id)
+            )
+            await conn.commit()
+            if not cursor.rowcount:
+                return {"success": False, "message": "信号源不存在"}
+        return {"success": True, "message": "信号源已删除"}
+
+    @staticmethod
+    async def add_follower(user_id: int, source_id: int, data: SignalFollowerCreate) -> dict:
+        """为信号源添加跟随账号"""
+        try:
+            async with get_async_db_connection() as conn:
+                cursor = await conn.cursor()
+                await cursor.execute(
+                    "SELECT 1 FROM signal_sources WHERE id = %s AND user_id = %s",
+                    (source_id, user_id)
+                )
+                if not await cursor.fetchone():
+                    return {"success": False, "message": "信号源不存在"}
+                if not await SignalService._owned_account(cursor, data.account_id, user_id):
+                    return {"success": False, "message": "账号不存在"}
+
+                await cursor.execute(
+                    "INSERT INTO signal_followers (source_id, account_id, target) VALUES (%s, %s, %s)",
+                    (source_id, data.account_id, data.target.strip())
+                )
+                await conn.commit()
+                return {"success": True, "message": "跟随账号已添加", "id": cursor.lastrowid}
+
+        except pymysql.err.IntegrityError:
+            return {"success": False, "message": "该账号已跟随此信号源的同一目标"}
+        except Exception as e:
+            return {"success": False, "message": f"添加跟随账号失败: {str(e)}"}
+
+    @staticmethod
+    async def delete_follower(user_id: int, follower_id: int) -> dict:
+        """删除跟随账号"""
+        async with get_async_db_connection() as conn:
+            cursor = await conn.cursor()
+            await cursor.execute("""
+                DELETE f FROM signal_followers f
+                JOIN signal_sources s ON s.id = f.source_id
+                WHERE f.id = %s AND s.user_id = %s
+            """, (follower_id, user_id))
+            await conn.commit()
+            if not cursor.rowcount:
+                return {"success": False, "message": "跟随账号不存在"}
+        return {"success": True, "message": "跟随账号已删除"}
+
+    @staticmethod
+    async def load_active() -> list:
+        """加载所有启用的信号源和跟随账号（含session标识），供复制引擎使用
+
+        返回[(信号源ID, 信号源账号ID, 信号源session, 会话, 跟随ID, 跟随账号ID, 跟随session, 目标)]，
+        没有跟随者的信号源跟随字段为None。
+        """
+        async with get_async_db_connection() as conn:
+            cursor = await conn.cursor()
+            await cursor.execute("""
+                SELECT s.id, s.account_id, sa.session_file, s.chat, f.id, f.account_id, fa.session_file, f.target
+                FROM signal_sources s
+                JOIN telegram_accounts sa ON sa.id = s.account_id
+                LEFT JOIN signal_followers f ON f.source_id = s.id AND f.enabled = TRUE
+                LEFT JOIN telegram_accounts fa ON fa.id = f.account_id
+                WHERE s.enabled = TRUE AND sa.session_file IS NOT NULL
+            """)
+            return list(await cursor.fetchall())
+
+    @staticmethod
+    async def claim_message(source_id: int, message_id: int) -> bool:
+        """登记信号消息，返回是否首次登记（重复事件或其他节点已登记时返回False）"""
+        async with get_async_db_connection() as conn:
+            cursor = await conn.cursor()
+            await cursor.execute(
+                "INSERT IGNORE INTO signal_messages (source_id, message_id) VALUES (%s, %s)",
+                (source_id, message_id)
+            )
+            await conn.commit()
+            return cursor.rowcount == 1
+
+    @staticmethod
+    async def save_deliveries(rows: Iterable[tuple]):
+        """批量写入投递记录，rows为(跟随ID, 源消息ID, 状态, 发送的消息ID, 延迟毫秒, 错误)"""
+        rows = list(rows)
+        if not rows:
+            return
+        async with get_async_db_connection() as conn:
+            cursor = await conn.cursor()
+            # VALUES中只有占位符，executemany合并为一条多行INSERT
+            await cursor.executemany("""
+                INSERT IGNORE INTO signal_deliveries
+                (follower_id, source_message_id, status, sent_message_id, latency_ms, error)
+                VALUES (%s, %s, %s, %s, %s, %s)
+            """, rows)
+            await conn.commit()
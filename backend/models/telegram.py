@@ -1,26 +1,47 @@
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Optional, List, Dict, Iterable
 from datetime import datetime
-import os
 import json
 import asyncio
-from telethon import TelegramClient
-from telethon.errors import SessionPasswordNeededError, PhoneCodeInvalidError
-from config.database import get_db_connection
+import orjson
+from config.database import get_async_db_connection
+from services.telegram_client_manager import telegram_client_manager
+from services.pending_login_store import pending_login_store
+from services.account_status_checker import account_status_checker
+from services.account_leases import account_lease_manager
+from services.account_router import account_router
+from services.account_event_bus import account_event_bus
+from services.cluster_events import cluster_events
+from services.session_store import session_store
+from services.startup_report import lazy_import
+from services.telegram_rate_limiter import api_credential_pool
+from services.ttl_cache import TTLCache
+from config.telegram import ACCOUNT_CACHE_CONFIG, ACCOUNT_LIST_CONFIG
+import base64
 
 class TelegramLogin(BaseModel):
     phone: str
-    api_id: int
-    api_hash: str
+    api_id: Optional[int] = None      # 服务端配置了API凭据池时可不传
+    api_hash: Optional[str] = None
 
 class TelegramVerify(BaseModel):
     phone: str
     verification_code: str
-    api_id: int
-    api_hash: str
+    api_id: Optional[int] = None
+    api_hash: Optional[str] = None
     two_factor_password: Optional[str] = None
     phone_code_hash: Optional[str] = None
 
+class TelegramImportItem(BaseModel):
+    session_string: str
+    api_id: Optional[int] = None
+    api_hash: Optional[str] = None
+
+class TelegramImport(BaseModel):
+    accounts: List[TelegramImportItem]
+    api_id: Optional[int] = None
+    api_hash: Optional[str] = None
+
 class TelegramAccount(BaseModel):
     id: Optional[int] = None
     user_id: int
@@ -34,56 +55,62 @@ class TelegramAccount(BaseModel):
     last_active: Optional[datetime] = None
     created_at: Optional[datetime] = None
 
+# 用户账号列表缓存（(user_id, 查询参数) -> 序列化后的分页结果JSON字节，按user_id分组失效）
+account_cache = TTLCache(**ACCOUNT_CACHE_CONFIG)
+
+def invalidate_accounts(user_id: int):
+    """用户账号数据已修改：本进程的缓存失效，并通知其他节点"""
+    account_cache.invalidate(user_id)
+    cluster_events.emit("accounts", user_id)
+
+cluster_events.on("accounts", lambda user_id, _: account_cache.invalidate(user_id))
+
+# 账号列表可返回的字段，顺序即查询列顺序
+ACCOUNT_FIELDS = ("id", "phone", "username", "first_name", "last_name", "telegram_user_id",
+                  "status", "last_active", "created_at")
+ACCOUNT_DATETIME_FIELDS = ("last_active", "created_at")
+# 时间字段在SQL中格式化为与接口一致的字符串（%已按参数化查询转义）
+ACCOUNT_FIELD_SQL = {
+    field: f"DATE_FORMAT({field}, '%%Y-%%m-%%d %%H:%%i:%%s')" if field in ACCOUNT_DATETIME_FIELDS else field
+    for field in ACCOUNT_FIELDS
+}
+ACCOUNT_STATUSES = ("online", "offline", "connecting")
+
 class TelegramService:
     """Telegram相关服务"""
     
-    @staticmethod
-    def init_telegram_table():
-        """初始化telegram账号表"""
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            
-            create_table_sql = """
-            CREATE TABLE IF NOT EXISTS telegram_accounts (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                user_id INT NOT NULL,
-                phone VARCHAR(20) NOT NULL,
-                username VARCHAR(50) NULL,
-                first_name VARCHAR(100) NULL,
-                last_name VARCHAR(100) NULL,
-                telegram_user_id BIGINT NULL,
-                session_file VARCHAR(255) NULL,
-                status ENUM('online', 'offline', 'connecting') DEFAULT 'offline',
-                last_active TIMESTAMP NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
-                UNIQUE KEY unique_user_phone (user_id, phone)
-            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
-            """
-            
-            cursor.execute(create_table_sql)
-            conn.commit()
-    
     @staticmethod
     async def send_verification_code(login_data: TelegramLogin) -> dict:
         """发送验证码"""
+        errors = lazy_import("telethon.errors")
         try:
-            # 创建session目录
-            session_dir = "sessions"
-            if not os.path.exists(session_dir):
-                os.makedirs(session_dir)
+            # session标识（文件路径或数据库session键），保存在telegram_accounts.session_file
+            session_file = session_store.session_ref(login_data.phone)
+            api_id, api_hash = api_credential_pool.resolve(session_file, login_data.api_id, login_data.api_hash)
             
-            session_file = os.path.join(session_dir, f"{login_data.phone}.session")
-            
-            client = TelegramClient(session_file, login_data.api_id, login_data.api_hash)
-            
-            await client.connect()
+            # 重新发送验证码时复用待验证登录中的客户端
+            pending = pending_login_store.get(login_data.phone)
+            if pending is not None and pending.api_id == api_id and pending.client.is_connected():
+                client = pending.client
+            else:
+                # 同一session文件不能被两个客户端同时打开，先断开常驻客户端
+                await telegram_client_manager.remove(session_file)
+                client = telegram_client_manager.create_client(session_store.new(session_file), api_id, api_hash, session_file)
+                await telegram_client_manager.connect(client)
             
             # 发送验证码
-            sent_code = await client.send_code_request(login_data.phone)
+            try:
+                sent_code = await client.send_code_request(login_data.phone)
+            except Exception:
+                if pending is None or client is not pending.client:
+                    await client.disconnect()
+                raise
             
-            await client.disconnect()
+            # 客户端保持连接，验证登录时直接复用
+            await pending_login_store.put(
+                login_data.phone, client, session_file,
+                api_id, api_hash, sent_code.phone_code_hash
+            )
             
             return {
                 "success": True,
@@ -91,6 +118,12 @@ class TelegramService:
                 "phone_code_hash": sent_code.phone_code_hash
             }
             
+        except errors.FloodWaitError as e:
+            return {
+                "success": False,
+                "message": f"请求过于频繁，请{e.seconds}秒后再试",
+                "error_type": "flood_wait"
+            }
         except Exception as e:
             return {
                 "success": False,
@@ -100,27 +133,40 @@ class TelegramService:
     @staticmethod
     async def verify_and_login(verify_data: TelegramVerify, user_id: int) -> dict:
         """验证码登录"""
+        errors = lazy_import("telethon.errors")
         try:
-            session_dir = "sessions"
-            session_file = os.path.join(session_dir, f"{verify_data.phone}.session")
+            session_file = session_store.session_ref(verify_data.phone)
             
-            client = TelegramClient(session_file, verify_data.api_id, verify_data.api_hash)
+            pending = pending_login_store.get(verify_data.phone)
+            if pending is None:
+                if not verify_data.phone_code_hash:
+                    return {
+                        "success": False,
+                        "message": "登录失败: 验证码会话已过期，请重新发送验证码",
+                        "error_type": "missing_hash"
+                    }
+                # 服务重启等情况下没有待验证登录，使用前端传回的phone_code_hash重新建立
+                api_id, api_hash = api_credential_pool.resolve(session_file, verify_data.api_id, verify_data.api_hash)
+                await telegram_client_manager.remove(session_file)
+                client = telegram_client_manager.create_client(session_store.new(session_file), api_id, api_hash, session_file)
+                await telegram_client_manager.connect(client)
+                pending = await pending_login_store.put(
+                    verify_data.phone, client, session_file,
+                    api_id, api_hash, verify_data.phone_code_hash
+                )
+            client = pending.client
             
-            await client.connect()
+            if not pending.password_needed:
+                try:
+                    # 验证登录
+                    await client.sign_in(verify_data.phone, verify_data.verification_code, phone_code_hash=pending.phone_code_hash)
+                except errors.SessionPasswordNeededError:
+                    # 验证码已通过，之后重试只需提交二级密码
+                    pending.password_needed = True
             
-            try:
-                # 验证登录
-                if verify_data.phone_code_hash:
-                    # 使用phone_code_hash进行验证
-                    await client.sign_in(verify_data.phone, verify_data.verification_code, phone_code_hash=verify_data.phone_code_hash)
-                else:
-                    # 兼容旧方式
-                    await client.sign_in(verify_data.phone, verify_data.verification_code)
-                    
-            except SessionPasswordNeededError:
+            if pending.password_needed:
                 # 需要二级密码验证
                 if not verify_data.two_factor_password:
-                    await client.disconnect()
                     return {
                         "success": False,
                         "message": "此账号启用了两步验证，请输入二级密码后重试",
@@ -132,7 +178,6 @@ class TelegramService:
                 try:
                     await client.sign_in(password=verify_data.two_factor_password)
                 except Exception as two_factor_error:
-                    await client.disconnect()
                     return {
                         "success": False,
                         "message": f"二级密码验证失败: {str(two_factor_error)}",
@@ -142,6 +187,9 @@ class TelegramService:
             # 获取用户信息
             me = await client.get_me()
             
+            # 持久化登录后的session
+            await session_store.save(session_file, client)
+            
             # 保存到数据库
             telegram_account = {
                 "user_id": user_id,
@@ -151,12 +199,19 @@ class TelegramService:
                 "last_name": me.last_name,
                 "telegram_user_id": me.id,
                 "session_file": session_file,
-                "status": "online"
+                "status": "online",
+                # 之后重新连接该账号时沿用登录时的凭据
+                "api_id": pending.api_id,
+                "api_hash": pending.api_hash
             }
             
-            account_id = TelegramService.save_telegram_account(telegram_account)
+            account_id = await TelegramService.save_telegram_account(telegram_account)
             
-            await client.disconnect()
+            # 登录完成，客户端转交给客户端管理器常驻
+            pending_login_store.pop(verify_data.phone)
+            await telegram_client_manager.adopt(session_file, client)
+            await account_lease_manager.claim_accounts([(account_id, session_file)])
+            await account_lease_manager.release_login(verify_data.phone)
             
             return {
                 "success": True,
@@ -172,12 +227,19 @@ class TelegramService:
                 }
             }
             
-        except PhoneCodeInvalidError:
+        except errors.PhoneCodeInvalidError:
             return {
                 "success": False,
                 "message": "验证码无效，请检查验证码是否正确或重新获取",
                 "error_type": "invalid_code"
             }
+        except errors.FloodWaitError as e:
+            # 限流器已按该账号暂停请求，超过自动重试时长的FloodWait才会到这里
+            return {
+                "success": False,
+                "message": f"登录失败: 请求过于频繁，请{e.seconds}秒后再试",
+                "error_type": "flood_wait"
+            }
         except Exception as e:
             error_msg = str(e)
             error_type = "unknown"
@@ -208,102 +270,302 @@ class TelegramService:
                 "error_type": error_type
             }
     
+    # 按unique_user_phone插入或更新账号；VALUES中只有占位符，executemany可合并为一条多行INSERT
+    UPSERT_ACCOUNT_SQL = """
+        INSERT INTO telegram_accounts 
+        (user_id, phone, username, first_name, last_name, telegram_user_id, session_file, status, last_active,
+         api_id, api_hash)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE
+            id = LAST_INSERT_ID(id),
+            username = VALUES(username), first_name = VALUES(first_name), last_name = VALUES(last_name),
+            telegram_user_id = VALUES(telegram_user_id), session_file = VALUES(session_file),
+            status = VALUES(status), last_active = VALUES(last_active),
+            api_id = VALUES(api_id), api_hash = VALUES(api_hash)
+    """
+    
     @staticmethod
-    def save_telegram_account(account_data: dict) -> int:
-        """保存Telegram账号到数据库"""
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
+    def _upsert_params(account_data: dict, now: datetime) -> tuple:
+        return (
+            account_data["user_id"],
+            account_data["phone"],
+            account_data["username"],
+            account_data["first_name"],
+            account_data["last_name"],
+            account_data["telegram_user_id"],
+            account_data["session_file"],
+            account_data["status"],
+            now,
+            account_data.get("api_id"),
+            account_data.get("api_hash")
+        )
+    
+    @staticmethod
+    async def save_telegram_account(account_data: dict) -> int:
+        """保存Telegram账号到数据库（存在则更新），返回账号ID"""
+        async with get_async_db_connection() as conn:
+            cursor = await conn.cursor()
             
-            # 检查是否已存在
-            cursor.execute(
-                "SELECT id FROM telegram_accounts WHERE user_id = %s AND phone = %s",
-                (account_data["user_id"], account_data["phone"])
+            # LAST_INSERT_ID(id)让更新已有记录时lastrowid也返回该记录ID
+            await cursor.execute(
+                TelegramService.UPSERT_ACCOUNT_SQL,
+                TelegramService._upsert_params(account_data, datetime.now().replace(microsecond=0))
             )
-            existing = cursor.fetchone()
+            await conn.commit()
+            invalidate_accounts(account_data["user_id"])
+            return cursor.lastrowid
+    
+    @staticmethod
+    async def save_telegram_accounts(user_id: int, accounts: List[dict]) -> Dict[str, int]:
+        """批量保存同一用户的Telegram账号，返回{手机号: 账号ID}"""
+        if not accounts:
+            return {}
+        
+        now = datetime.now().replace(microsecond=0)
+        phones = [account["phone"] for account in accounts]
+        async with get_async_db_connection() as conn:
+            cursor = await conn.cursor()
             
-            if existing:
-                # 更新现有记录
-                cursor.execute("""
-                    UPDATE telegram_accounts 
-                    SET username = %s, first_name = %s, last_name = %s, 
-                        telegram_user_id = %s, session_file = %s, status = %s,
-                        last_active = CURRENT_TIMESTAMP
-                    WHERE id = %s
-                """, (
-                    account_data["username"],
-                    account_data["first_name"],
-                    account_data["last_name"],
-                    account_data["telegram_user_id"],
-                    account_data["session_file"],
-                    account_data["status"],
-                    existing[0]
-                ))
-                conn.commit()
-                return existing[0]
-            else:
-                # 插入新记录
-                cursor.execute("""
-                    INSERT INTO telegram_accounts 
-                    (user_id, phone, username, first_name, last_name, telegram_user_id, session_file, status, last_active)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, CURRENT_TIMESTAMP)
-                """, (
-                    account_data["user_id"],
-                    account_data["phone"],
-                    account_data["username"],
-                    account_data["first_name"],
-                    account_data["last_name"],
-                    account_data["telegram_user_id"],
-                    account_data["session_file"],
-                    account_data["status"]
-                ))
-                conn.commit()
-                return cursor.lastrowid
+            await cursor.executemany(
+                TelegramService.UPSERT_ACCOUNT_SQL,
+                [TelegramService._upsert_params(account, now) for account in accounts]
+            )
+            await cursor.execute(
+                f"SELECT phone, id FROM telegram_accounts WHERE user_id = %s AND phone IN ({', '.join(['%s'] * len(phones))})",
+                [user_id] + phones
+            )
+            ids = {phone: account_id for phone, account_id in await cursor.fetchall()}
+            await conn.commit()
+        
+        invalidate_accounts(user_id)
+        return ids
     
     @staticmethod
-    def get_user_telegram_accounts(user_id: int) -> List[dict]:
-        """获取用户的Telegram账号列表"""
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
+    def _format_account(account, fields=ACCOUNT_FIELDS) -> dict:
+        """将账号查询结果行转换为接口返回格式，fields为行中各列对应的字段"""
+        result = dict(zip(fields, account))
+        for field in ACCOUNT_DATETIME_FIELDS:
+            if result.get(field):
+                result[field] = result[field].strftime("%Y-%m-%d %H:%M:%S")
+        return result
+    
+    @staticmethod
+    def encode_cursor(created_at: datetime, account_id: int) -> str:
+        """生成分页游标（上一页最后一条的创建时间和ID）"""
+        raw = f"{created_at.strftime('%Y-%m-%d %H:%M:%S')}|{account_id}"
+        return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+    
+    @staticmethod
+    def decode_cursor(cursor: str) -> tuple:
+        try:
+            created_at, account_id = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8').split("|")
+            return datetime.strptime(created_at, "%Y-%m-%d %H:%M:%S"), int(account_id)
+        except Exception:
+            raise ValueError("分页游标无效")
+    
+    @staticmethod
+    def parse_fields(fields: Optional[str]) -> tuple:
+        """解析fields=参数，返回按标准顺序排列的字段（始终包含id）"""
+        if not fields:
+            return ACCOUNT_FIELDS
+        requested = {field.strip() for field in fields.split(",") if field.strip()}
+        unknown = requested - set(ACCOUNT_FIELDS)
+        if unknown:
+            raise ValueError(f"不支持的字段: {', '.join(sorted(unknown))}")
+        requested.add("id")
+        return tuple(field for field in ACCOUNT_FIELDS if field in requested)
+    
+    @staticmethod
+    def _page_result(rows: list, fields: tuple, limit: int, total: Optional[int]) -> dict:
+        """rows按(created_at, id)倒序排列、每行末尾为created_at，最多limit + 1行"""
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        next_cursor = None
+        if has_more and rows:
+            next_cursor = TelegramService.encode_cursor(rows[-1][-1], rows[-1][0])
+        return {
+            "accounts": [TelegramService._format_account(row, fields) for row in rows],
+            "next_cursor": next_cursor,
+            "total": total
+        }
+    
+    @staticmethod
+    def _page_json(rows: list, fields: tuple, limit: int, total: Optional[int]) -> bytes:
+        """与_page_result相同的分页结果，直接由查询行序列化为JSON字节
+
+        rows中的时间字段已在SQL中格式化，每行末尾为原始created_at（仅用于生成游标）。
+        """
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        next_cursor = None
+        if has_more and rows:
+            next_cursor = TelegramService.encode_cursor(rows[-1][-1], rows[-1][0])
+        return orjson.dumps({
+            "accounts": [dict(zip(fields, row)) for row in rows],
+            "next_cursor": next_cursor,
+            "total": total
+        })
+    
+    @staticmethod
+    async def get_user_telegram_accounts(user_id: int, limit: Optional[int] = None, cursor: Optional[str] = None,
+                                         fields: Optional[str] = None, status: Optional[str] = None,
+                                         phone: Optional[str] = None) -> bytes:
+        """按(created_at, id)游标分页获取用户的Telegram账号列表（优先读缓存）
+
+        返回序列化后的JSON：accounts、next_cursor（没有下一页时为None）和total（仅第一页统计，其余页为None）。
+        """
+        limit = min(limit or ACCOUNT_LIST_CONFIG['default_limit'], ACCOUNT_LIST_CONFIG['max_limit'])
+        projected = TelegramService.parse_fields(fields)
+        if status is not None and status not in ACCOUNT_STATUSES:
+            raise ValueError("状态参数无效")
+        
+        cache_key = (user_id, limit, cursor, projected, status, phone)
+        cached = account_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        conditions = ["user_id = %s"]
+        params = [user_id]
+        if status:
+            conditions.append("status = %s")
+            params.append(status)
+        if phone:
+            # 手机号前缀匹配，转义LIKE通配符
+            escaped = phone.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            conditions.append("phone LIKE %s")
+            params.append(escaped + "%")
+        filter_sql = " AND ".join(conditions)
+        filter_params = list(params)
+        if cursor:
+            cursor_created_at, cursor_id = TelegramService.decode_cursor(cursor)
+            conditions.append("(created_at < %s OR (created_at = %s AND id < %s))")
+            params.extend((cursor_created_at, cursor_created_at, cursor_id))
+        params.append(limit + 1)
+        
+        version = account_cache.version(user_id)
+        async with get_async_db_connection() as conn:
+            db_cursor = await conn.cursor()
+            
+            await db_cursor.execute(f"""
+                SELECT {", ".join(ACCOUNT_FIELD_SQL[field] for field in projected)}, created_at
+                FROM telegram_accounts 
+                WHERE {" AND ".join(conditions)}
+                ORDER BY created_at DESC, id DESC
+                LIMIT %s
+            """, params)
+            rows = await db_cursor.fetchall()
+            
+            total = None
+            if not cursor:
+                await db_cursor.execute(f"SELECT COUNT(*) FROM telegram_accounts WHERE {filter_sql}", filter_params)
+                total = (await db_cursor.fetchone())[0]
+        
+        result = TelegramService._page_json(list(rows), projected, limit, total)
+        account_cache.set(cache_key, result, version, group=user_id)
+        return result
+    
+    @staticmethod
+    async def update_account_statuses(statuses: Dict[int, str], checked_at: datetime, user_ids: Iterable[int] = ()):
+        """用一条UPDATE批量写回账号状态，在线账号同时更新最后活跃时间；user_ids为需要失效缓存的用户"""
+        if not statuses:
+            return
+        
+        ids = list(statuses)
+        online_ids = [account_id for account_id, status in statuses.items() if status == "online"]
+        status_cases = " ".join(["WHEN %s THEN %s"] * len(ids))
+        id_placeholders = ", ".join(["%s"] * len(ids))
+        params = []
+        for account_id in ids:
+            params.extend((account_id, statuses[account_id]))
+        
+        if online_ids:
+            online_placeholders = ", ".join(["%s"] * len(online_ids))
+            last_active_sql = f"CASE WHEN id IN ({online_placeholders}) THEN %s ELSE last_active END"
+            params.extend(online_ids)
+            params.append(checked_at)
+        else:
+            last_active_sql = "last_active"
+        params.extend(ids)
+        
+        async with get_async_db_connection() as conn:
+            cursor = await conn.cursor()
+            await cursor.execute(f"""
+                UPDATE telegram_accounts
+                SET status = CASE id {status_cases} END,
+                    last_active = {last_active_sql}
+                WHERE id IN ({id_placeholders})
+            """, params)
+            await conn.commit()
+        
+        for user_id in user_ids:
+            invalidate_accounts(user_id)
+    
+    @staticmethod
+    def publish_status(user_id: int, account_id: int, status: str, checked_at: datetime):
+        """向订阅的前端推送账号状态变化"""
+        account_event_bus.publish(user_id, {
+            "type": "status",
+            "account_id": account_id,
+            "status": status,
+            "last_active": checked_at.strftime("%Y-%m-%d %H:%M:%S") if status == "online" else None
+        })
+    
+    @staticmethod
+    async def refresh_accounts(user_id: int, limit: Optional[int] = None) -> dict:
+        """刷新用户所有账号状态，返回刷新后账号列表的第一页"""
+        async with get_async_db_connection() as conn:
+            cursor = await conn.cursor()
             
-            cursor.execute("""
+            await cursor.execute("""
                 SELECT id, phone, username, first_name, last_name, telegram_user_id, 
-                       status, last_active, created_at
+                       status, last_active, created_at, session_file
                 FROM telegram_accounts 
                 WHERE user_id = %s
-                ORDER BY created_at DESC
+                ORDER BY created_at DESC, id DESC
             """, (user_id,))
             
-            accounts = cursor.fetchall()
-            
-            result = []
-            for account in accounts:
-                result.append({
-                    "id": account[0],
-                    "phone": account[1],
-                    "username": account[2],
-                    "first_name": account[3],
-                    "last_name": account[4],
-                    "telegram_user_id": account[5],
-                    "status": account[6],
-                    "last_active": account[7].strftime("%Y-%m-%d %H:%M:%S") if account[7] else None,
-                    "created_at": account[8].strftime("%Y-%m-%d %H:%M:%S") if account[8] else None
-                })
-            
-            return result
+            accounts = [list(account) for account in await cursor.fetchall()]
+        
+        # 并发检查（限并发、单账号超时），超时的账号保持原状态；其他节点持有的账号由该节点检查
+        checked = await account_router.check_many(
+            (account[0], account[9]) for account in accounts
+        )
+        checked_at = datetime.now().replace(microsecond=0)
+        
+        # 只写回在线账号（刷新最后活跃时间）和状态发生变化的账号
+        updates = {}
+        for account in accounts:
+            status = checked.get(account[0])
+            if status is None:
+                continue
+            if status != account[6]:
+                TelegramService.publish_status(user_id, account[0], status, checked_at)
+            if status == "online" or status != account[6]:
+                updates[account[0]] = status
+            account[6] = status
+            if status == "online":
+                account[7] = checked_at
+        
+        await TelegramService.update_account_statuses(updates, checked_at, [user_id])
+        
+        # 第一页直接由内存中的结果生成
+        limit = min(limit or ACCOUNT_LIST_CONFIG['default_limit'], ACCOUNT_LIST_CONFIG['max_limit'])
+        rows = [account[:9] + [account[8]] for account in accounts[:limit + 1]]
+        return TelegramService._page_result(rows, ACCOUNT_FIELDS, limit, len(accounts))
     
     @staticmethod
-    def delete_telegram_account(account_id: int, user_id: int) -> dict:
+    async def delete_telegram_account(account_id: int, user_id: int) -> dict:
         """删除Telegram账号"""
         try:
-            with get_db_connection() as conn:
-                cursor = conn.cursor()
+            async with get_async_db_connection() as conn:
+                cursor = await conn.cursor()
                 
                 # 获取session文件路径
-                cursor.execute(
+                await cursor.execute(
                     "SELECT session_file FROM telegram_accounts WHERE id = %s AND user_id = %s",
                     (account_id, user_id)
                 )
-                result = cursor.fetchone()
+                result = await cursor.fetchone()
                 
                 if not result:
                     return {"success": False, "message": "账号不存在"}
@@ -311,15 +573,17 @@ class TelegramService:
                 session_file = result[0]
                 
                 # 删除数据库记录
-                cursor.execute(
+                await cursor.execute(
                     "DELETE FROM telegram_accounts WHERE id = %s AND user_id = %s",
                     (account_id, user_id)
                 )
-                conn.commit()
+                await conn.commit()
+                invalidate_accounts(user_id)
                 
-                # 删除session文件
-                if session_file and os.path.exists(session_file):
-                    os.remove(session_file)
+                # 断开常驻客户端并删除session
+                if session_file:
+                    await telegram_client_manager.remove(session_file)
+                    await session_store.delete(session_file)
                 
                 return {"success": True, "message": "账号删除成功"}
                 
@@ -330,54 +594,29 @@ class TelegramService:
     async def check_account_status(account_id: int, user_id: int) -> dict:
         """检查账号状态"""
         try:
-            with get_db_connection() as conn:
-                cursor = conn.cursor()
+            async with get_async_db_connection() as conn:
+                cursor = await conn.cursor()
                 
-                cursor.execute("""
-                    SELECT session_file, phone, username 
+                await cursor.execute("""
+                    SELECT session_file, status 
                     FROM telegram_accounts 
                     WHERE id = %s AND user_id = %s
                 """, (account_id, user_id))
                 
-                result = cursor.fetchone()
-                if not result:
-                    return {"success": False, "message": "账号不存在"}
-                
-                session_file, phone, username = result
-                
-                if not session_file or not os.path.exists(session_file):
-                    # 更新状态为离线
-                    cursor.execute(
-                        "UPDATE telegram_accounts SET status = 'offline' WHERE id = %s",
-                        (account_id,)
-                    )
-                    conn.commit()
-                    return {"success": True, "status": "offline"}
-                
-                # 尝试连接检查状态
-                client = TelegramClient(session_file, 0, "")  # 使用已有session
-                await client.connect()
-                
-                if await client.is_user_authorized():
-                    status = "online"
-                    # 更新最后活跃时间
-                    cursor.execute("""
-                        UPDATE telegram_accounts 
-                        SET status = %s, last_active = CURRENT_TIMESTAMP 
-                        WHERE id = %s
-                    """, (status, account_id))
-                    conn.commit()
-                else:
-                    status = "offline"
-                    cursor.execute(
-                        "UPDATE telegram_accounts SET status = %s WHERE id = %s",
-                        (status, account_id)
-                    )
-                    conn.commit()
-                
-                await client.disconnect()
-                
-                return {"success": True, "status": status}
+                result = await cursor.fetchone()
+            
+            if not result:
+                return {"success": False, "message": "账号不存在"}
+            
+            session_file, previous = result
+            
+            status = await account_status_checker.check(session_file)
+            checked_at = datetime.now().replace(microsecond=0)
+            await TelegramService.update_account_statuses({account_id: status}, checked_at, [user_id])
+            if status != previous:
+                TelegramService.publish_status(user_id, account_id, status, checked_at)
+            
+            return {"success": True, "status": status}
                 
         except Exception as e:
-            return {"success": False, "message": f"检查状态失败: {str(e)}"} 
\ No newline at end of file
+            return {"success": False, "message": f"检查状态失败: {str(e)}"}
\ No newline at end of file
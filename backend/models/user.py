@@ -1,8 +1,15 @@
 from pydantic import BaseModel
 from typing import Optional
 from datetime import datetime
-import bcrypt
-from config.database import get_db_connection
+import asyncio
+import pymysql
+from config.database import get_async_db_connection
+from services.password_hasher import password_hasher, HashQueueFullError
+from services.auth_tokens import auth_token_service
+from services.username_index import username_index
+
+# 哈希线程池繁忙时返回的统一结果
+BUSY_RESULT = {"success": False, "message": "服务繁忙，请稍后再试", "error_type": "busy"}
 
 class UserCreate(BaseModel):
     username: str
@@ -28,17 +35,17 @@ class UserResponse(BaseModel):
 
 class UserService:
     @staticmethod
-    def hash_password(password: str) -> str:
-        """加密密码"""
-        return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    async def hash_password(password: str) -> str:
+        """加密密码（在哈希线程池中执行）"""
+        return await password_hasher.hash(password)
     
     @staticmethod
-    def verify_password(password: str, hashed_password: str) -> bool:
-        """验证密码"""
-        return bcrypt.checkpw(password.encode('utf-8'), hashed_password.encode('utf-8'))
+    async def verify_password(password: str, hashed_password: str) -> bool:
+        """验证密码（在哈希线程池中执行）"""
+        return await password_hasher.verify(password, hashed_password)
     
     @staticmethod
-    def create_user(user_data: UserCreate) -> dict:
+    async def create_user(user_data: UserCreate) -> dict:
         """创建用户"""
         # 验证密码确认
         if user_data.password != user_data.confirm_password:
@@ -53,67 +60,88 @@ class UserService:
             return {"success": False, "message": "用户名长度不能少于3位"}
         
         try:
-            with get_db_connection() as conn:
-                cursor = conn.cursor()
-                
-                # 检查用户名是否已存在
-                cursor.execute("SELECT id FROM users WHERE username = %s", (user_data.username,))
-                if cursor.fetchone():
-                    return {"success": False, "message": "用户名已存在"}
+            # 检查用户名是否已存在（过滤器判定一定不存在时跳过查询，并发注册由唯一键兜底）；
+            # 在获取连接前查询过滤器，未命中时增量加载需要另一个连接
+            if await username_index.exists(user_data.username):
+                async with get_async_db_connection() as conn:
+                    cursor = await conn.cursor()
+                    await cursor.execute("SELECT id FROM users WHERE username = %s", (user_data.username,))
+                    if await cursor.fetchone():
+                        return {"success": False, "message": "用户名已存在"}
+            
+            # 哈希计算耗时较长，不占用数据库连接
+            password_hash, secret_phrase_hash = await asyncio.gather(
+                UserService.hash_password(user_data.password),
+                UserService.hash_password(user_data.secret_phrase)
+            )
+            
+            async with get_async_db_connection() as conn:
+                cursor = await conn.cursor()
                 
                 # 创建用户
-                password_hash = UserService.hash_password(user_data.password)
-                secret_phrase_hash = UserService.hash_password(user_data.secret_phrase)
-                
-                cursor.execute(
+                await cursor.execute(
                     "INSERT INTO users (username, password_hash, secret_phrase) VALUES (%s, %s, %s)",
                     (user_data.username, password_hash, secret_phrase_hash)
                 )
-                conn.commit()
+                await conn.commit()
+                username_index.register(user_data.username)
                 
                 return {"success": True, "message": "注册成功"}
                 
+        except HashQueueFullError:
+            return dict(BUSY_RESULT)
+        except pymysql.err.IntegrityError as e:
+            if e.args and e.args[0] == 1062:
+                username_index.add(user_data.username)
+                return {"success": False, "message": "用户名已存在"}
+            return {"success": False, "message": f"注册失败: {str(e)}"}
         except Exception as e:
             return {"success": False, "message": f"注册失败: {str(e)}"}
     
     @staticmethod
-    def login_user(login_data: UserLogin) -> dict:
+    async def login_user(login_data: UserLogin) -> dict:
         """用户登录"""
+        if not await username_index.exists(login_data.username):
+            return {"success": False, "message": "用户名不存在"}
         try:
-            with get_db_connection() as conn:
-                cursor = conn.cursor()
+            async with get_async_db_connection() as conn:
+                cursor = await conn.cursor()
                 
-                cursor.execute(
+                await cursor.execute(
                     "SELECT id, username, password_hash, is_active FROM users WHERE username = %s",
                     (login_data.username,)
                 )
-                user = cursor.fetchone()
-                
-                if not user:
-                    return {"success": False, "message": "用户名不存在"}
-                
-                user_id, username, password_hash, is_active = user
-                
-                if not is_active:
-                    return {"success": False, "message": "账号已被禁用"}
-                
-                if not UserService.verify_password(login_data.password, password_hash):
-                    return {"success": False, "message": "密码错误"}
-                
-                return {
-                    "success": True, 
-                    "message": "登录成功",
-                    "user": {
-                        "id": user_id,
-                        "username": username
-                    }
-                }
-                
+                user = await cursor.fetchone()
+            
+            if not user:
+                return {"success": False, "message": "用户名不存在"}
+            
+            user_id, username, password_hash, is_active = user
+            
+            if not is_active:
+                return {"success": False, "message": "账号已被禁用"}
+            
+            # 连接已归还，校验密码期间不占用连接池
+            if not await UserService.verify_password(login_data.password, password_hash):
+                return {"success": False, "message": "密码错误"}
+            
+            return {
+                "success": True, 
+                "message": "登录成功",
+                "user": {
+                    "id": user_id,
+                    "username": username
+                },
+                "token": auth_token_service.create_token(user_id, username)
+            }
+            
+        except HashQueueFullError:
+            return dict(BUSY_RESULT)
         except Exception as e:
             return {"success": False, "message": f"登录失败: {str(e)}"}
     
     @staticmethod
-    def reset_password(reset_data: UserResetPassword) -> dict:
+    async def reset_password(reset_data: UserResetPassword) -> dict:
         """重置密码"""
         # 验证新密码确认
         if reset_data.new_password != reset_data.confirm_new_password:
@@ -123,33 +151,54 @@ class UserService:
         if len(reset_data.new_password) < 6:
             return {"success": False, "message": "新密码长度不能少于6位"}
         
+        if not await username_index.exists(reset_data.username):
+            return {"success": False, "message": "用户名不存在"}
+        
         try:
-            with get_db_connection() as conn:
-                cursor = conn.cursor()
+            async with get_async_db_connection() as conn:
+                cursor = await conn.cursor()
                 
-                cursor.execute(
+                await cursor.execute(
                     "SELECT id, secret_phrase FROM users WHERE username = %s",
                     (reset_data.username,)
                 )
-                user = cursor.fetchone()
-                
-                if not user:
-                    return {"success": False, "message": "用户名不存在"}
-                
-                user_id, secret_phrase_hash = user
-                
-                if not UserService.verify_password(reset_data.secret_phrase, secret_phrase_hash):
-                    return {"success": False, "message": "暗语错误"}
-                
-                # 更新密码
-                new_password_hash = UserService.hash_password(reset_data.new_password)
-                cursor.execute(
+                user = await cursor.fetchone()
+            
+            if not user:
+                return {"success": False, "message": "用户名不存在"}
+            
+            user_id, secret_phrase_hash = user
+            
+            # 校验暗语和计算新密码哈希时不占用数据库连接
+            if not await UserService.verify_password(reset_data.secret_phrase, secret_phrase_hash):
+                return {"success": False, "message": "暗语错误"}
+            
+            new_password_hash = await UserService.hash_password(reset_data.new_password)
+            
+            # 更新密码
+            async with get_async_db_connection() as conn:
+                cursor = await conn.cursor()
+                await cursor.execute(
                     "UPDATE users SET password_hash = %s WHERE id = %s",
                     (new_password_hash, user_id)
                 )
-                conn.commit()
-                
-                return {"success": True, "message": "密码重置成功"}
-                
+                await conn.commit()
+            
+            # 重置密码后此前签发的令牌全部失效
+            await auth_token_service.revoke_user(user_id)
+            
+            return {"success": True, "message": "密码重置成功"}
+            
+        except HashQueueFullError:
+            return dict(BUSY_RESULT)
         except Exception as e:
-            return {"success": False, "message": f"密码重置失败: {str(e)}"} 
\ No newline at end of file
+            return {"success": False, "message": f"密码重置失败: {str(e)}"}
+    
+    @staticmethod
+    async def get_user_active(user_id: int) -> Optional[bool]:
+        """查询用户是否启用，用户不存在时返回None"""
+        async with get_async_db_connection() as conn:
+            cursor = await conn.cursor()
+            await cursor.execute("SELECT is_active FROM users WHERE id = %s", (user_id,))
+            row = await cursor.fetchone()
+            return bool(row[0]) if row else None
\ No newline at end of file
@@ -0,0 +1,53 @@
+import asyncio
+from typing import Callable, Dict, List, Set
+from config.telegram import EVENT_STREAM_CONFIG
+
+class AccountEventBus:
+    """按用户分发账号事件的内存发布/订阅
+
+    每个订阅连接有独立的有界队列，消费慢的连接只会丢弃自己最旧的事件，不影响发布方。
+    """
+
+    def __init__(self, queue_size: int = 100):
+        self.queue_size = queue_size
+        self._subscribers: Dict[int, Set[asyncio.Queue]] = {}
+        self._listeners: List[Callable[[int, dict], None]] = []
+
+    @property
+    def subscriber_count(self) -> int:
+        return sum(len(queues) for queues in self._subscribers.values())
+
+    def subscribe(self, user_id: int) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(user_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, user_id: int, queue: asyncio.Queue):
+        queues = self._subscribers.get(user_id)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._subscribers[user_id]
+
+    def has_subscribers(self, user_id: int) -> bool:
+        return user_id in self._subscribers
+
+    def add_listener(self, callback: Callable[[int, dict], None]):
+        """接收所有用户的事件（客户端进程用于把事件转发给API进程）"""
+        self._listeners.append(callback)
+
+    def publish(self, user_id: int, event: dict):
+        """向用户的所有订阅连接推送事件"""
+        for callback in self._listeners:
+            callback(user_id, event)
+        self.deliver(user_id, event)
+
+    def deliver(self, user_id: int, event: dict):
+        """只推送给本进程的订阅连接，不通知listener（用于其他节点转来的事件）"""
+        for queue in self._subscribers.get(user_id, ()):
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+account_event_bus = AccountEventBus(queue_size=EVENT_STREAM_CONFIG['queue_size'])
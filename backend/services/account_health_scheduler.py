@@ -0,0 +1,104 @@
+import asyncio
+import random
+import time
+from datetime import datetime
+from config.database import get_async_db_connection
+from config.telegram import HEALTH_SCHEDULER_CONFIG
+from models.telegram import TelegramService
+from services.account_leases import account_lease_manager
+from services.account_status_checker import account_status_checker
+from services.telegram_rate_limiter import rpc_priority, PRIORITY_BACKGROUND
+
+class AccountHealthScheduler:
+    """后台账号健康检查
+
+    每轮把所有账号的检查均匀分散在interval秒内（带随机抖动），Telegram请求平稳而非突发；
+    状态结果定期批量写回数据库，状态变化即时推送给订阅的前端。
+    """
+
+    def __init__(self, enabled: bool = True, interval: float = 300, jitter: float = 0.2,
+                 flush_interval: float = 5):
+        self.enabled = enabled
+        self.interval = interval
+        self.jitter = jitter
+        self.flush_interval = flush_interval
+        self._task = None
+        self._checks = set()
+        self._pending = {}
+        self._pending_users = set()
+        self._last_flush = time.monotonic()
+
+    async def _load_accounts(self) -> list:
+        async with get_async_db_connection() as conn:
+            cursor = await conn.cursor()
+            await cursor.execute("SELECT id, user_id, status, session_file FROM telegram_accounts")
+            # 只检查本节点持有（或尚无节点持有）的账号
+            return [account for account in await cursor.fetchall() if account_lease_manager.node_for(account[0]) is None]
+
+    async def _check(self, account_id: int, user_id: int, previous: str, session_file: str):
+        try:
+            status = await account_status_checker.check(session_file)
+        except Exception:
+            return
+        self._pending[account_id] = status
+        self._pending_users.add(user_id)
+        if status != previous:
+            TelegramService.publish_status(user_id, account_id, status, datetime.now().replace(microsecond=0))
+
+    async def _flush(self):
+        """批量写回已检查账号的状态"""
+        self._last_flush = time.monotonic()
+        if not self._pending:
+            return
+        updates, self._pending = self._pending, {}
+        user_ids, self._pending_users = self._pending_users, set()
+        try:
+            await TelegramService.update_account_statuses(updates, datetime.now().replace(microsecond=0), user_ids)
+        except Exception as e:
+            print(f"写回账号状态失败: {e}")
+
+    async def run_cycle(self):
+        """执行一轮检查"""
+        accounts = await self._load_accounts()
+        if not accounts:
+            await asyncio.sleep(self.interval)
+            return
+        random.shuffle(accounts)
+        spacing = self.interval / len(accounts)
+        for account_id, user_id, previous, session_file in accounts:
+            task = asyncio.create_task(self._check(account_id, user_id, previous, session_file))
+            self._checks.add(task)
+            task.add_done_callback(self._checks.discard)
+            if time.monotonic() - self._last_flush >= self.flush_interval:
+                await self._flush()
+            await asyncio.sleep(spacing * random.uniform(1 - self.jitter, 1 + self.jitter))
+        if self._checks:
+            await asyncio.wait(set(self._checks))
+        await self._flush()
+
+    async def _run(self):
+        # 启动时随机延迟，多个实例不会同时开始
+        await asyncio.sleep(random.uniform(0, self.interval * self.jitter))
+        # 后台检查的Telegram请求排在交互式登录之后
+        with rpc_priority(PRIORITY_BACKGROUND):
+            while True:
+                try:
+                    await self.run_cycle()
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    print(f"账号健康检查失败: {e}")
+                    await asyncio.sleep(self.interval * random.uniform(1 - self.jitter, 1 + self.jitter))
+
+    def start(self):
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        for task in list(self._checks):
+            task.cancel()
+
+account_health_scheduler = AccountHealthScheduler(**HEALTH_SCHEDULER_CONFIG)
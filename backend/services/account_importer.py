@@ -0,0 +1,150 @@
+import asyncio
+import os
+import tempfile
+import zlib
+from typing import List, Optional
+from config.telegram import IMPORT_CONFIG
+from models.telegram import TelegramService
+from services.account_leases import account_lease_manager
+from services.session_store import session_store
+from services.telegram_client_manager import telegram_client_manager
+from services.startup_report import lazy_import
+from services.telegram_rate_limiter import api_credential_pool
+
+class AccountImporter:
+    """批量导入已有session
+
+    并发（限并发数、单个超时）连接并用get_me校验每个session，
+    通过校验的session和账号分别批量写入，返回逐条结果。
+    """
+
+    def __init__(self, concurrency: int = 10, timeout: float = 20, max_items: int = 1000):
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.max_items = max_items
+
+    @staticmethod
+    def session_file_to_string(content: bytes) -> Optional[str]:
+        """把上传的SQLite session文件内容转换为StringSession字符串"""
+        fd, path = tempfile.mkstemp(suffix=".session")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(content)
+            sessions = lazy_import("telethon.sessions")
+            session = sessions.SQLiteSession(path)
+            try:
+                return sessions.StringSession.save(session) or None
+            finally:
+                session.close()
+        except Exception:
+            return None
+        finally:
+            os.remove(path)
+
+    async def _validate(self, session_string: str, api_id: Optional[int], api_hash: Optional[str]):
+        """连接并校验session，成功返回(客户端, 用户信息, 使用的(api_id, api_hash))"""
+        # 校验前还不知道手机号，以session内容作为限流和分配凭据的账号标识
+        key = f"import:{zlib.crc32(session_string.encode())}"
+        api_id, api_hash = api_credential_pool.resolve(key, api_id, api_hash)
+        client = telegram_client_manager.create_client(
+            lazy_import("telethon.sessions").StringSession(session_string), api_id, api_hash, key
+        )
+        try:
+            await telegram_client_manager.connect(client)
+            if not await client.is_user_authorized():
+                raise ValueError("session未授权或已失效")
+            me = await client.get_me()
+            return client, me, (api_id, api_hash)
+        except BaseException:
+            await client.disconnect()
+            raise
+
+    async def import_sessions(self, user_id: int, items: List[dict]) -> dict:
+        """导入session，items中每项包含session_string、api_id、api_hash"""
+        if len(items) > self.max_items:
+            raise ValueError(f"单次最多导入{self.max_items}个账号")
+        
+        semaphore = asyncio.Semaphore(self.concurrency)
+        results = [{"index": index, "success": False} for index in range(len(items))]
+
+        async def validate(index: int, item: dict):
+            if not item.get("session_string"):
+                results[index]["message"] = "session无效"
+                return None
+            async with semaphore:
+                try:
+                    return await asyncio.wait_for(
+                        self._validate(item["session_string"], item.get("api_id"), item.get("api_hash")),
+                        self.timeout
+                    )
+                except asyncio.TimeoutError:
+                    results[index]["message"] = "校验超时"
+                except Exception as e:
+                    results[index]["message"] = f"校验失败: {str(e)}"
+                return None
+
+        validated = await asyncio.gather(*(validate(index, item) for index, item in enumerate(items)))
+        
+        # 同一手机号出现多次时以最后一个为准
+        accepted = {}
+        for index, result in enumerate(validated):
+            if result is None:
+                continue
+            client, me, credentials = result
+            phone = f"+{me.phone}" if me.phone else None
+            results[index]["phone"] = phone
+            if not phone:
+                results[index]["message"] = "无法获取手机号"
+                await client.disconnect()
+                continue
+            if phone in accepted:
+                previous_index, previous_client, _, _ = accepted[phone]
+                results[previous_index]["message"] = "与后续条目手机号重复，已忽略"
+                await previous_client.disconnect()
+            accepted[phone] = (index, client, me, credentials)
+        
+        if accepted:
+            try:
+                await session_store.save_many(
+                    (session_store.session_ref(phone), client) for phone, (_, client, _, _) in accepted.items()
+                )
+                account_ids = await TelegramService.save_telegram_accounts(user_id, [
+                    {
+                        "user_id": user_id,
+                        "phone": phone,
+                        "username": me.username,
+                        "first_name": me.first_name,
+                        "last_name": me.last_name,
+                        "telegram_user_id": me.id,
+                        "session_file": session_store.session_ref(phone),
+                        "status": "online",
+                        # 校验时使用的凭据与session绑定，之后重新连接沿用同一组
+                        "api_id": credentials[0],
+                        "api_hash": credentials[1]
+                    }
+                    for phone, (_, _, me, credentials) in accepted.items()
+                ])
+            except Exception as e:
+                for phone, (index, client, _, _) in accepted.items():
+                    results[index]["message"] = f"保存失败: {str(e)}"
+                    await client.disconnect()
+                accepted = {}
+                account_ids = {}
+            
+            for phone, (index, client, _, _) in accepted.items():
+                results[index].update(success=True, message="导入成功", account_id=account_ids.get(phone))
+                # 已授权的客户端直接常驻，后续状态检查无需重新握手
+                await telegram_client_manager.adopt(session_store.session_ref(phone), client)
+            await account_lease_manager.claim_accounts(
+                (account_ids[phone], session_store.session_ref(phone)) for phone in accepted if phone in account_ids
+            )
+        
+        imported = sum(1 for result in results if result["success"])
+        return {
+            "total": len(items),
+            "imported": imported,
+            "failed": len(items) - imported,
+            "results": results
+        }
+
+account_importer = AccountImporter(**IMPORT_CONFIG)
@@ -0,0 +1,237 @@
+import asyncio
+import math
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from config.cluster import CLUSTER_CONFIG
+from config.database import get_async_db_connection
+from services.telegram_client_manager import telegram_client_manager
+
+class AccountLeaseManager:
+    """账号分片：每个节点通过MySQL中可续约的租约持有一部分账号
+
+    节点定期续约自己的租约，并按"账号总数 / 存活节点数"认领无主或已过期的账号，
+    超出份额时释放多余账号，由其他节点认领。只有持有租约的节点连接该账号的客户端、
+    执行健康检查和信号收发，其他节点收到该账号的请求时转发给持有者。
+    尚未被任何节点认领的账号视为本地账号处理。
+
+    续约成功时记录本地时间；超过租约有效期仍未续约成功（数据库不可用、续约卡住）时，
+    其他节点可能已接管这些账号，本节点立即断开并暂停使用，直到下一次续约成功。
+    """
+
+    def __init__(self, node_id: str, node_url: str, lease_ttl: float = 30, renew_interval: float = 10, **_):
+        self.node_id = node_id
+        self.node_url = node_url
+        self.lease_ttl = int(lease_ttl)
+        self.renew_interval = renew_interval
+        self.owned = {}       # 本节点持有的 账号ID -> session标识
+        self.owners = {}      # 所有有效租约 账号ID -> (节点标识, 节点地址)
+        self._listeners = []
+        self._renewed_at = 0.0    # 最近一次续约成功时（开始续约的）本地时间
+        self._task = None
+        self._fence_task = None
+
+    def is_owned(self, account_id: int) -> bool:
+        return account_id in self.owned
+
+    def node_for(self, account_id: int) -> Optional[str]:
+        """账号由其他节点持有时返回该节点地址，本节点持有或无主时返回None"""
+        owner = self.owners.get(account_id)
+        if owner is None or owner[0] == self.node_id:
+            return None
+        return owner[1]
+
+    def on_change(self, callback: Callable[[], None]):
+        """注册持有账号变化时的回调"""
+        self._listeners.append(callback)
+
+    def _notify(self):
+        for callback in self._listeners:
+            callback()
+
+    async def renew(self):
+        """续约、按份额认领或释放账号，并刷新租约信息"""
+        # 数据库中的过期时间从执行续约时算起，本地以开始续约的时间计算有效期，不会晚于数据库
+        started = time.monotonic()
+        expires = f"NOW() + INTERVAL {self.lease_ttl} SECOND"
+        async with get_async_db_connection() as conn:
+            cursor = await conn.cursor()
+            # 只续约账号租约，验证码登录的记录按自身有效期过期
+            await cursor.execute(
+                f"UPDATE account_leases SET expires_at = {expires} WHERE owner = %s AND account_id IS NOT NULL",
+                (self.node_id,)
+            )
+            await cursor.execute("DELETE FROM account_leases WHERE account_id IS NULL AND expires_at < NOW()")
+
+            await cursor.execute("SELECT COUNT(*) FROM telegram_accounts")
+            total = (await cursor.fetchone())[0]
+            await cursor.execute("""
+                SELECT owner, COUNT(*) FROM account_leases
+                WHERE account_id IS NOT NULL AND expires_at > NOW()
+                GROUP BY owner
+            """)
+            counts = dict(await cursor.fetchall())
+            mine = counts.get(self.node_id, 0)
+            nodes = len(set(counts) | {self.node_id})
+            share = math.ceil(total / nodes) if total else 0
+
+            if mine < share:
+                need = share - mine
+                # 先接管过期的租约，再认领还没有租约的账号
+                await cursor.execute(f"""
+                    UPDATE account_leases SET owner = %s, node_url = %s, expires_at = {expires}
+                    WHERE account_id IS NOT NULL AND expires_at < NOW()
+                    LIMIT %s
+                """, (self.node_id, self.node_url, need))
+                need -= cursor.rowcount
+                if need > 0:
+                    await cursor.execute(f"""
+                        INSERT IGNORE INTO account_leases (lease_key, account_id, owner, node_url, expires_at)
+                        SELECT CONCAT('account:', a.id), a.id, %s, %s, {expires}
+                        FROM telegram_accounts a
+                        LEFT JOIN account_leases l ON l.account_id = a.id
+                        WHERE l.lease_key IS NULL
+                        LIMIT %s
+                    """, (self.node_id, self.node_url, need))
+            elif nodes > 1 and mine > share + 1:
+                # 有新节点加入时逐步释放多余账号
+                await cursor.execute("""
+                    DELETE FROM account_leases WHERE owner = %s AND account_id IS NOT NULL
+                    ORDER BY account_id DESC LIMIT %s
+                """, (self.node_id, mine - share))
+            await conn.commit()
+
+            await cursor.execute("""
+                SELECT l.account_id, l.owner, l.node_url, a.session_file
+                FROM account_leases l
+                JOIN telegram_accounts a ON a.id = l.account_id
+                WHERE l.expires_at > NOW()
+            """)
+            rows = await cursor.fetchall()
+
+        self._renewed_at = started
+        telegram_client_manager.suspend(())
+        self.owners = {account_id: (owner, node_url) for account_id, owner, node_url, _ in rows}
+        owned = {account_id: session_file for account_id, owner, _, session_file in rows if owner == self.node_id}
+        lost = [session_file for account_id, session_file in self.owned.items() if account_id not in owned]
+        changed = owned.keys() != self.owned.keys()
+        self.owned = owned
+        # 失去租约的账号由新持有者连接，本节点断开，避免两个节点同时使用同一session
+        for session_file in lost:
+            if session_file:
+                await telegram_client_manager.remove(session_file)
+        if changed:
+            self._notify()
+
+    async def claim_accounts(self, accounts: Iterable[Tuple[int, Optional[str]]]):
+        """接管本节点刚登录或导入的账号
+
+        已授权的客户端就在本节点，租约直接转到本节点；原持有节点在下一轮续约时发现失去租约并断开。
+        持有数超出份额的部分在之后的续约中逐步释放。
+        """
+        accounts = list(accounts)
+        if not accounts:
+            return
+        async with get_async_db_connection() as conn:
+            cursor = await conn.cursor()
+            await cursor.executemany(f"""
+                INSERT INTO account_leases (lease_key, account_id, owner, node_url, expires_at)
+                VALUES (%s, %s, %s, %s, NOW() + INTERVAL {self.lease_ttl} SECOND)
+                ON DUPLICATE KEY UPDATE owner = VALUES(owner), node_url = VALUES(node_url), expires_at = VALUES(expires_at)
+            """, [(f"account:{account_id}", account_id, self.node_id, self.node_url) for account_id, _ in accounts])
+            await conn.commit()
+        for account_id, session_file in accounts:
+            self.owners[account_id] = (self.node_id, self.node_url)
+            self.owned[account_id] = session_file
+
+    async def claim_login(self, phone: str, ttl: float):
+        """记录发送验证码的节点，验证登录时转发到该节点（待验证的客户端只在该节点内存中）"""
+        async with get_async_db_connection() as conn:
+            cursor = await conn.cursor()
+            await cursor.execute(f"""
+                INSERT INTO account_leases (lease_key, owner, node_url, expires_at)
+                VALUES (%s, %s, %s, NOW() + INTERVAL {int(ttl)} SECOND)
+                ON DUPLICATE KEY UPDATE owner = VALUES(owner), node_url = VALUES(node_url), expires_at = VALUES(expires_at)
+            """, (f"login:{phone}", self.node_id, self.node_url))
+            await conn.commit()
+
+    async def login_node(self, phone: str) -> Optional[str]:
+        """发送验证码的节点不是本节点时返回其地址"""
+        async with get_async_db_connection() as conn:
+            cursor = await conn.cursor()
+            await cursor.execute(
+                "SELECT owner, node_url FROM account_leases WHERE lease_key = %s AND expires_at > NOW()",
+                (f"login:{phone}",)
+            )
+            row = await cursor.fetchone()
+        if row is None or row[0] == self.node_id:
+            return None
+        return row[1]
+
+    async def release_login(self, phone: str):
+        async with get_async_db_connection() as conn:
+            cursor = await conn.cursor()
+            await cursor.execute(
+                "DELETE FROM account_leases WHERE lease_key = %s AND owner = %s",
+                (f"login:{phone}", self.node_id)
+            )
+            await conn.commit()
+
+    def split(self, account_ids: Iterable[int]) -> Tuple[List[int], Dict[str, List[int]]]:
+        """按持有节点拆分账号：(本地处理的账号, {节点地址: 账号列表})"""
+        local, remote = [], {}
+        for account_id in account_ids:
+            node_url = self.node_for(account_id)
+            if node_url is None:
+                local.append(account_id)
+            else:
+                remote.setdefault(node_url, []).append(account_id)
+        return local, remote
+
+    async def _fence(self):
+        """租约过期前未续约成功时断开本节点持有的账号"""
+        while True:
+            remaining = self._renewed_at + self.lease_ttl - time.monotonic()
+            if remaining > 0:
+                await asyncio.sleep(remaining)
+                continue
+            if self.owned:
+                print(f"账号租约超过{self.lease_ttl}秒未续约成功，断开本节点持有的 {len(self.owned)} 个账号")
+                owned, self.owned = self.owned, {}
+                session_files = [session_file for session_file in owned.values() if session_file]
+                telegram_client_manager.suspend(session_files)
+                for account_id in owned:
+                    self.owners.pop(account_id, None)
+                for session_file in session_files:
+                    await telegram_client_manager.remove(session_file)
+                self._notify()
+            await asyncio.sleep(self.renew_interval)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.renew_interval)
+            try:
+                await self.renew()
+            except Exception as e:
+                print(f"账号租约续约失败: {e}")
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            self._fence_task = asyncio.create_task(self._fence())
+
+    async def stop(self):
+        """停止续约并释放本节点的租约，其他节点可立即接管"""
+        if self._task is not None:
+            self._task.cancel()
+            self._fence_task.cancel()
+            self._task = self._fence_task = None
+        try:
+            async with get_async_db_connection() as conn:
+                cursor = await conn.cursor()
+                await cursor.execute("DELETE FROM account_leases WHERE owner = %s", (self.node_id,))
+                await conn.commit()
+        except Exception as e:
+            print(f"释放账号租约失败: {e}")
+        self.owned = {}
+
+account_lease_manager = AccountLeaseManager(**CLUSTER_CONFIG)
@@ -0,0 +1,88 @@
+import asyncio
+from typing import Dict, Iterable, Optional, Tuple
+import httpx
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from config.cluster import CLUSTER_CONFIG
+from services.account_leases import account_lease_manager
+from services.account_status_checker import account_status_checker
+
+FORWARDED_HEADER = "X-Forwarded-Node"
+CLUSTER_KEY_HEADER = "X-Cluster-Key"
+
+class AccountRouter:
+    """把账号相关的请求路由到持有该账号租约的节点"""
+
+    def __init__(self, secret: str, forward_timeout: float = 30, **_):
+        self.secret = secret
+        self.timeout = forward_timeout
+        self._client = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=self.timeout)
+        return self._client
+
+    @staticmethod
+    def should_forward(request: Request, node_url: Optional[str]) -> bool:
+        """已经转发过的请求不再转发，避免租约信息不一致时节点间来回转发"""
+        return node_url is not None and FORWARDED_HEADER not in request.headers
+
+    async def forward(self, request: Request, node_url: str, json: Optional[dict] = None) -> JSONResponse:
+        """转发用户请求到其他节点，原样返回状态码和结果"""
+        headers = {FORWARDED_HEADER: account_lease_manager.node_id}
+        if "authorization" in request.headers:
+            headers["Authorization"] = request.headers["authorization"]
+        response = await self.client.request(
+            request.method, f"{node_url}{request.url.path}",
+            params=request.query_params, json=json, headers=headers
+        )
+        return JSONResponse(status_code=response.status_code, content=response.json())
+
+    async def _internal(self, node_url: str, path: str, payload: dict) -> dict:
+        response = await self.client.post(
+            f"{node_url}/api/internal/{path}", json=payload,
+            headers={CLUSTER_KEY_HEADER: self.secret, FORWARDED_HEADER: account_lease_manager.node_id}
+        )
+        response.raise_for_status()
+        return response.json()
+
+    async def check_many(self, accounts: Iterable[Tuple[int, Optional[str]]]) -> Dict[int, str]:
+        """批量检查账号状态：本节点的账号直接检查，其他节点的账号按节点分组转发"""
+        session_files = dict(accounts)
+        local, remote = account_lease_manager.split(session_files)
+
+        async def check_remote(node_url: str, account_ids: list) -> Dict[int, str]:
+            try:
+                result = await self._internal(node_url, "check_accounts", {
+                    "accounts": [[account_id, session_files[account_id]] for account_id in account_ids]
+                })
+            except Exception as e:
+                # 节点不可用时这些账号保持原状态，租约过期后由其他节点接管
+                print(f"转发账号检查到 {node_url} 失败: {e}")
+                return {}
+            return {int(account_id): status for account_id, status in result["statuses"].items()}
+
+        results = await asyncio.gather(
+            account_status_checker.check_many((account_id, session_files[account_id]) for account_id in local),
+            *(check_remote(node_url, account_ids) for node_url, account_ids in remote.items())
+        )
+        statuses = {}
+        for result in results:
+            statuses.update(result)
+        return statuses
+
+    async def send_message(self, node_url: str, session_file: str, target: str, html: str) -> int:
+        """由持有账号的节点发送消息（HTML格式），返回发送的消息ID"""
+        result = await self._internal(node_url, "send_message", {
+            "session_file": session_file, "target": target, "html": html
+        })
+        return result["message_id"]
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+account_router = AccountRouter(**CLUSTER_CONFIG)
@@ -0,0 +1,49 @@
+import asyncio
+from typing import Dict, Iterable, Optional, Tuple
+from config.telegram import STATUS_CHECK_CONFIG
+from services.telegram_client_manager import telegram_client_manager
+
+class AccountStatusChecker:
+    """并发检查账号在线状态
+
+    并发数由信号量限制，每个账号单独设置超时；超时或出错的账号不返回结果，
+    调用方保持其原状态，避免一个卡住的账号拖慢整批检查。
+    """
+
+    def __init__(self, concurrency: int = 20, timeout: float = 10):
+        self.concurrency = concurrency
+        self.timeout = timeout
+
+    @staticmethod
+    async def probe(session_file: Optional[str]) -> str:
+        """检查单个session是否已授权，返回online/offline"""
+        # 复用常驻客户端检查状态，没有时加载已有session新建
+        client = await telegram_client_manager.get_account_client(session_file) if session_file else None
+        if client is None:
+            return "offline"
+        if await client.is_user_authorized():
+            return "online"
+        
+        # 未授权的客户端不再常驻
+        await telegram_client_manager.remove(session_file)
+        return "offline"
+
+    async def check(self, session_file: Optional[str]) -> str:
+        """带超时检查单个账号"""
+        return await asyncio.wait_for(self.probe(session_file), self.timeout)
+
+    async def check_many(self, accounts: Iterable[Tuple[int, Optional[str]]]) -> Dict[int, str]:
+        """批量检查账号，accounts为(账号ID, session文件)序列，返回{账号ID: 状态}"""
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def run(account_id: int, session_file: Optional[str]):
+            async with semaphore:
+                try:
+                    return account_id, await self.check(session_file)
+                except Exception:
+                    return account_id, None
+
+        results = await asyncio.gather(*(run(account_id, session_file) for account_id, session_file in accounts))
+        return {account_id: status for account_id, status in results if status is not None}
+
+account_status_checker = AccountStatusChecker(**STATUS_CHECK_CONFIG)
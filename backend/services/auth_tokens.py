@@ -0,0 +1,135 @@
+import hmac
+import time
+import uuid
+from typing import Awaitable, Callable, Optional
+from jose import jwt, JWTError
+from config.auth import TOKEN_CONFIG, ADMIN_CONFIG
+from config.database import get_async_db_connection
+from services.cluster_events import cluster_events
+from services.ttl_cache import TTLCache
+
+class TokenError(Exception):
+    """令牌无效、过期或已注销"""
+    pass
+
+class AuthTokenService:
+    """签名令牌的签发与校验
+
+    令牌为HS256签名的JWT，校验只做内存计算；用户状态（is_active）走TTL缓存，
+    注销列表与"某时间点前签发的令牌全部失效"记录在内存中校验，因此绝大多数请求的鉴权不访问数据库。
+    注销记录同时写入auth_revocations表（启动时加载），并经集群事件通知其他节点。
+    """
+
+    def __init__(self, secret_key: str, algorithm: str = 'HS256', expire_minutes: int = 1440,
+                 user_cache_ttl: float = 60, user_cache_size: int = 10000):
+        self.secret_key = secret_key
+        self.algorithm = algorithm
+        self.expire_seconds = expire_minutes * 60
+        self._user_cache = TTLCache(ttl=user_cache_ttl, max_size=user_cache_size)
+        self._revoked = {}        # jti -> 令牌过期时间，过期后自动清理
+        self._not_before = {}     # user_id -> 该时间之前签发的令牌失效（如重置密码后）
+        cluster_events.on("auth_revoke", lambda _, data: self._apply_revoke(data["jti"], data["exp"]))
+        cluster_events.on("auth_revoke_user", lambda user_id, data: self._apply_revoke_user(user_id, data["not_before"]))
+
+    @property
+    def user_cache(self) -> TTLCache:
+        return self._user_cache
+
+    def create_token(self, user_id: int, username: str) -> dict:
+        """签发访问令牌"""
+        now = int(time.time())
+        claims = {
+            "sub": str(user_id),
+            "username": username,
+            "iat": now,
+            "exp": now + self.expire_seconds,
+            "jti": uuid.uuid4().hex
+        }
+        return {
+            "access_token": jwt.encode(claims, self.secret_key, algorithm=self.algorithm),
+            "token_type": "bearer",
+            "expires_in": self.expire_seconds
+        }
+
+    def decode(self, token: str) -> dict:
+        """校验签名、有效期和注销状态，返回令牌内容"""
+        try:
+            claims = jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
+        except JWTError as e:
+            raise TokenError(f"令牌无效: {str(e)}")
+        if claims.get("jti") in self._revoked:
+            raise TokenError("令牌已注销")
+        not_before = self._not_before.get(int(claims["sub"]))
+        if not_before is not None and claims.get("iat", 0) < not_before:
+            raise TokenError("令牌已失效，请重新登录")
+        return claims
+
+    def _apply_revoke(self, jti: str, exp: int):
+        self._purge_revoked()
+        self._revoked[jti] = exp
+
+    def _apply_revoke_user(self, user_id: int, not_before: int):
+        self._not_before[user_id] = max(not_before, self._not_before.get(user_id, 0))
+        self._user_cache.invalidate(user_id)
+
+    async def revoke(self, claims: dict):
+        """注销单个令牌"""
+        self._apply_revoke(claims["jti"], claims["exp"])
+        await self._save_revocation(claims["jti"], None, None, claims["exp"])
+        cluster_events.emit("auth_revoke", data={"jti": claims["jti"], "exp": claims["exp"]})
+
+    async def revoke_user(self, user_id: int):
+        """使用户此前签发的所有令牌失效"""
+        now = int(time.time())
+        self._apply_revoke_user(user_id, now)
+        # 此后签发的令牌有效期内该记录都需要保留
+        await self._save_revocation(f"user:{user_id}", user_id, now, now + self.expire_seconds)
+        cluster_events.emit("auth_revoke_user", user_id, {"not_before": now})
+
+    @staticmethod
+    async def _save_revocation(key: str, user_id: Optional[int], not_before: Optional[int], expires_at: int):
+        async with get_async_db_connection() as conn:
+            cursor = await conn.cursor()
+            await cursor.execute("""
+                INSERT INTO auth_revocations (revocation_key, user_id, not_before, expires_at)
+                VALUES (%s, %s, %s, %s)
+                ON DUPLICATE KEY UPDATE not_before = VALUES(not_before), expires_at = VALUES(expires_at)
+            """, (key, user_id, not_before, expires_at))
+            await conn.commit()
+
+    async def load(self):
+        """启动时清理过期记录并加载仍有效的注销记录"""
+        now = int(time.time())
+        async with get_async_db_connection() as conn:
+            cursor = await conn.cursor()
+            await cursor.execute("DELETE FROM auth_revocations WHERE expires_at <= %s", (now,))
+            await conn.commit()
+            await cursor.execute("SELECT revocation_key, user_id, not_before, expires_at FROM auth_revocations")
+            rows = await cursor.fetchall()
+        for key, user_id, not_before, expires_at in rows:
+            if user_id is None:
+                self._revoked[key] = expires_at
+            else:
+                self._not_before[user_id] = max(not_before, self._not_before.get(user_id, 0))
+
+    def _purge_revoked(self):
+        now = time.time()
+        expired = [jti for jti, exp in self._revoked.items() if exp <= now]
+        for jti in expired:
+            del self._revoked[jti]
+
+    async def is_user_active(self, user_id: int, loader: Callable[[int], Awaitable[Optional[bool]]]) -> bool:
+        """用户是否存在且未被禁用，缓存未命中时调用loader查询数据库"""
+        active = self._user_cache.get(user_id)
+        if active is None:
+            version = self._user_cache.version(user_id)
+            active = bool(await loader(user_id))
+            self._user_cache.set(user_id, active, version)
+        return active
+
+auth_token_service = AuthTokenService(**TOKEN_CONFIG)
+
+def is_admin_key(value: Optional[str]) -> bool:
+    """校验管理员密钥（未配置密钥时始终为False）"""
+    api_key = ADMIN_CONFIG['api_key']
+    return bool(api_key and value) and hmac.compare_digest(value.encode(), api_key.encode())
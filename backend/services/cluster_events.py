@@ -0,0 +1,127 @@
+import asyncio
+import json
+from datetime import timedelta
+from typing import Callable, Dict, Optional
+from config.cluster import CLUSTER_CONFIG
+from config.database import get_async_db_connection
+
+INSERT_EVENTS_SQL = """
+    INSERT INTO cluster_events (origin, kind, user_id, payload)
+    VALUES (%s, %s, %s, %s)
+"""
+
+class ClusterEvents:
+    """节点间事件通道（MySQL表cluster_events）
+
+    多节点部署时，本节点的数据变化（账号列表缓存失效、账号事件、令牌注销）写入事件表，
+    各API进程每隔poll_interval读取其他节点写入的事件，交给对应类型的处理函数。
+    写入在后台合并为批次；读取按写入时间回看grace秒并按ID去重，提交稍晚的事件不会被跳过。
+    同一节点的API进程和客户端进程地址相同，彼此的事件经IPC传递，不从事件表重复读取。
+    单节点部署时不写入也不读取。
+    """
+
+    def __init__(self, enabled: bool = False, node_url: str = "", event_poll_interval: float = 1,
+                 event_grace: float = 5, event_retention: float = 600, **_):
+        self.enabled = enabled
+        self.origin = node_url
+        self.poll_interval = event_poll_interval
+        self.grace = event_grace
+        self.retention = event_retention
+        self._handlers: Dict[str, Callable[[Optional[int], Optional[dict]], None]] = {}
+        self._pending = []
+        self._seen = {}          # 回看窗口内已处理的事件ID -> 写入时间
+        self._since = None       # 上次读取时的数据库时间
+        self._flush_event = None
+        self._tasks = []
+
+    def on(self, kind: str, handler: Callable[[Optional[int], Optional[dict]], None]):
+        """注册其他节点事件的处理函数 handler(user_id, data)"""
+        self._handlers[kind] = handler
+
+    def emit(self, kind: str, user_id: Optional[int] = None, data: Optional[dict] = None):
+        """通知其他节点，不等待写入完成"""
+        if not self._tasks:
+            return
+        payload = json.dumps(data, ensure_ascii=False, default=str) if data is not None else None
+        self._pending.append((self.origin, kind, user_id, payload))
+        self._flush_event.set()
+
+    async def _flush(self):
+        rows, self._pending = self._pending, []
+        if not rows:
+            return
+        try:
+            async with get_async_db_connection() as conn:
+                cursor = await conn.cursor()
+                await cursor.executemany(INSERT_EVENTS_SQL, rows)
+                await conn.commit()
+        except Exception as e:
+            print(f"写入集群事件失败（{len(rows)}条）: {e}")
+
+    async def _flush_loop(self):
+        while True:
+            await self._flush_event.wait()
+            self._flush_event.clear()
+            await self._flush()
+
+    async def _poll(self):
+        async with get_async_db_connection() as conn:
+            cursor = await conn.cursor()
+            await cursor.execute("SELECT NOW(3)")
+            now = (await cursor.fetchone())[0]
+            await cursor.execute(
+                "SELECT id, origin, kind, user_id, payload, created_at FROM cluster_events WHERE created_at >= %s ORDER BY id",
+                ((self._since or now) - timedelta(seconds=self.grace),)
+            )
+            rows = await cursor.fetchall()
+        self._since = now
+        for event_id, origin, kind, user_id, payload, created_at in rows:
+            if event_id in self._seen:
+                continue
+            self._seen[event_id] = created_at
+            handler = self._handlers.get(kind)
+            if origin == self.origin or handler is None:
+                continue
+            try:
+                handler(user_id, json.loads(payload) if payload else None)
+            except Exception as e:
+                print(f"处理集群事件 {kind} 失败: {e}")
+        floor = now - timedelta(seconds=self.grace * 2)
+        self._seen = {event_id: created_at for event_id, created_at in self._seen.items() if created_at >= floor}
+
+    async def _purge(self):
+        async with get_async_db_connection() as conn:
+            cursor = await conn.cursor()
+            await cursor.execute(
+                "DELETE FROM cluster_events WHERE created_at < NOW() - INTERVAL %s SECOND", (int(self.retention),)
+            )
+            await conn.commit()
+
+    async def _poll_loop(self):
+        purge_every = max(1, int(self.retention / self.poll_interval))
+        rounds = 0
+        while True:
+            try:
+                await self._poll()
+                rounds += 1
+                if rounds % purge_every == 0:
+                    await self._purge()
+            except Exception as e:
+                print(f"读取集群事件失败: {e}")
+            await asyncio.sleep(self.poll_interval)
+
+    def start(self, poll: bool = True):
+        """启动写入任务；poll为True时同时读取其他节点的事件（API进程）"""
+        if self.enabled and not self._tasks:
+            self._flush_event = asyncio.Event()
+            self._tasks = [asyncio.create_task(self._flush_loop())]
+            if poll:
+                self._tasks.append(asyncio.create_task(self._poll_loop()))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+        await self._flush()
+
+cluster_events = ClusterEvents(**CLUSTER_CONFIG)
@@ -0,0 +1,200 @@
+import asyncio
+import itertools
+import json
+import os
+import time
+from typing import Awaitable, Callable, Dict, Optional
+from services.metrics import CLIENT_HOST_CALL_LATENCY, CLIENT_HOST_CALL_ERRORS
+
+# 协议：Unix socket上每行一个JSON
+#   请求 {"id": 1, "method": "...", "params": {...}}
+#   响应 {"id": 1, "result": ...} 或 {"id": 1, "error": "...", "error_class": "ValueError"}
+#   推送 {"event": {...}}（服务端主动发送，无id）
+
+class IPCError(Exception):
+    """客户端进程不可用或响应超时"""
+
+class RemoteCallError(Exception):
+    """客户端进程中执行失败"""
+
+def _encode(message: dict) -> bytes:
+    return json.dumps(message, ensure_ascii=False, separators=(",", ":"), default=str).encode() + b"\n"
+
+class IPCServer:
+    """JSON行协议服务端：每个请求在独立任务中执行，响应按完成顺序返回
+
+    写入响应后等待写缓冲排空；推送事件不等待，写缓冲超过max_event_buffer的连接（对端读取过慢）直接断开。
+    """
+
+    def __init__(self, path: str, handlers: Dict[str, Callable[..., Awaitable]], max_message_size: int = 16 * 1024 * 1024,
+                 max_event_buffer: int = 4 * 1024 * 1024):
+        self.path = path
+        self.handlers = handlers
+        self.max_message_size = max_message_size
+        self.max_event_buffer = max_event_buffer
+        self._server = None
+        self._writers = set()
+
+    async def _handle(self, writer: asyncio.StreamWriter, request: dict):
+        response = {"id": request.get("id")}
+        handler = self.handlers.get(request.get("method"))
+        try:
+            if handler is None:
+                raise LookupError(f"未知方法: {request.get('method')}")
+            response["result"] = await handler(**request.get("params", {}))
+        except Exception as e:
+            response["error"] = str(e)
+            response["error_class"] = type(e).__name__
+        if not writer.is_closing():
+            writer.write(_encode(response))
+            try:
+                await writer.drain()
+            except ConnectionError:
+                pass
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._writers.add(writer)
+        tasks = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                task = asyncio.create_task(self._handle(writer, json.loads(line)))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        except (ConnectionError, ValueError) as e:
+            print(f"IPC连接异常断开: {e}")
+        finally:
+            self._writers.discard(writer)
+            for task in tasks:
+                task.cancel()
+            writer.close()
+
+    def broadcast(self, event: dict):
+        """向所有连接推送事件"""
+        data = _encode({"event": event})
+        for writer in list(self._writers):
+            if writer.is_closing():
+                continue
+            if writer.transport.get_write_buffer_size() > self.max_event_buffer:
+                print("IPC连接写缓冲超过上限，断开该连接")
+                self._writers.discard(writer)
+                writer.close()
+                continue
+            writer.write(data)
+
+    async def start(self):
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self._server = await asyncio.start_unix_server(self._serve, self.path, limit=self.max_message_size)
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            for writer in list(self._writers):
+                writer.close()
+            await self._server.wait_closed()
+            self._server = None
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+class IPCClient:
+    """JSON行协议客户端：单连接上并发请求，按id匹配响应
+
+    连接断开后下次调用时自动重连，断开时未完成的请求立即失败。
+    """
+
+    def __init__(self, path: str, timeout: float = 60, connect_timeout: float = 5,
+                 max_message_size: int = 16 * 1024 * 1024, on_event: Optional[Callable[[dict], None]] = None):
+        self.path = path
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.max_message_size = max_message_size
+        self.on_event = on_event
+        self._ids = itertools.count(1)
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._writer = None
+        self._reader_task = None
+        self._connect_lock = asyncio.Lock()
+
+    @property
+    def connected(self) -> bool:
+        return self._writer is not None and not self._writer.is_closing()
+
+    async def connect(self):
+        async with self._connect_lock:
+            if self.connected:
+                return
+            try:
+                reader, self._writer = await asyncio.wait_for(
+                    asyncio.open_unix_connection(self.path, limit=self.max_message_size), self.connect_timeout
+                )
+            except (OSError, asyncio.TimeoutError) as e:
+                raise IPCError(f"无法连接客户端进程 {self.path}: {e}")
+            self._reader_task = asyncio.create_task(self._read(reader))
+
+    async def _read(self, reader: asyncio.StreamReader):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                message = json.loads(line)
+                if "event" in message:
+                    if self.on_event is not None:
+                        self.on_event(message["event"])
+                    continue
+                future = self._pending.pop(message.get("id"), None)
+                if future is not None and not future.done():
+                    future.set_result(message)
+        except (ConnectionError, ValueError) as e:
+            print(f"客户端进程连接异常断开: {e}")
+        finally:
+            self._writer = None
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(IPCError("客户端进程连接已断开"))
+            self._pending.clear()
+
+    async def call(self, method: str, timeout: Optional[float] = None, **params):
+        """调用客户端进程中的方法
+
+        超时或连接断开时抛出IPCError；远端的ValueError原样抛出，其他异常抛出RemoteCallError。
+        """
+        if not self.connected:
+            await self.connect()
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        started = time.perf_counter()
+        try:
+            self._writer.write(_encode({"id": request_id, "method": method, "params": params}))
+            await self._writer.drain()
+            response = await asyncio.wait_for(future, timeout or self.timeout)
+        except ConnectionError as e:
+            CLIENT_HOST_CALL_ERRORS.labels(method, "disconnected").inc()
+            raise IPCError(f"客户端进程连接已断开: {e}")
+        except asyncio.TimeoutError:
+            CLIENT_HOST_CALL_ERRORS.labels(method, "timeout").inc()
+            raise IPCError(f"客户端进程响应超时: {method}")
+        except IPCError:
+            CLIENT_HOST_CALL_ERRORS.labels(method, "disconnected").inc()
+            raise
+        finally:
+            self._pending.pop(request_id, None)
+            CLIENT_HOST_CALL_LATENCY.labels(method).observe(time.perf_counter() - started)
+        if "error" in response:
+            CLIENT_HOST_CALL_ERRORS.labels(method, response.get("error_class") or "error").inc()
+            if response.get("error_class") == "ValueError":
+                raise ValueError(response["error"])
+            raise RemoteCallError(response["error"])
+        return response.get("result")
+
+    async def close(self):
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+            self._reader_task = None
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
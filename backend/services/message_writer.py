@@ -0,0 +1,126 @@
+import asyncio
+import time
+from typing import Optional
+from config.database import get_async_db_connection
+from config.telegram import MESSAGE_WRITER_CONFIG
+from services.metrics import (
+    MESSAGE_FLUSH_LATENCY, MESSAGE_BATCH_SIZE, MESSAGE_QUEUE_DEPTH, MESSAGES_WRITTEN, MESSAGES_DROPPED
+)
+
+# VALUES中只有占位符，executemany合并为一条多行INSERT；重复收到的消息按唯一键忽略
+INSERT_MESSAGES_SQL = """
+    INSERT IGNORE INTO telegram_messages (account_id, chat_id, message_id, sender_id, text, sent_at)
+    VALUES (%s, %s, %s, %s, %s, %s)
+"""
+
+class MessageBatchWriter:
+    """消息批量入库
+
+    收到的消息解析后放入有界队列，写入任务按数量（batch_size）或时间（flush_interval）
+    攒批，用一条多行INSERT写入。数据库变慢或失败时批次按退避重试，队列随之积压，
+    写入方在队列满时等待（背压），等待超时的消息丢弃并计数。
+    """
+
+    def __init__(self, enabled: bool = True, queue_size: int = 10000, put_timeout: float = 1,
+                 batch_size: int = 500, flush_interval: float = 0.5, retry_max: float = 30):
+        self.enabled = enabled
+        self.queue_size = queue_size
+        self.put_timeout = put_timeout
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retry_max = retry_max
+        self._queue = None
+        self._task = None
+        self._inflight = []   # 正在写入（或重试中）的批次
+        MESSAGE_QUEUE_DEPTH.set_function(lambda: self._queue.qsize() if self._queue is not None else 0)
+
+    @staticmethod
+    def parse(account_id: int, chat_id: int, message) -> tuple:
+        """Telethon消息转换为一行记录，account_id为收到消息的账号"""
+        sent_at = message.date.replace(tzinfo=None) if message.date else None
+        return (account_id, chat_id, message.id, message.sender_id, message.message or None, sent_at)
+
+    async def put(self, row: tuple) -> bool:
+        """放入待写入队列，队列满时最多等待put_timeout秒；返回是否成功放入"""
+        if self._queue is None:
+            return False
+        try:
+            self._queue.put_nowait(row)
+            return True
+        except asyncio.QueueFull:
+            pass
+        try:
+            await asyncio.wait_for(self._queue.put(row), self.put_timeout)
+            return True
+        except asyncio.TimeoutError:
+            MESSAGES_DROPPED.inc()
+            return False
+
+    async def _next_batch(self) -> list:
+        """等待第一条消息，然后在flush_interval内攒满一批"""
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    @staticmethod
+    async def _write(batch: list):
+        started = time.perf_counter()
+        async with get_async_db_connection() as conn:
+            cursor = await conn.cursor()
+            await cursor.executemany(INSERT_MESSAGES_SQL, batch)
+            await conn.commit()
+        MESSAGE_FLUSH_LATENCY.observe(time.perf_counter() - started)
+        MESSAGE_BATCH_SIZE.observe(len(batch))
+        MESSAGES_WRITTEN.inc(len(batch))
+
+    async def _run(self):
+        while True:
+            batch = self._inflight = await self._next_batch()
+            delay = 0.5
+            while True:
+                try:
+                    await self._write(batch)
+                    self._inflight = []
+                    break
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    print(f"消息写入失败，{delay}秒后重试: {e}")
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, self.retry_max)
+
+    def start(self):
+        if self.enabled and self._task is None:
+            self._queue = asyncio.Queue(self.queue_size)
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self, timeout: Optional[float] = 5):
+        """停止写入任务，尽量写完队列中剩余的消息"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        self._task = None
+        rows, self._inflight = self._inflight, []
+        while not self._queue.empty():
+            rows.append(self._queue.get_nowait())
+        try:
+            for start in range(0, len(rows), self.batch_size):
+                await asyncio.wait_for(self._write(rows[start:start + self.batch_size]), timeout)
+        except Exception as e:
+            print(f"关闭时写入剩余消息失败: {e}")
+        self._queue = None
+
+message_writer = MessageBatchWriter(**MESSAGE_WRITER_CONFIG)
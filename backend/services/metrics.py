@@ -0,0 +1,191 @@
+import time
+import aiomysql
+import pymysql
+from prometheus_client import Counter, Gauge, Histogram
+from services.query_audit import query_recorder
+
+# 请求
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP请求耗时", ["method", "route"]
+)
+REQUEST_COUNT = Counter(
+    "http_requests_total", "HTTP请求数", ["method", "route", "status"]
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight", "正在处理的HTTP请求数"
+)
+
+# 数据库
+DB_ACQUIRE_LATENCY = Histogram(
+    "db_connection_acquire_seconds", "从连接池获取连接的等待时间", ["pool"]
+)
+DB_HOLD_LATENCY = Histogram(
+    "db_connection_hold_seconds", "借出连接的占用时间（get_db_connection块的耗时）", ["pool"]
+)
+DB_QUERY_LATENCY = Histogram(
+    "db_query_duration_seconds", "SQL执行耗时", ["pool", "operation"]
+)
+DB_QUERY_ERRORS = Counter(
+    "db_query_errors_total", "SQL执行失败次数", ["pool", "operation", "error"]
+)
+DB_POOL_CONNECTIONS = Gauge(
+    "db_pool_connections", "数据库连接池的连接数（pool: sync/async）", ["pool", "state"]
+)
+
+# Telegram
+TELEGRAM_RPC_LATENCY = Histogram(
+    "telegram_rpc_duration_seconds", "Telethon请求耗时（按请求类型）", ["method"]
+)
+TELEGRAM_RPC_ERRORS = Counter(
+    "telegram_rpc_errors_total", "Telethon请求失败次数", ["method", "error"]
+)
+TELEGRAM_FLOOD_WAITS = Counter(
+    "telegram_flood_wait_total", "收到FloodWait的次数", ["method"]
+)
+TELEGRAM_FLOOD_WAIT_SECONDS = Counter(
+    "telegram_flood_wait_seconds_total", "FloodWait要求等待的总秒数", ["method"]
+)
+TELEGRAM_CONNECTED_CLIENTS = Gauge(
+    "telegram_connected_clients", "客户端管理器中保持连接的客户端数"
+)
+
+# 跟投信号
+SIGNAL_COPY_LATENCY = Histogram(
+    "signal_copy_latency_seconds", "信号从收到到跟随账号发送完成的耗时",
+    buckets=(0.025, 0.05, 0.1, 0.15, 0.2, 0.3, 0.5, 0.75, 1, 2, 5, 10)
+)
+SIGNAL_DELIVERIES = Counter(
+    "signal_deliveries_total", "信号投递次数", ["status"]
+)
+
+# 消息入库
+MESSAGE_FLUSH_LATENCY = Histogram(
+    "message_flush_duration_seconds", "一批消息写入数据库的耗时"
+)
+MESSAGE_BATCH_SIZE = Histogram(
+    "message_batch_size", "每批写入的消息数",
+    buckets=(1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+)
+MESSAGE_QUEUE_DEPTH = Gauge(
+    "message_queue_depth", "待写入的消息数"
+)
+MESSAGES_WRITTEN = Counter(
+    "messages_written_total", "已写入的消息数"
+)
+MESSAGES_DROPPED = Counter(
+    "messages_dropped_total", "队列持续满载而丢弃的消息数"
+)
+
+# 客户端进程调用
+CLIENT_HOST_CALL_LATENCY = Histogram(
+    "client_host_call_duration_seconds", "调用Telegram客户端进程的耗时（含IPC往返）", ["method"]
+)
+CLIENT_HOST_CALL_ERRORS = Counter(
+    "client_host_call_errors_total", "调用Telegram客户端进程失败次数", ["method", "error"]
+)
+
+SQL_OPERATIONS = {"SELECT", "INSERT", "UPDATE", "DELETE", "REPLACE", "ALTER", "CREATE", "SHOW"}
+
+def sql_operation(query) -> str:
+    """SQL语句类型，作为指标标签（取首个关键字，避免标签基数过大）"""
+    if isinstance(query, bytes):
+        query = query.decode(errors="ignore")
+    words = query.lstrip(" \t\r\n(").split(None, 1)
+    operation = words[0].upper() if words else ""
+    return operation if operation in SQL_OPERATIONS else "OTHER"
+
+class _QueryTimer:
+    """记录一次SQL执行；executemany内部逐条调用execute时只记录外层"""
+    __slots__ = ("cursor", "pool", "operation", "started", "outer")
+
+    def __init__(self, cursor, pool: str, query):
+        self.cursor = cursor
+        self.pool = pool
+        self.operation = sql_operation(query)
+
+    def __enter__(self):
+        self.outer = not getattr(self.cursor, "_timing", False)
+        self.cursor._timing = True
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if not self.outer:
+            return False
+        self.cursor._timing = False
+        DB_QUERY_LATENCY.labels(self.pool, self.operation).observe(time.perf_counter() - self.started)
+        if exc_type is not None:
+            DB_QUERY_ERRORS.labels(self.pool, self.operation, exc_type.__name__).inc()
+        return False
+
+class TimedCursor(pymysql.cursors.Cursor):
+    """记录执行耗时的pymysql游标"""
+    _timing = False
+
+    def execute(self, query, args=None):
+        if query_recorder.enabled:
+            query_recorder.record(query, args)
+        with _QueryTimer(self, "sync", query):
+            return super().execute(query, args)
+
+    def executemany(self, query, args):
+        with _QueryTimer(self, "sync", query):
+            return super().executemany(query, args)
+
+class TimedAsyncCursor(aiomysql.Cursor):
+    """记录执行耗时的aiomysql游标"""
+    _timing = False
+
+    async def execute(self, query, args=None):
+        if query_recorder.enabled:
+            query_recorder.record(query, args)
+        with _QueryTimer(self, "async", query):
+            return await super().execute(query, args)
+
+    async def executemany(self, query, args):
+        with _QueryTimer(self, "async", query):
+            return await super().executemany(query, args)
+
+class MetricsMiddleware:
+    """ASGI中间件：记录每个路由的耗时、状态码和进行中的请求数
+
+    路由标签使用路由模板（如 /api/telegram/accounts/{account_id}），未匹配的路径统一记为unmatched。
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._route_paths = None
+
+    def _route(self, scope) -> str:
+        route = scope.get("route")
+        if route is not None:
+            return route.path
+        if self._route_paths is None:
+            self._route_paths = {
+                route.endpoint: route.path
+                for route in scope["app"].routes if hasattr(route, "endpoint")
+            }
+        return self._route_paths.get(scope.get("endpoint"), "unmatched")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            route = self._route(scope)
+            method = scope["method"]
+            REQUEST_LATENCY.labels(method, route).observe(time.perf_counter() - started)
+            REQUEST_COUNT.labels(method, route, str(status)).inc()
@@ -0,0 +1,62 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from config.auth import PASSWORD_HASH_CONFIG
+from services.startup_report import lazy_import
+
+class HashQueueFullError(Exception):
+    """哈希任务队列已满"""
+    pass
+
+class PasswordHasher:
+    """在独立线程池中执行bcrypt，避免阻塞事件循环
+
+    bcrypt计算期间会释放GIL，线程池即可利用多核；
+    并发数由max_workers限制，排队数由max_queue限制，超出时抛出HashQueueFullError。
+    """
+
+    def __init__(self, max_workers: int = 4, max_queue: int = 32, rounds: int = 12):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.rounds = rounds
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bcrypt")
+        self._pending = 0  # 执行中 + 排队中的任务数，只在事件循环线程内修改
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    async def _run(self, func, *args):
+        if self._pending >= self.max_workers + self.max_queue:
+            raise HashQueueFullError("密码校验任务繁忙，请稍后再试")
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, func, *args)
+        finally:
+            self._pending -= 1
+
+    def _hash(self, password: str) -> str:
+        bcrypt = lazy_import("bcrypt")
+        return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(self.rounds)).decode('utf-8')
+
+    @staticmethod
+    def _verify(password: str, hashed_password: str) -> bool:
+        bcrypt = lazy_import("bcrypt")
+        return bcrypt.checkpw(password.encode('utf-8'), hashed_password.encode('utf-8'))
+
+    async def hash(self, password: str) -> str:
+        """加密密码"""
+        return await self._run(self._hash, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        """验证密码"""
+        return await self._run(self._verify, password, hashed_password)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+password_hasher = PasswordHasher(
+    max_workers=PASSWORD_HASH_CONFIG['max_workers'],
+    max_queue=PASSWORD_HASH_CONFIG['max_queue'],
+    rounds=PASSWORD_HASH_CONFIG['rounds']
+)
@@ -0,0 +1,107 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Optional, TYPE_CHECKING
+from config.telegram import PENDING_LOGIN_CONFIG
+
+if TYPE_CHECKING:
+    from telethon import TelegramClient
+
+class PendingLogin:
+    """一次进行中的登录：已连接的客户端和验证码会话信息"""
+    __slots__ = ('client', 'session_file', 'api_id', 'api_hash', 'phone_code_hash',
+                 'password_needed', 'expires_at')
+
+    def __init__(self, client: 'TelegramClient', session_file: str, api_id: int, api_hash: str,
+                 phone_code_hash: str, ttl: float):
+        self.client = client
+        self.session_file = session_file
+        self.api_id = api_id
+        self.api_hash = api_hash
+        self.phone_code_hash = phone_code_hash
+        self.password_needed = False  # 验证码已通过，只差二级密码
+        self.expires_at = time.monotonic() + ttl
+
+class PendingLoginStore:
+    """按手机号保存待验证登录的内存存储
+
+    send_code后客户端保持连接并记录phone_code_hash，verify_login直接复用；
+    条目有TTL和数量上限，过期或被淘汰时断开客户端。
+    """
+
+    def __init__(self, ttl: float = 600, max_entries: int = 1000, cleanup_interval: float = 30):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.cleanup_interval = cleanup_interval
+        self._entries = OrderedDict()
+        self._cleanup_task = None
+
+    def __len__(self):
+        return len(self._entries)
+
+    async def put(self, phone: str, client: 'TelegramClient', session_file: str, api_id: int,
+                  api_hash: str, phone_code_hash: str) -> PendingLogin:
+        """保存（或替换）手机号对应的待验证登录"""
+        old = self._entries.pop(phone, None)
+        if old is not None and old.client is not client:
+            await self._disconnect(old.client)
+        entry = PendingLogin(client, session_file, api_id, api_hash, phone_code_hash, self.ttl)
+        self._entries[phone] = entry
+        while len(self._entries) > self.max_entries:
+            _, evicted = self._entries.popitem(last=False)
+            await self._disconnect(evicted.client)
+        return entry
+
+    def get(self, phone: str) -> Optional[PendingLogin]:
+        """获取未过期的待验证登录"""
+        entry = self._entries.get(phone)
+        if entry is None or entry.expires_at <= time.monotonic():
+            return None
+        return entry
+
+    def pop(self, phone: str) -> Optional[PendingLogin]:
+        """移出条目但不断开客户端（登录成功后转交给客户端管理器）"""
+        return self._entries.pop(phone, None)
+
+    async def discard(self, phone: str):
+        """移出条目并断开客户端"""
+        entry = self._entries.pop(phone, None)
+        if entry is not None:
+            await self._disconnect(entry.client)
+
+    @staticmethod
+    async def _disconnect(client: 'TelegramClient'):
+        try:
+            await client.disconnect()
+        except Exception:
+            pass
+
+    async def evict_expired(self):
+        """断开并移除过期条目"""
+        now = time.monotonic()
+        expired = [phone for phone, entry in self._entries.items() if entry.expires_at <= now]
+        for phone in expired:
+            await self.discard(phone)
+
+    async def _cleanup_loop(self):
+        while True:
+            await asyncio.sleep(self.cleanup_interval)
+            try:
+                await self.evict_expired()
+            except Exception as e:
+                print(f"清理过期登录会话失败: {e}")
+
+    def start(self):
+        """启动过期清理任务"""
+        if self._cleanup_task is None:
+            self._cleanup_task = asyncio.create_task(self._cleanup_loop())
+
+    async def stop(self):
+        """停止清理任务并断开所有待验证客户端"""
+        if self._cleanup_task is not None:
+            self._cleanup_task.cancel()
+            self._cleanup_task = None
+        for phone in list(self._entries):
+            await self.discard(phone)
+
+pending_login_store = PendingLoginStore(**PENDING_LOGIN_CONFIG)
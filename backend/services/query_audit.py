@@ -0,0 +1,43 @@
+import json
+import os
+import threading
+from typing import Optional
+
+class QueryRecorder:
+    """记录执行过的SQL（每种语句一条，含一组实际参数），供 python -m bench.query_audit 执行EXPLAIN
+
+    设置环境变量QUERY_AUDIT_LOG为输出文件路径时启用，由计时游标在每次执行时调用。
+    只记录有执行计划意义的语句：SELECT、UPDATE、DELETE和INSERT ... SELECT。
+    """
+
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self._seen = set()
+        self._lock = threading.Lock()   # 同步连接池在线程中使用
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    @staticmethod
+    def _plannable(query: str) -> bool:
+        words = query.lstrip(" \t\r\n(").split(None, 1)
+        operation = words[0].upper() if words else ""
+        if operation in ("SELECT", "UPDATE", "DELETE"):
+            return " FROM " in query.upper() or operation == "UPDATE"
+        return operation in ("INSERT", "REPLACE") and " SELECT " in query.upper()
+
+    def record(self, query, args=None):
+        if isinstance(query, bytes):
+            query = query.decode(errors="ignore")
+        query = " ".join(query.split())
+        if not self._plannable(query):
+            return
+        with self._lock:
+            if query in self._seen:
+                return
+            self._seen.add(query)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"query": query, "args": args}, ensure_ascii=False, default=str) + "\n")
+
+query_recorder = QueryRecorder(os.environ.get("QUERY_AUDIT_LOG"))
@@ -0,0 +1,110 @@
+import asyncio
+import os
+import random
+import re
+import time
+from datetime import datetime
+from typing import List, Optional
+from config.profiling import PROFILING_CONFIG
+from services.auth_tokens import is_admin_key
+from services.startup_report import lazy_import
+
+class ProfileStore:
+    """分析结果的磁盘环形缓冲区：每个请求一个HTML文件，超过上限时删除最旧的"""
+
+    FILENAME_PATTERN = re.compile(r'^[\w.-]+\.html$')
+
+    def __init__(self, output_dir: str = 'profiles', max_captures: int = 50):
+        self.output_dir = output_dir
+        self.max_captures = max_captures
+
+    def _paths(self) -> List[str]:
+        if not os.path.isdir(self.output_dir):
+            return []
+        names = [name for name in os.listdir(self.output_dir) if self.FILENAME_PATTERN.match(name)]
+        # 文件名以时间戳开头，按名称排序即按时间排序
+        return [os.path.join(self.output_dir, name) for name in sorted(names)]
+
+    def save(self, method: str, path: str, duration: float, html: str) -> str:
+        os.makedirs(self.output_dir, exist_ok=True)
+        slug = re.sub(r'[^\w]+', '_', path).strip('_')[:60] or 'root'
+        name = f"{datetime.now():%Y%m%d%H%M%S%f}-{method}-{slug}-{int(duration * 1000)}ms.html"
+        with open(os.path.join(self.output_dir, name), 'w', encoding='utf-8') as f:
+            f.write(html)
+        paths = self._paths()
+        for old in paths[:max(0, len(paths) - self.max_captures)]:
+            try:
+                os.remove(old)
+            except OSError:
+                pass
+        return name
+
+    def list(self) -> List[dict]:
+        captures = []
+        for path in reversed(self._paths()):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            captures.append({
+                "name": os.path.basename(path),
+                "size": stat.st_size,
+                "created_at": datetime.fromtimestamp(stat.st_mtime).strftime("%Y-%m-%d %H:%M:%S")
+            })
+        return captures
+
+    def path(self, name: str) -> Optional[str]:
+        """分析结果文件路径，名称不合法或不存在时返回None"""
+        if not self.FILENAME_PATTERN.match(name):
+            return None
+        path = os.path.join(self.output_dir, name)
+        return path if os.path.isfile(path) else None
+
+profile_store = ProfileStore(PROFILING_CONFIG['output_dir'], PROFILING_CONFIG['max_captures'])
+
+class ProfilingMiddleware:
+    """按需分析单个请求的ASGI中间件
+
+    请求头 X-Profile 等于管理员密钥，或命中随机抽样时，用pyinstrument（异步感知、墙钟时间）
+    记录该请求：CPU计算、阻塞调用以及等待Telethon/数据库的await都会出现在调用栈中。
+    结果写入 ProfileStore，通过管理员接口查看。
+    """
+
+    def __init__(self, app, store: ProfileStore = profile_store, trigger_header: str = 'X-Profile',
+                 sample_rate: float = 0, interval: float = 0.001, max_concurrent: int = 2):
+        self.app = app
+        self.store = store
+        self.trigger_header = trigger_header.lower().encode()
+        self.sample_rate = sample_rate
+        self.interval = interval
+        self.max_concurrent = max_concurrent
+        self._active = 0
+
+    def _should_profile(self, scope) -> bool:
+        if self._active >= self.max_concurrent:
+            return False
+        for name, value in scope["headers"]:
+            if name == self.trigger_header:
+                return is_admin_key(value.decode(errors="ignore"))
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profiler = lazy_import("pyinstrument").Profiler(interval=self.interval, async_mode="enabled")
+        self._active += 1
+        started = time.perf_counter()
+        profiler.start()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            profiler.stop()
+            self._active -= 1
+            duration = time.perf_counter() - started
+            try:
+                html = profiler.output_html()
+                await asyncio.to_thread(self.store.save, scope["method"], scope["path"], duration, html)
+            except Exception as e:
+                print(f"保存性能分析结果失败: {e}")
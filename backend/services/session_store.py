@@ -0,0 +1,176 @@
+import asyncio
+import os
+from collections import OrderedDict
+from typing import Iterable, Optional, Tuple, TYPE_CHECKING
+from config.database import get_async_db_connection
+from config.telegram import SESSION_STORE_CONFIG
+from services.startup_report import lazy_import
+
+if TYPE_CHECKING:
+    from telethon import TelegramClient
+    from telethon.sessions import StringSession
+
+def _sessions():
+    """telethon.sessions按需导入"""
+    return lazy_import("telethon.sessions")
+
+class FileSessionStore:
+    """每个手机号一个本地SQLite session文件（单机部署）"""
+
+    def __init__(self, session_dir: str = 'sessions'):
+        self.session_dir = session_dir
+
+    def session_ref(self, phone: str) -> str:
+        """账号的session标识，保存在telegram_accounts.session_file中"""
+        return os.path.join(self.session_dir, f"{phone}.session")
+
+    def new(self, ref: str) -> str:
+        """登录时使用的session"""
+        os.makedirs(self.session_dir, exist_ok=True)
+        return ref
+
+    async def open(self, ref: Optional[str]) -> Optional[str]:
+        """打开已有session，不存在时返回None"""
+        if not ref or not await asyncio.to_thread(os.path.exists, ref):
+            return None
+        return ref
+
+    @staticmethod
+    def _write_file(ref: str, session):
+        """把其他类型的session（如导入的StringSession）写成SQLite文件"""
+        os.makedirs(os.path.dirname(ref) or '.', exist_ok=True)
+        file_session = _sessions().SQLiteSession(ref)
+        try:
+            file_session.set_dc(session.dc_id, session.server_address, session.port)
+            file_session.auth_key = session.auth_key
+            file_session.save()
+        finally:
+            file_session.close()
+
+    async def save(self, ref: str, client: 'TelegramClient'):
+        """SQLite session由Telethon自动保存，其他类型的session写入文件"""
+        if not isinstance(client.session, _sessions().SQLiteSession):
+            await asyncio.to_thread(self._write_file, ref, client.session)
+
+    async def save_many(self, items: Iterable[Tuple[str, 'TelegramClient']]):
+        for ref, client in items:
+            await self.save(ref, client)
+
+    async def delete(self, ref: Optional[str]):
+        if ref and await asyncio.to_thread(os.path.exists, ref):
+            await asyncio.to_thread(os.remove, ref)
+
+class DatabaseSessionStore:
+    """以StringSession形式保存在MySQL的session存储
+
+    session不再绑定本机文件，任意API节点都能加载；读取经过内存LRU缓存。
+    旧的SQLite session文件在首次打开时自动迁移入库。
+    """
+
+    REF_PREFIX = "db:"
+
+    def __init__(self, session_dir: str = 'sessions', cache_size: int = 5000):
+        self.session_dir = session_dir
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+
+    def session_ref(self, phone: str) -> str:
+        return f"{self.REF_PREFIX}{phone}"
+
+    def new(self, ref: str) -> 'StringSession':
+        return _sessions().StringSession()
+
+    def _cache_get(self, ref: str) -> Optional[str]:
+        data = self._cache.get(ref)
+        if data is not None:
+            self._cache.move_to_end(ref)
+        return data
+
+    def _cache_set(self, ref: str, data: str):
+        self._cache[ref] = data
+        self._cache.move_to_end(ref)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    @staticmethod
+    def _convert_file(path: str) -> Optional[str]:
+        """把旧的SQLite session文件转换为StringSession字符串"""
+        if not os.path.exists(path):
+            return None
+        sessions = _sessions()
+        session = sessions.SQLiteSession(path)
+        try:
+            return sessions.StringSession.save(session) or None
+        finally:
+            session.close()
+
+    async def _write(self, ref: str, data: str):
+        await self._write_many([(ref, data)])
+
+    async def _write_many(self, rows: list):
+        """批量写入session（executemany合并为一条多行INSERT）"""
+        async with get_async_db_connection() as conn:
+            cursor = await conn.cursor()
+            await cursor.executemany("""
+                INSERT INTO telegram_sessions (session_key, session_data)
+                VALUES (%s, %s)
+                ON DUPLICATE KEY UPDATE session_data = VALUES(session_data)
+            """, rows)
+            await conn.commit()
+        for ref, data in rows:
+            self._cache_set(ref, data)
+
+    async def open(self, ref: Optional[str]) -> Optional['StringSession']:
+        if not ref:
+            return None
+        data = self._cache_get(ref)
+        if data is None:
+            async with get_async_db_connection() as conn:
+                cursor = await conn.cursor()
+                await cursor.execute(
+                    "SELECT session_data FROM telegram_sessions WHERE session_key = %s",
+                    (ref,)
+                )
+                row = await cursor.fetchone()
+            if row:
+                data = row[0]
+                self._cache_set(ref, data)
+            elif not ref.startswith(self.REF_PREFIX):
+                # 旧数据：session_file仍是本地文件路径
+                data = await asyncio.to_thread(self._convert_file, ref)
+                if data is None:
+                    return None
+                await self._write(ref, data)
+            else:
+                return None
+        return _sessions().StringSession(data)
+
+    async def save(self, ref: str, client: 'TelegramClient'):
+        await self.save_many([(ref, client)])
+
+    async def save_many(self, items: Iterable[Tuple[str, 'TelegramClient']]):
+        string_session = _sessions().StringSession
+        rows = [(ref, string_session.save(client.session)) for ref, client in items]
+        rows = [(ref, data) for ref, data in rows if data]
+        if rows:
+            await self._write_many(rows)
+
+    async def delete(self, ref: Optional[str]):
+        if not ref:
+            return
+        self._cache.pop(ref, None)
+        async with get_async_db_connection() as conn:
+            cursor = await conn.cursor()
+            await cursor.execute("DELETE FROM telegram_sessions WHERE session_key = %s", (ref,))
+            await conn.commit()
+        if not ref.startswith(self.REF_PREFIX) and await asyncio.to_thread(os.path.exists, ref):
+            await asyncio.to_thread(os.remove, ref)
+
+def create_session_store(backend: str = 'database', session_dir: str = 'sessions', cache_size: int = 5000):
+    if backend == 'file':
+        return FileSessionStore(session_dir)
+    if backend == 'database':
+        return DatabaseSessionStore(session_dir, cache_size)
+    raise ValueError(f"未知的session存储后端: {backend}")
+
+session_store = create_session_store(**SESSION_STORE_CONFIG)
@@ -0,0 +1,344 @@
+import asyncio
+import time
+from collections import OrderedDict, deque
+from typing import Dict, List, Optional
+from config.telegram import SIGNAL_COPY_CONFIG
+from models.signal import SignalService
+from services.account_leases import account_lease_manager
+from services.account_router import account_router
+from services.message_writer import message_writer
+from services.metrics import SIGNAL_COPY_LATENCY, SIGNAL_DELIVERIES
+from services.startup_report import lazy_import
+from services.telegram_client_manager import telegram_client_manager
+from services.telegram_rate_limiter import rpc_priority, PRIORITY_INTERACTIVE
+
+def parse_peer(value: str):
+    """会话标识：纯数字（含负号）按ID处理，其余按用户名/链接处理"""
+    return int(value) if value.lstrip('-').isdigit() else value
+
+class _Source:
+    __slots__ = ('id', 'account_id', 'session_file', 'chat', 'followers')
+
+    def __init__(self, source_id: int, account_id: int, session_file: str, chat: str):
+        self.id = source_id
+        self.account_id = account_id
+        self.session_file = session_file
+        self.chat = chat
+        self.followers = []
+
+class _Follower:
+    __slots__ = ('id', 'account_id', 'session_file', 'target')
+
+    def __init__(self, follower_id: int, account_id: int, session_file: str, target: str):
+        self.id = follower_id
+        self.account_id = account_id
+        self.session_file = session_file
+        self.target = target
+
+class SignalCopier:
+    """跟投信号复制引擎
+
+    信号源账号的客户端常驻并注册NewMessage事件处理；收到信号后按到达顺序放入该信号源的登记队列，
+    由每个信号源一个的登记任务依次登记消息（唯一键去重，重复事件或其他节点已处理的消息不再分发），
+    再按跟随目标分别入队，登记的数据库往返不会打乱同一信号源的消息顺序。每个目标一个发送任务，
+    保证同一目标按信号顺序发送，所有目标的并发发送数由信号量限制。
+    投递记录批量写入数据库，收到到发送完成的延迟计入统计。
+    多节点部署时只监听本节点持有的信号源账号，跟随账号由其他节点持有时经内部接口由该节点发送。
+    """
+
+    def __init__(self, enabled: bool = True, concurrency: int = 200, queue_size: int = 100,
+                 worker_idle_timeout: float = 300, reload_interval: float = 60,
+                 flush_interval: float = 1, flush_size: int = 200, stats_window: int = 2000):
+        self.enabled = enabled
+        self.concurrency = concurrency
+        self.queue_size = queue_size
+        self.worker_idle_timeout = worker_idle_timeout
+        self.reload_interval = reload_interval
+        self.flush_interval = flush_interval
+        self.flush_size = flush_size
+        self._sources = {}           # (信号源session, 会话peer_id) -> _Source
+        self._handlers = {}          # 信号源session -> (客户端, 事件处理函数)
+        self._pinned = set()
+        self._workers = {}           # (跟随session, 目标) -> 发送队列
+        self._sequencers = {}        # 信号源ID -> 登记队列
+        self._seen = OrderedDict()   # 进程内已分发的(信号源ID, 消息ID)
+        self._records = []
+        self._latencies = deque(maxlen=stats_window)
+        self._semaphore = None
+        self._reload_event = None
+        self._flush_event = None
+        self._main_tasks = []
+        self._tasks = set()          # 各信号源的登记任务、各目标的发送任务
+
+    async def reload(self):
+        """重新加载信号源和跟随配置，连接相关账号并解析会话"""
+        sources = {}
+        for (source_id, source_account_id, source_session, chat,
+             follower_id, follower_account_id, follower_session, target) in await SignalService.load_active():
+            if account_lease_manager.node_for(source_account_id) is not None:
+                continue
+            source = sources.get(source_id)
+            if source is None:
+                source = sources[source_id] = _Source(source_id, source_account_id, source_session, chat)
+            if follower_id is not None and follower_session:
+                source.followers.append(_Follower(follower_id, follower_account_id, follower_session, target))
+
+        resolved = await asyncio.gather(*(self._resolve_source(source) for source in sources.values()))
+        source_map = {
+            (source.session_file, peer_id): source
+            for source, peer_id in zip(sources.values(), resolved) if peer_id is not None
+        }
+        followers = {
+            (follower.session_file, follower.target): follower
+            for source in source_map.values() for follower in source.followers
+            if account_lease_manager.node_for(follower.account_id) is None
+        }
+        # 提前连接跟随账号并解析目标，收到信号时直接发送
+        await asyncio.gather(*(self._warm_follower(follower) for follower in followers.values()))
+
+        source_sessions = {source.session_file for source in source_map.values()}
+        for session_file in list(self._handlers):
+            if session_file not in source_sessions:
+                client, handler = self._handlers.pop(session_file)
+                client.remove_event_handler(handler)
+        for session_file in source_sessions:
+            await self._listen(session_file)
+
+        pinned = source_sessions | {session_file for session_file, _ in followers}
+        for session_file in self._pinned - pinned:
+            telegram_client_manager.unpin(session_file)
+        for session_file in pinned:
+            telegram_client_manager.pin(session_file)
+        self._pinned = pinned
+        self._sources = source_map
+
+    async def _resolve_source(self, source: _Source) -> Optional[int]:
+        try:
+            client = await telegram_client_manager.get_account_client(source.session_file)
+            if client is None:
+                return None
+            entity = await client.get_input_entity(parse_peer(source.chat))
+            return lazy_import("telethon.utils").get_peer_id(entity)
+        except Exception as e:
+            print(f"信号源 {source.id} 解析会话失败: {e}")
+            return None
+
+    async def _warm_follower(self, follower: _Follower):
+        try:
+            client = await telegram_client_manager.get_account_client(follower.session_file)
+            if client is not None:
+                await client.get_input_entity(parse_peer(follower.target))
+        except Exception as e:
+            print(f"跟随账号 {follower.id} 预热失败: {e}")
+
+    async def _listen(self, session_file: str):
+        """为信号源账号注册消息处理（客户端变化时重新注册）"""
+        client = telegram_client_manager.get_existing(session_file)
+        registered = self._handlers.get(session_file)
+        if client is None or (registered is not None and registered[0] is client):
+            return
+        if registered is not None:
+            registered[0].remove_event_handler(registered[1])
+
+        async def handler(event):
+            await self._on_message(session_file, event)
+
+        client.add_event_handler(handler, lazy_import("telethon.events").NewMessage(incoming=True))
+        self._handlers[session_file] = (client, handler)
+
+    async def _on_message(self, session_file: str, event):
+        detected_at = time.perf_counter()
+        source = self._sources.get((session_file, event.chat_id))
+        if source is None:
+            return
+        message = event.message
+        key = (source.id, message.id)
+        if key in self._seen:
+            return
+        self._seen[key] = True
+        if len(self._seen) > 10000:
+            self._seen.popitem(last=False)
+        if source.followers:
+            # 在第一个await之前入队，保持事件到达顺序
+            self._sequence(source, message, detected_at)
+        # 入库队列的背压不影响信号分发
+        await message_writer.put(message_writer.parse(source.account_id, event.chat_id, message))
+
+    def _sequence(self, source: _Source, message, detected_at: float):
+        queue = self._sequencers.get(source.id)
+        if queue is None:
+            # 不限长度：登记只有一次数据库往返，丢弃信号比短暂堆积代价更大
+            queue = self._sequencers[source.id] = asyncio.Queue()
+            task = asyncio.create_task(self._sequencer(source.id, queue))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        queue.put_nowait((source, message, detected_at))
+
+    async def _sequencer(self, source_id: int, queue: asyncio.Queue):
+        """按到达顺序逐条登记同一信号源的消息并分发，空闲超时后退出"""
+        try:
+            while True:
+                try:
+                    source, message, detected_at = await asyncio.wait_for(queue.get(), self.worker_idle_timeout)
+                except asyncio.TimeoutError:
+                    if queue.empty():
+                        break
+                    continue
+                try:
+                    if not await SignalService.claim_message(source.id, message.id):
+                        continue
+                except Exception as e:
+                    # 数据库不可用时仍然分发，依靠进程内去重
+                    print(f"登记信号消息失败: {e}")
+                for follower in source.followers:
+                    self._enqueue(follower, message, detected_at)
+        finally:
+            if self._sequencers.get(source_id) is queue:
+                del self._sequencers[source_id]
+
+    def _enqueue(self, follower: _Follower, message, detected_at: float):
+        key = (follower.session_file, follower.target)
+        queue = self._workers.get(key)
+        if queue is None:
+            queue = self._workers[key] = asyncio.Queue(self.queue_size)
+            task = asyncio.create_task(self._worker(key, queue))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        try:
+            queue.put_nowait((follower, message, detected_at))
+        except asyncio.QueueFull:
+            self._record(follower, message, "failed", error="发送队列已满")
+
+    async def _worker(self, key: tuple, queue: asyncio.Queue):
+        """按顺序发送同一目标的信号，空闲超时后退出"""
+        # 信号发送属于交互优先级，不受创建任务时所在上下文（如后台检查）的影响
+        with rpc_priority(PRIORITY_INTERACTIVE):
+            try:
+                while True:
+                    try:
+                        follower, message, detected_at = await asyncio.wait_for(queue.get(), self.worker_idle_timeout)
+                    except asyncio.TimeoutError:
+                        if queue.empty():
+                            break
+                        continue
+                    async with self._semaphore:
+                        await self._deliver(follower, message, detected_at)
+            finally:
+                if self._workers.get(key) is queue:
+                    del self._workers[key]
+
+    async def _deliver(self, follower: _Follower, message, detected_at: float):
+        # 媒体的文件引用属于源账号，其他账号无法直接发送，目前只复制文本（含格式）
+        if not message.message or (message.media is not None and message.web_preview is None):
+            self._record(follower, message, "skipped", error="暂不支持复制媒体消息")
+            return
+        try:
+            node_url = account_lease_manager.node_for(follower.account_id)
+            if node_url is not None:
+                html = lazy_import("telethon.extensions.html").unparse(message.message, message.entities)
+                sent_id = await account_router.send_message(node_url, follower.session_file, follower.target, html)
+            else:
+                client = await telegram_client_manager.get_account_client(follower.session_file)
+                if client is None:
+                    raise ValueError("session不存在")
+                sent = await client.send_message(
+                    parse_peer(follower.target), message.message,
+                    formatting_entities=message.entities, link_preview=False
+                )
+                sent_id = sent.id
+        except Exception as e:
+            self._record(follower, message, "failed", error=str(e))
+            return
+        self._record(follower, message, "sent", sent_id, time.perf_counter() - detected_at)
+
+    def _record(self, follower: _Follower, message, status: str, sent_id: Optional[int] = None,
+                latency: Optional[float] = None, error: Optional[str] = None):
+        SIGNAL_DELIVERIES.labels(status).inc()
+        if latency is not None:
+            SIGNAL_COPY_LATENCY.observe(latency)
+            self._latencies.append(latency)
+        self._records.append((
+            follower.id, message.id, status, sent_id,
+            int(latency * 1000) if latency is not None else None,
+            error[:255] if error else None
+        ))
+        if len(self._records) >= self.flush_size:
+            self._flush_event.set()
+
+    async def _flush(self):
+        records, self._records = self._records, []
+        try:
+            await SignalService.save_deliveries(records)
+        except Exception as e:
+            print(f"写入投递记录失败: {e}")
+
+    async def _flush_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_event.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_event.clear()
+            await self._flush()
+
+    async def _reload_loop(self):
+        while True:
+            try:
+                await self.reload()
+            except Exception as e:
+                print(f"加载跟投配置失败: {e}")
+            try:
+                await asyncio.wait_for(self._reload_event.wait(), self.reload_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._reload_event.clear()
+
+    def request_reload(self):
+        """配置变化后立即重新加载"""
+        if self._reload_event is not None:
+            self._reload_event.set()
+
+    @staticmethod
+    def _percentile(values: List[float], p: float) -> Optional[float]:
+        if not values:
+            return None
+        index = min(len(values) - 1, max(0, round(p / 100 * len(values)) - 1))
+        return round(values[index] * 1000, 1)
+
+    def stats(self) -> Dict:
+        latencies = sorted(self._latencies)
+        return {
+            "sources": len(self._sources),
+            "targets": len(self._workers),
+            "queued": sum(queue.qsize() for queue in self._workers.values()),
+            "latency_ms": {
+                "samples": len(latencies),
+                "p50": self._percentile(latencies, 50),
+                "p95": self._percentile(latencies, 95),
+                "p99": self._percentile(latencies, 99)
+            }
+        }
+
+    def start(self):
+        if self.enabled and not self._main_tasks:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+            self._reload_event = asyncio.Event()
+            self._flush_event = asyncio.Event()
+            self._main_tasks = [
+                asyncio.create_task(self._reload_loop()),
+                asyncio.create_task(self._flush_loop())
+            ]
+
+    async def stop(self):
+        for task in self._main_tasks + list(self._tasks):
+            task.cancel()
+        self._main_tasks = []
+        for client, handler in self._handlers.values():
+            client.remove_event_handler(handler)
+        self._handlers.clear()
+        for session_file in self._pinned:
+            telegram_client_manager.unpin(session_file)
+        self._pinned = set()
+        await self._flush()
+
+signal_copier = SignalCopier(**SIGNAL_COPY_CONFIG)
@@ -0,0 +1,51 @@
+import importlib
+import sys
+import time
+from contextlib import contextmanager
+
+class StartupReport:
+    """记录启动阶段各模块的导入耗时和初始化耗时，以及重依赖首次按需导入的耗时"""
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.sections = {"imports": {}, "init": {}, "lazy_imports": {}}
+        self.ready_at = None
+
+    def record(self, section: str, name: str, seconds: float):
+        self.sections[section][name] = round(seconds * 1000, 2)
+
+    @contextmanager
+    def timer(self, section: str, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(section, name, time.perf_counter() - started)
+
+    def mark_ready(self):
+        self.ready_at = time.perf_counter()
+
+    def as_dict(self) -> dict:
+        """各阶段耗时（毫秒）"""
+        return {
+            "imports_ms": dict(self.sections["imports"]),
+            "init_ms": dict(self.sections["init"]),
+            "lazy_imports_ms": dict(self.sections["lazy_imports"]),
+            "ready_after_ms": round((self.ready_at - self.started_at) * 1000, 2) if self.ready_at else None
+        }
+
+    def print_summary(self):
+        print("启动耗时统计（毫秒）:")
+        for section in ("imports", "init"):
+            for name, ms in sorted(self.sections[section].items(), key=lambda item: -item[1]):
+                print(f"  [{section}] {name}: {ms}")
+
+startup_report = StartupReport()
+
+def lazy_import(module_name: str):
+    """按需导入重依赖模块（如telethon、bcrypt），首次导入耗时记入启动报告"""
+    module = sys.modules.get(module_name)
+    if module is not None:
+        return module
+    with startup_report.timer("lazy_imports", module_name):
+        return importlib.import_module(module_name)
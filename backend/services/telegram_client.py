@@ -0,0 +1,55 @@
+import time
+from services.metrics import (
+    TELEGRAM_RPC_LATENCY, TELEGRAM_RPC_ERRORS, TELEGRAM_FLOOD_WAITS, TELEGRAM_FLOOD_WAIT_SECONDS
+)
+from services.startup_report import lazy_import
+from services.telegram_rate_limiter import telegram_rate_limiter
+
+_client_class = None
+
+def managed_client_class():
+    """项目使用的TelegramClient子类（首次使用时创建，telethon按需导入）
+
+    所有高层方法（send_code_request、sign_in、get_me等）最终都经过__call__发送请求，
+    在这里统一经过限流、处理FloodWait并记录耗时。
+    """
+    global _client_class
+    if _client_class is None:
+        telethon = lazy_import("telethon")
+        errors = lazy_import("telethon.errors")
+
+        class ManagedTelegramClient(telethon.TelegramClient):
+            rate_key = None   # 限流使用的账号标识，由create_client设置
+
+            async def connect(self):
+                started = time.perf_counter()
+                try:
+                    return await super().connect()
+                except Exception as e:
+                    TELEGRAM_RPC_ERRORS.labels("connect", type(e).__name__).inc()
+                    raise
+                finally:
+                    TELEGRAM_RPC_LATENCY.labels("connect").observe(time.perf_counter() - started)
+
+            async def __call__(self, request, ordered=False, flood_sleep_threshold=None):
+                method = type(request).__name__ if not isinstance(request, (list, tuple)) else "batch"
+                while True:
+                    await telegram_rate_limiter.acquire(self.rate_key, self.api_id)
+                    started = time.perf_counter()
+                    try:
+                        # FloodWait不在Telethon内部sleep，交给限流器封禁该账号，其他请求同样排队等待
+                        return await super().__call__(request, ordered, 0)
+                    except errors.FloodWaitError as e:
+                        TELEGRAM_FLOOD_WAITS.labels(method).inc()
+                        TELEGRAM_FLOOD_WAIT_SECONDS.labels(method).inc(e.seconds)
+                        TELEGRAM_RPC_ERRORS.labels(method, type(e).__name__).inc()
+                        if not telegram_rate_limiter.flood_wait(self.rate_key, e.seconds):
+                            raise
+                    except Exception as e:
+                        TELEGRAM_RPC_ERRORS.labels(method, type(e).__name__).inc()
+                        raise
+                    finally:
+                        TELEGRAM_RPC_LATENCY.labels(method).observe(time.perf_counter() - started)
+
+        _client_class = ManagedTelegramClient
+    return _client_class
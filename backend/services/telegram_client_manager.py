@@ -0,0 +1,205 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Iterable, Optional, Tuple, TYPE_CHECKING
+from config.database import get_async_db_connection
+from config.telegram import TELEGRAM_CLIENT_CONFIG
+from services.telegram_client import managed_client_class
+from services.session_store import session_store
+from services.telegram_rate_limiter import api_credential_pool
+
+if TYPE_CHECKING:
+    from telethon import TelegramClient
+
+class _ManagedClient:
+    """被管理的客户端及其最近使用时间"""
+    __slots__ = ('client', 'last_used')
+
+    def __init__(self, client: 'TelegramClient'):
+        self.client = client
+        self.last_used = time.monotonic()
+
+class TelegramClientManager:
+    """进程级Telegram客户端管理器
+
+    按key（session文件）缓存已连接的客户端，跨请求复用，避免每次调用都重新握手；
+    断线时按指数退避重连，空闲超时或超过数量上限（LRU）时断开并移出。
+    """
+
+    def __init__(self, max_clients: int = 500, idle_timeout: float = 1800,
+                 cleanup_interval: float = 60, connect_retries: int = 4,
+                 backoff_base: float = 1, backoff_max: float = 30):
+        self.max_clients = max_clients
+        self.idle_timeout = idle_timeout
+        self.cleanup_interval = cleanup_interval
+        self.connect_retries = connect_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._clients = OrderedDict()
+        self._locks = {}
+        self._pinned = set()   # 常驻的客户端（如监听信号源），不会因空闲或超过上限被淘汰
+        self._suspended = set()   # 暂停使用的账号（租约可能已被其他节点接管）
+        self._cleanup_task = None
+
+    def __len__(self):
+        return len(self._clients)
+
+    def _lock(self, key: str) -> asyncio.Lock:
+        lock = self._locks.get(key)
+        if lock is None:
+            lock = self._locks[key] = asyncio.Lock()
+        return lock
+
+    @staticmethod
+    def create_client(session, api_id: int, api_hash: str, key: Optional[str] = None) -> 'TelegramClient':
+        """创建（未连接的）客户端，telethon在首次使用时才导入
+
+        客户端的请求统一经过限流，key为限流使用的账号标识（一般为session标识）。
+        """
+        client = managed_client_class()(session, api_id, api_hash)
+        client.rate_key = key if key is not None else f"client:{id(client)}"
+        return client
+
+    async def connect(self, client: 'TelegramClient'):
+        """连接客户端，失败时按指数退避重试"""
+        delay = self.backoff_base
+        for attempt in range(self.connect_retries + 1):
+            try:
+                await client.connect()
+                return
+            except (OSError, ConnectionError, asyncio.TimeoutError):
+                if attempt >= self.connect_retries:
+                    raise
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.backoff_max)
+
+    async def get_client(self, key: str, session, api_id: int, api_hash: str) -> 'TelegramClient':
+        """获取已连接的客户端，不存在时创建并连接"""
+        async with self._lock(key):
+            entry = self._clients.get(key)
+            if entry is None:
+                client = self.create_client(session, api_id, api_hash, key)
+                await self.connect(client)
+                entry = self._clients[key] = _ManagedClient(client)
+            elif not entry.client.is_connected():
+                await self.connect(entry.client)
+            entry.last_used = time.monotonic()
+            self._clients.move_to_end(key)
+        await self._evict_overflow()
+        return entry.client
+
+    async def get_account_client(self, session_file: str) -> Optional['TelegramClient']:
+        """获取已保存账号的客户端：优先复用常驻客户端，没有时加载session新建；session不存在时返回None"""
+        if session_file in self._suspended:
+            raise ValueError("本节点的账号租约已失效，暂停使用该账号")
+        client = self.get_existing(session_file)
+        if client is None:
+            session = await session_store.open(session_file)
+            if session is None:
+                return None
+            api_id, api_hash = await self._api_credentials(session_file)
+            client = await self.get_client(session_file, session, api_id, api_hash)
+        return client
+
+    @staticmethod
+    async def _api_credentials(session_file: str) -> Tuple[int, str]:
+        """账号登录/导入时使用的凭据；未记录时（旧账号）按凭据池分配"""
+        async with get_async_db_connection() as conn:
+            cursor = await conn.cursor()
+            await cursor.execute(
+                "SELECT api_id, api_hash FROM telegram_accounts WHERE session_file = %s AND api_id IS NOT NULL LIMIT 1",
+                (session_file,)
+            )
+            row = await cursor.fetchone()
+        if row:
+            return row[0], row[1]
+        if api_credential_pool.credentials:
+            return api_credential_pool.resolve(session_file)
+        raise ValueError("账号未记录API凭据且未配置凭据池（TELEGRAM_API_CREDENTIALS），无法创建客户端")
+
+    async def adopt(self, key: str, client: 'TelegramClient'):
+        """接管一个已连接并授权的客户端（如登录流程中创建的客户端）"""
+        async with self._lock(key):
+            entry = self._clients.get(key)
+            if entry is not None and entry.client is not client:
+                await self._disconnect(entry.client)
+            client.rate_key = key
+            self._clients[key] = _ManagedClient(client)
+            self._clients.move_to_end(key)
+        await self._evict_overflow()
+
+    def get_existing(self, key: str) -> Optional['TelegramClient']:
+        """仅返回已缓存的客户端，不会新建连接"""
+        entry = self._clients.get(key)
+        if entry is None:
+            return None
+        entry.last_used = time.monotonic()
+        self._clients.move_to_end(key)
+        return entry.client
+
+    def pin(self, key: str):
+        """固定客户端，不参与空闲和LRU淘汰"""
+        self._pinned.add(key)
+
+    def unpin(self, key: str):
+        self._pinned.discard(key)
+
+    def suspend(self, keys: Iterable[str]):
+        """暂停使用这些账号（替换之前的设置，传入空集合即恢复），get_account_client对其抛出ValueError"""
+        self._suspended = set(keys)
+
+    async def remove(self, key: str):
+        """断开并移出客户端"""
+        entry = self._clients.pop(key, None)
+        self._locks.pop(key, None)
+        if entry is not None:
+            await self._disconnect(entry.client)
+
+    @staticmethod
+    async def _disconnect(client: 'TelegramClient'):
+        try:
+            await client.disconnect()
+        except Exception:
+            pass
+
+    async def _evict_overflow(self):
+        """超过数量上限时淘汰最久未使用的客户端"""
+        while len(self._clients) > self.max_clients:
+            key = next((key for key in self._clients if key not in self._pinned), None)
+            if key is None or self._lock(key).locked():
+                break
+            await self.remove(key)
+
+    async def evict_idle(self):
+        """断开空闲超时的客户端"""
+        now = time.monotonic()
+        expired = [
+            key for key, entry in self._clients.items()
+            if now - entry.last_used >= self.idle_timeout
+            and key not in self._pinned and not self._lock(key).locked()
+        ]
+        for key in expired:
+            await self.remove(key)
+
+    async def _cleanup_loop(self):
+        while True:
+            await asyncio.sleep(self.cleanup_interval)
+            try:
+                await self.evict_idle()
+            except Exception as e:
+                print(f"清理空闲Telegram客户端失败: {e}")
+
+    def start(self):
+        """启动空闲清理任务"""
+        if self._cleanup_task is None:
+            self._cleanup_task = asyncio.create_task(self._cleanup_loop())
+
+    async def stop(self):
+        """停止清理任务并断开所有客户端"""
+        if self._cleanup_task is not None:
+            self._cleanup_task.cancel()
+            self._cleanup_task = None
+        for key in list(self._clients):
+            await self.remove(key)
+
+telegram_client_manager = TelegramClientManager(**TELEGRAM_CLIENT_CONFIG)
@@ -0,0 +1,185 @@
+from typing import Dict, List, Optional
+from config.cluster import CLIENT_HOST_CONFIG
+from config.telegram import PENDING_LOGIN_CONFIG
+from models.telegram import TelegramLogin, TelegramVerify, TelegramService, account_cache
+from services.account_event_bus import account_event_bus
+from services.account_health_scheduler import account_health_scheduler
+from services.account_importer import account_importer
+from services.account_leases import account_lease_manager
+from services.account_router import account_router
+from services.account_status_checker import account_status_checker
+from services.cluster_events import cluster_events
+from services.ipc import IPCClient, IPCError
+from services.message_writer import message_writer
+from services.pending_login_store import pending_login_store
+from services.signal_copier import signal_copier, parse_peer
+from services.startup_report import startup_report
+from services.telegram_client_manager import telegram_client_manager
+from services.telegram_rate_limiter import telegram_rate_limiter
+
+# 以下操作使用Telegram客户端，在持有客户端的进程中执行；参数和返回值都可JSON序列化
+
+async def send_code(data: dict) -> dict:
+    login_data = TelegramLogin(**data)
+    result = await TelegramService.send_verification_code(login_data)
+    if result["success"]:
+        # 待验证的客户端只在本节点内存中，验证登录请求需转发到本节点
+        await account_lease_manager.claim_login(login_data.phone, PENDING_LOGIN_CONFIG['ttl'])
+    return result
+
+async def verify_login(data: dict, user_id: int) -> dict:
+    return await TelegramService.verify_and_login(TelegramVerify(**data), user_id)
+
+async def login_node(phone: str) -> Optional[str]:
+    """发送验证码的节点地址（待验证登录在本节点时为None）"""
+    if pending_login_store.get(phone) is not None:
+        return None
+    return await account_lease_manager.login_node(phone)
+
+async def account_node(account_id: int) -> Optional[str]:
+    return account_lease_manager.node_for(account_id)
+
+async def import_sessions(user_id: int, items: List[dict]) -> dict:
+    return await account_importer.import_sessions(user_id, items)
+
+async def check_status(account_id: int, user_id: int) -> dict:
+    return await TelegramService.check_account_status(account_id, user_id)
+
+async def refresh_accounts(user_id: int, limit: Optional[int] = None) -> dict:
+    return await TelegramService.refresh_accounts(user_id, limit=limit)
+
+async def delete_account(account_id: int, user_id: int) -> dict:
+    return await TelegramService.delete_telegram_account(account_id, user_id)
+
+async def check_accounts(accounts: list) -> Dict[int, str]:
+    return await account_status_checker.check_many((account_id, session_file) for account_id, session_file in accounts)
+
+async def send_message(session_file: str, target: str, html: str) -> int:
+    client = await telegram_client_manager.get_account_client(session_file)
+    if client is None:
+        raise ValueError("session不存在")
+    sent = await client.send_message(parse_peer(target), html, parse_mode="html", link_preview=False)
+    return sent.id
+
+async def signal_reload():
+    signal_copier.request_reload()
+
+async def signal_stats() -> dict:
+    return signal_copier.stats()
+
+async def stats() -> dict:
+    return {
+        "telegram_rate_limiter": telegram_rate_limiter.stats(),
+        "node": {"id": account_lease_manager.node_id, "accounts": len(account_lease_manager.owned)},
+        "clients": len(telegram_client_manager)
+    }
+
+HANDLERS = {
+    handler.__name__: handler for handler in (
+        send_code, verify_login, login_node, account_node, import_sessions, check_status,
+        refresh_accounts, delete_account, check_accounts, send_message, signal_reload, signal_stats, stats
+    )
+}
+
+# 单次调用可能包含大量Telegram请求的操作，超时按最坏情况放宽；只读内存状态的操作超时从严
+CALL_TIMEOUTS = {
+    "import_sessions": 3600,
+    "refresh_accounts": 600,
+    "stats": 2
+}
+
+def start_clients():
+    """启动不依赖数据库的客户端管理任务"""
+    with startup_report.timer("init", "telegram_client_manager"):
+        telegram_client_manager.start()
+    with startup_report.timer("init", "pending_login_store"):
+        pending_login_store.start()
+
+async def start_background():
+    """数据库就绪后认领账号，再启动只处理本节点账号的后台任务"""
+    # 本节点客户端产生的账号事件同时通知其他节点的订阅连接
+    account_event_bus.add_listener(lambda user_id, event: cluster_events.emit("account_event", user_id, event))
+    with startup_report.timer("init", "account_leases"):
+        await account_lease_manager.renew()
+        account_lease_manager.on_change(signal_copier.request_reload)
+        account_lease_manager.start()
+    print(f"节点 {account_lease_manager.node_id} 持有 {len(account_lease_manager.owned)} 个账号")
+    with startup_report.timer("init", "account_health_scheduler"):
+        account_health_scheduler.start()
+    with startup_report.timer("init", "signal_copier"):
+        message_writer.start()
+        signal_copier.start()
+
+async def stop_all():
+    await signal_copier.stop()
+    await message_writer.stop()
+    await account_health_scheduler.stop()
+    await pending_login_store.stop()
+    await telegram_client_manager.stop()
+    # 客户端断开后再释放租约，其他节点接管时不会与本节点同时使用session
+    await account_lease_manager.stop()
+    await account_router.close()
+
+class TelegramGateway:
+    """API进程访问Telegram客户端的入口
+
+    embedded模式直接在本进程调用；remote模式经Unix socket调用独立的客户端进程（python client_host.py），
+    Telegram连接、重连和更新处理不占用API的事件循环。客户端进程推送的账号事件转发给本进程的订阅者。
+    """
+
+    def __init__(self, mode: str = "embedded", socket_path: str = "", timeout: float = 60,
+                 connect_timeout: float = 5, max_message_size: int = 16 * 1024 * 1024, **_):
+        self.embedded = mode != "remote"
+        self._client = None if self.embedded else IPCClient(
+            socket_path, timeout, connect_timeout, max_message_size, on_event=self._on_event
+        )
+
+    @staticmethod
+    def _on_event(event: dict):
+        user_id = event["user_id"]
+        # 账号状态由客户端进程写入，本进程的账号列表缓存随之失效
+        account_cache.invalidate(user_id)
+        account_event_bus.publish(user_id, event["data"])
+
+    @staticmethod
+    def _on_cluster_event(user_id: int, event: dict):
+        """其他节点的账号事件：缓存失效并推送给本进程的订阅连接"""
+        account_cache.invalidate(user_id)
+        account_event_bus.deliver(user_id, event)
+
+    async def call(self, method: str, **params):
+        if self.embedded:
+            return await HANDLERS[method](**params)
+        try:
+            return await self._client.call(method, CALL_TIMEOUTS.get(method), **params)
+        finally:
+            # 带用户的操作都会修改账号数据（在客户端进程中），本进程的缓存同时失效
+            if "user_id" in params:
+                account_cache.invalidate(params["user_id"])
+
+    async def notify(self, method: str, **params):
+        """调用失败只记录日志（用于配置变化后的通知）"""
+        try:
+            await self.call(method, **params)
+        except IPCError as e:
+            print(f"通知客户端进程失败 {method}: {e}")
+
+    async def connect(self):
+        """remote模式下预先连接客户端进程（失败时在首次调用时重试）"""
+        if not self.embedded:
+            try:
+                await self._client.connect()
+            except IPCError as e:
+                print(e)
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.close()
+
+    @staticmethod
+    def serve_events(broadcast):
+        """客户端进程中把账号事件转发给已连接的API进程"""
+        account_event_bus.add_listener(lambda user_id, event: broadcast({"user_id": user_id, "data": event}))
+
+telegram_gateway = TelegramGateway(**CLIENT_HOST_CONFIG)
+cluster_events.on("account_event", TelegramGateway._on_cluster_event)
@@ -0,0 +1,165 @@
+import asyncio
+import heapq
+import itertools
+import time
+import zlib
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Optional, Tuple
+from config.telegram import RATE_LIMIT_CONFIG, TELEGRAM_API_CREDENTIALS
+
+# 请求优先级：数值越小越优先，交互式登录优先于后台检查
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 1
+
+_priority = ContextVar("telegram_rpc_priority", default=PRIORITY_INTERACTIVE)
+
+def current_priority() -> int:
+    return _priority.get()
+
+@contextmanager
+def rpc_priority(priority: int):
+    """在该上下文（及其中创建的任务）内发出的Telegram请求使用指定优先级"""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+class TokenBucket:
+    """令牌桶：按rate匀速补充、最多积累burst个令牌
+
+    令牌不足时请求按(优先级, 到达顺序)排队，补足后依次放行；
+    block()在FloodWait期间暂停发放令牌。
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self._waiters = []   # (优先级, 序号, future)
+        self._seq = itertools.count()
+        self._timer = None
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def _delay(self, now: float) -> float:
+        """距离下一个可用令牌的秒数"""
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    @property
+    def idle(self) -> bool:
+        return not self._waiters and self._delay(time.monotonic()) == 0 and self.tokens >= self.burst
+
+    async def acquire(self, priority: int = PRIORITY_INTERACTIVE):
+        if not self._waiters and self._delay(time.monotonic()) == 0:
+            self.tokens -= 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), future))
+        self._schedule()
+        await future
+
+    def block(self, seconds: float):
+        """seconds秒内不再发放令牌（收到FloodWait时调用）"""
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+        self.tokens = 0.0
+        self._schedule(reset=True)
+
+    def _schedule(self, reset: bool = False):
+        if reset and self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._timer is None and self._waiters:
+            self._timer = asyncio.get_running_loop().call_later(self._delay(time.monotonic()), self._dispatch)
+
+    def _dispatch(self):
+        """按优先级放行排队的请求，直到令牌用完"""
+        self._timer = None
+        while self._waiters:
+            _, _, future = self._waiters[0]
+            if future.done():
+                # 等待中被取消的请求
+                heapq.heappop(self._waiters)
+                continue
+            if self._delay(time.monotonic()) > 0:
+                break
+            heapq.heappop(self._waiters)
+            self.tokens -= 1
+            future.set_result(None)
+        self._schedule()
+
+class TelegramRateLimiter:
+    """Telegram请求的集中限流
+
+    每个请求需同时取得账号令牌和api_id令牌：账号桶限制单个账号的请求频率，
+    api_id桶限制同一组API凭据下所有账号的总频率。FloodWait按账号封禁对应秒数，
+    期间该账号的请求排队等待而不是继续触发FloodWait。
+    """
+
+    def __init__(self, account_rate: float = 1, account_burst: int = 5, api_rate: float = 30,
+                 api_burst: int = 50, max_auto_wait: float = 60, max_buckets: int = 10000):
+        self.account_rate = account_rate
+        self.account_burst = account_burst
+        self.api_rate = api_rate
+        self.api_burst = api_burst
+        self.max_auto_wait = max_auto_wait
+        self.max_buckets = max_buckets
+        self._accounts = {}
+        self._apis = {}
+
+    def _bucket(self, buckets: dict, key, rate: float, burst: int) -> TokenBucket:
+        bucket = buckets.get(key)
+        if bucket is None:
+            if len(buckets) >= self.max_buckets:
+                # 清理令牌已满且无人等待的桶
+                for idle_key in [k for k, b in buckets.items() if b.idle]:
+                    del buckets[idle_key]
+            bucket = buckets[key] = TokenBucket(rate, burst)
+        return bucket
+
+    async def acquire(self, account_key: str, api_id: int, priority: Optional[int] = None):
+        """等待账号和api_id各一个令牌"""
+        if priority is None:
+            priority = current_priority()
+        await self._bucket(self._accounts, account_key, self.account_rate, self.account_burst).acquire(priority)
+        await self._bucket(self._apis, api_id, self.api_rate, self.api_burst).acquire(priority)
+
+    def flood_wait(self, account_key: str, seconds: float) -> bool:
+        """记录FloodWait并封禁该账号，返回是否应在等待后自动重试"""
+        self._bucket(self._accounts, account_key, self.account_rate, self.account_burst).block(seconds)
+        return seconds <= self.max_auto_wait
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        return {
+            "accounts": len(self._accounts),
+            "blocked_accounts": sum(1 for b in self._accounts.values() if b.blocked_until > now),
+            "api_ids": len(self._apis)
+        }
+
+class ApiCredentialPool:
+    """多组api_id/api_hash，按账号稳定地分配到其中一组，分散单组凭据的请求频率"""
+
+    def __init__(self, credentials: List[dict]):
+        self.credentials = [(int(item['api_id']), item['api_hash']) for item in credentials]
+
+    def resolve(self, key: str, api_id: Optional[int] = None, api_hash: Optional[str] = None) -> Tuple[int, str]:
+        """返回该账号使用的凭据；配置了凭据池时按账号分配，否则使用调用方提供的凭据"""
+        if self.credentials:
+            return self.credentials[zlib.crc32(key.encode()) % len(self.credentials)]
+        if not api_id or not api_hash:
+            raise ValueError("未配置Telegram API凭据（api_id/api_hash）")
+        return api_id, api_hash
+
+telegram_rate_limiter = TelegramRateLimiter(**RATE_LIMIT_CONFIG)
+api_credential_pool = ApiCredentialPool(TELEGRAM_API_CREDENTIALS)
@@ -0,0 +1,85 @@
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+class TTLCache:
+    """带过期时间和容量上限（LRU淘汰）的内存缓存
+
+    每个条目属于一个分组（默认为key本身），invalidate按分组失效，
+    例如同一用户的多个分页结果可以一起失效。
+    读前通过version()取得分组版本号，写入时带上该版本；期间若发生invalidate，
+    写入会被丢弃，避免并发时把失效前读到的旧数据写回缓存。
+    """
+
+    def __init__(self, ttl: float = 30, max_size: int = 10000):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()   # key -> (过期时间, 值, 分组)
+        self._groups = {}            # 分组 -> 该分组下的key集合
+        self._versions = {}
+        self._counter = 0   # 版本号全局递增
+        self._floor = 0     # 未记录版本的分组使用的版本号
+
+    def __len__(self):
+        return len(self._data)
+
+    def _remove(self, key: Hashable):
+        _, _, group = self._data.pop(key)
+        keys = self._groups.get(group)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._groups[group]
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        item = self._data.get(key)
+        if item is None or item[0] <= time.monotonic():
+            if item is not None:
+                self._remove(key)
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return item[1]
+
+    def version(self, group: Hashable) -> int:
+        return self._versions.get(group, self._floor)
+
+    def set(self, key: Hashable, value: Any, version: Optional[int] = None, group: Hashable = None):
+        if group is None:
+            group = key
+        if version is not None and version != self.version(group):
+            return
+        if key in self._data:
+            self._remove(key)
+        self._data[key] = (time.monotonic() + self.ttl, value, group)
+        self._groups.setdefault(group, set()).add(key)
+        while len(self._data) > self.max_size:
+            self._remove(next(iter(self._data)))
+
+    def invalidate(self, group: Hashable):
+        """失效分组下的所有条目"""
+        for key in list(self._groups.get(group, ())):
+            self._remove(key)
+        self._counter += 1
+        self._versions[group] = self._counter
+        if len(self._versions) > self.max_size * 2:
+            # 清空记录后所有分组的版本都提升到当前值，进行中的写入会被丢弃，不会写入旧数据
+            self._versions.clear()
+            self._floor = self._counter
+
+    def clear(self):
+        for group in list(self._groups):
+            self.invalidate(group)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0
+        }
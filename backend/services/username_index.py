@@ -0,0 +1,130 @@
+import asyncio
+import hashlib
+import math
+import time
+import unicodedata
+from config.auth import USERNAME_INDEX_CONFIG
+from config.database import get_async_db_connection
+from services.cluster_events import cluster_events
+
+class UsernameIndex:
+    """用户名存在性过滤（Bloom过滤器）
+
+    启动时按ID分页加载全部用户名，注册成功后加入，并经集群事件加入其他节点的过滤器。
+    判定为"一定不存在"的用户名直接拒绝，不访问数据库；判定为"可能存在"时照常查询数据库，
+    唯一键仍是并发注册的最终依据。
+    本地未命中时增量加载新注册的用户（兜底集群事件的延迟或丢失），每refresh_interval秒最多一次，
+    间隔内的未命中直接由过滤器回答。自增ID按插入顺序分配但提交可能晚于更大的ID，
+    已加载范围内的空缺ID在pending_timeout内每次加载都重新查询。
+    加载完成前（或加载失败时）所有用户名都视为可能存在。
+    """
+
+    def __init__(self, enabled: bool = True, capacity: int = 1000000, error_rate: float = 0.01,
+                 refresh_interval: float = 1, gap_window: int = 1000, pending_timeout: float = 60,
+                 page_size: int = 10000):
+        self.enabled = enabled
+        self.bits = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.bits / capacity * math.log(2)))
+        self.refresh_interval = refresh_interval
+        self.gap_window = gap_window
+        self.pending_timeout = pending_timeout
+        self.page_size = page_size
+        self.ready = False
+        self._filter = bytearray((self.bits + 7) // 8)
+        self._max_id = 0
+        self._gaps = {}              # 可能尚未提交的ID -> 发现时间
+        self._refreshed_at = 0.0     # 最近一次增量加载（含失败）的开始时间
+        self._lock = asyncio.Lock()
+        cluster_events.on("username", lambda _, data: self.add(data["username"]))
+
+    @staticmethod
+    def normalize(username: str) -> str:
+        """近似utf8mb4_unicode_ci的比较规则：忽略大小写、重音和末尾空格"""
+        decomposed = unicodedata.normalize("NFKD", username)
+        return "".join(char for char in decomposed if not unicodedata.combining(char)).casefold().rstrip(" ")
+
+    def _positions(self, username: str):
+        digest = hashlib.blake2b(self.normalize(username).encode(), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+        return ((first + index * second) % self.bits for index in range(self.hashes))
+
+    def add(self, username: str):
+        for position in self._positions(username):
+            self._filter[position >> 3] |= 1 << (position & 7)
+
+    def register(self, username: str):
+        """注册成功后加入本进程的过滤器并通知其他节点"""
+        self.add(username)
+        cluster_events.emit("username", data={"username": username})
+
+    def might_contain(self, username: str) -> bool:
+        if not self.ready:
+            return True
+        return all(self._filter[position >> 3] & (1 << (position & 7)) for position in self._positions(username))
+
+    def _track_gaps(self, rows, now: float):
+        """记录本页与已加载最大ID之间的空缺ID（只保留最近gap_window个ID内的）"""
+        previous = self._max_id
+        for user_id, _ in rows:
+            for gap in range(max(previous + 1, user_id - self.gap_window), user_id):
+                self._gaps.setdefault(gap, now)
+            previous = user_id
+        floor = previous - self.gap_window
+        self._gaps = {
+            gap: found_at for gap, found_at in self._gaps.items()
+            if gap > floor and now - found_at < self.pending_timeout
+        }
+
+    async def _load_new(self):
+        """加载晚提交的空缺ID和ID大于已加载最大ID的用户名"""
+        started = time.monotonic()
+        async with get_async_db_connection() as conn:
+            cursor = await conn.cursor()
+            if self._gaps:
+                gaps = list(self._gaps)
+                await cursor.execute(
+                    f"SELECT id, username FROM users WHERE id IN ({', '.join(['%s'] * len(gaps))})", gaps
+                )
+                for user_id, username in await cursor.fetchall():
+                    self.add(username)
+                    self._gaps.pop(user_id, None)
+            while True:
+                await cursor.execute(
+                    "SELECT id, username FROM users WHERE id > %s ORDER BY id LIMIT %s",
+                    (self._max_id, self.page_size)
+                )
+                rows = await cursor.fetchall()
+                for user_id, username in rows:
+                    self.add(username)
+                self._track_gaps(rows, started)
+                if rows:
+                    self._max_id = rows[-1][0]
+                if len(rows) < self.page_size:
+                    break
+
+    async def load(self):
+        """启动时加载全部用户名"""
+        if not self.enabled:
+            return
+        async with self._lock:
+            await self._load_new()
+        self.ready = True
+
+    async def exists(self, username: str) -> bool:
+        """用户名是否可能存在；False表示一定不存在"""
+        if self.might_contain(username):
+            return True
+        # 正在加载或距上次加载不足refresh_interval时直接由过滤器回答，不访问数据库
+        if self._lock.locked() or time.monotonic() - self._refreshed_at < self.refresh_interval:
+            return False
+        async with self._lock:
+            self._refreshed_at = time.monotonic()
+            try:
+                await self._load_new()
+            except Exception as e:
+                # 无法确认时按可能存在处理，交给数据库判断
+                print(f"加载新注册用户名失败: {e}")
+                return True
+        return self.might_contain(username)
+
+username_index = UsernameIndex(**USERNAME_INDEX_CONFIG)
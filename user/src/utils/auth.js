@@ -0,0 +1,12 @@
+// 登录令牌工具：令牌随用户信息保存在本地存储的currentUser中
+
+export function getToken() {
+  const savedUser = localStorage.getItem('currentUser')
+  return savedUser ? JSON.parse(savedUser).token || '' : ''
+}
+
+export function authHeaders() {
+  return {
+    'Authorization': `Bearer ${getToken()}`
+  }
+}